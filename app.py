@@ -10,35 +10,62 @@ import trimesh
 import numpy as np
 from pathlib import Path
 import tempfile
-import subprocess
+import queue
+import threading
 from PIL import Image
-import io
+
+from mesh_tools.boolean import boolean
+from mesh_tools.loader import load_mesh
+from mesh_tools.lod import build_lods, lod_mesh
+from mesh_tools.quick_repair import QUICK_REPAIR_VERSION, quick_repair_mesh
+from mesh_tools.render import PREVIEW_TIERS, mesh_digest, preview_image, render
+from mesh_tools.repair import backend_name, backend_version, repair_mesh
+from mesh_tools.transform import PROXY_FACES, apply_matrix, compose_matrix
+from mesh_tools.result_cache import default_cache as result_cache
+from threeMF_tools.writer import export_mesh
 
 # Tool directories
 TOOLS_DIR = Path(__file__).parent
 BIN_DIR = TOOLS_DIR / "bin"
 
-def generate_preview(mesh, resolution=(800, 600)):
-    """Generate a preview image of the mesh"""
-    try:
-        scene = mesh.scene()
-
-        # Set up nice camera angle
-        scene.camera.resolution = resolution
-        scene.camera.fov = (60, 45)
-
-        # Render to PNG bytes
-        png_bytes = scene.save_image(resolution=resolution)
+def generate_preview(mesh, resolution=PREVIEW_TIERS["full"], digest=None):
+    """Generate a preview image of the mesh (software renderer, cached)
 
-        # Convert to PIL Image
-        image = Image.open(io.BytesIO(png_bytes))
-        return image
+    Meshes with more faces than the image has pixels are drawn from their
+    cached level-of-detail pyramid at full size. Smaller tiers are quick
+    previews and never wait for decimation: they draw an evenly strided
+    subset of the faces while the pyramid builds in the background.
+    """
+    try:
+        if hasattr(mesh, "geometry"):
+            mesh = mesh.dump(concatenate=True)
+        digest = digest or mesh_digest(mesh)
+        faces = len(mesh.faces)
+        pixels = resolution[0] * resolution[1]
+        full_pixels = PREVIEW_TIERS["full"][0] * PREVIEW_TIERS["full"][1]
+        if faces > pixels and pixels < full_pixels:
+            if faces > full_pixels:
+                threading.Thread(target=_prebuild_lods, args=(mesh, digest), daemon=True).start()
+            # All vertices are kept, so the framing matches the full preview
+            mesh = trimesh.Trimesh(mesh.vertices, mesh.faces[::-(-faces // pixels)], process=False)
+        elif faces > pixels:
+            _, mesh = lod_mesh(mesh, max_faces=pixels, digest=digest)
+        return preview_image(mesh, resolution, digest=digest)
     except Exception as e:
         # Return error image
         img = Image.new('RGB', resolution, color='red')
         return img
 
 
+def _prebuild_lods(mesh, digest):
+    """Build a mesh's LOD pyramid ahead of its full-size preview"""
+    try:
+        build_lods(mesh, digest=digest)
+    except Exception:
+        # The full preview builds (and reports) it again
+        pass
+
+
 def mesh_stats(mesh):
     """Get mesh statistics as formatted text"""
     stats = f"""
@@ -65,153 +92,234 @@ def mesh_stats(mesh):
 
 
 def repair_mesh_ui(input_file, use_meshfix=True):
-    """Repair mesh with preview"""
+    """Repair mesh with preview (low-res previews first, then full)"""
     if input_file is None:
-        return None, None, "Please upload a file first"
+        yield None, None, "Please upload a file first", None
+        return
 
     try:
         # Load mesh
-        mesh = trimesh.load(input_file.name)
+        mesh = load_mesh(input_file.name)
         original_stats = mesh_stats(mesh)
-        before_image = generate_preview(mesh)
+        digest = mesh_digest(mesh)
+        yield (
+            generate_preview(mesh, PREVIEW_TIERS["low"], digest), None,
+            f"## Original\n{original_stats}\n\n⏳ Repairing...", None
+        )
+        before_image = generate_preview(mesh, digest=digest)
+
+        # Reuse a previous repair of identical input
+        output_file = tempfile.NamedTemporaryFile(suffix='.stl', delete=False)
+        backend = backend_name() if use_meshfix else None
+        cache_key = result_cache().key(
+            "app.repair", [input_file.name], {"meshfix": bool(use_meshfix)},
+            tool=backend_version(backend) if use_meshfix else f"quick_repair {QUICK_REPAIR_VERSION}"
+        )
+        if result_cache().fetch(cache_key, output_file.name):
+            mesh = load_mesh(output_file.name)
+            stats = f"## Original\n{original_stats}\n\n## Repaired (cached)\n{mesh_stats(mesh)}"
+            digest = mesh_digest(mesh)
+            yield before_image, generate_preview(mesh, PREVIEW_TIERS["low"], digest), stats, output_file.name
+            yield before_image, generate_preview(mesh, digest=digest), stats, output_file.name
+            return
 
         # Repair
         if use_meshfix:
-            # Use MeshFix for heavy repair
-            meshfix_bin = BIN_DIR / "meshfix"
-            temp_out = tempfile.NamedTemporaryFile(suffix='.off', delete=False)
-
-            result = subprocess.run(
-                [str(meshfix_bin), input_file.name],
-                capture_output=True,
-                timeout=60
-            )
-
-            # Load repaired mesh (MeshFix outputs .off)
-            off_file = input_file.name.replace('.stl', '_fixed.off')
-            if Path(off_file).exists():
-                mesh = trimesh.load(off_file)
-                Path(off_file).unlink()  # Clean up
+            # Use MeshFix for heavy repair (in-process when pymeshfix is installed).
+            # Large meshes are repaired in tiles; report each one as it lands
+            updates = queue.Queue()
+
+            def run_repair():
+                try:
+                    updates.put(("done", repair_mesh(
+                        mesh, backend,
+                        progress=lambda done, total, _: updates.put(("tile", f"{done}/{total}")))))
+                except Exception as e:
+                    updates.put(("error", e))
+
+            threading.Thread(target=run_repair, daemon=True).start()
+            while True:
+                kind, value = updates.get()
+                if kind == "error":
+                    raise value
+                if kind == "done":
+                    mesh, _ = value
+                    break
+                yield before_image, None, f"## Original\n{original_stats}\n\n⏳ Repairing tile {value}...", None
         else:
-            # Quick repair
-            mesh.remove_duplicate_faces()
-            mesh.remove_degenerate_faces()
-            mesh.fix_normals()
-            mesh.fill_holes()
-            mesh.merge_vertices()
+            # Quick repair: weld, clean, orient and fill in one pass
+            mesh, info = quick_repair_mesh(mesh)
 
-        # Generate preview
-        after_image = generate_preview(mesh)
         repaired_stats = mesh_stats(mesh)
+        stats = f"## Original\n{original_stats}\n\n## Repaired\n{repaired_stats}"
+        if not use_meshfix:
+            steps = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in info["timings"].items())
+            stats += (f"\n\n**Quick repair:** {info['holes_filled']} holes filled, "
+                      f"{info['flipped_faces']} faces flipped, "
+                      f"{info['duplicate_faces'] + info['degenerate_faces']} faces removed ({steps})")
 
         # Save repaired mesh
-        output_file = tempfile.NamedTemporaryFile(suffix='.stl', delete=False)
         mesh.export(output_file.name)
+        result_cache().store(cache_key, output_file.name)
 
-        return (
-            before_image,
-            after_image,
-            f"## Original\n{original_stats}\n\n## Repaired\n{repaired_stats}",
-            output_file.name
-        )
+        # Generate preview
+        digest = mesh_digest(mesh)
+        yield before_image, generate_preview(mesh, PREVIEW_TIERS["low"], digest), stats, output_file.name
+        yield before_image, generate_preview(mesh, digest=digest), stats, output_file.name
 
     except Exception as e:
-        return None, None, f"❌ Error: {str(e)}", None
+        yield None, None, f"❌ Error: {str(e)}", None
 
 
 def convert_format_ui(input_file, output_format):
     """Convert mesh format with preview"""
     if input_file is None:
-        return None, None, "Please upload a file first"
+        yield None, "Please upload a file first", None
+        return
 
     try:
-        mesh = trimesh.load(input_file.name)
-        preview = generate_preview(mesh)
+        mesh = load_mesh(input_file.name)
+        digest = mesh_digest(mesh)
         stats = mesh_stats(mesh)
+        yield generate_preview(mesh, PREVIEW_TIERS["low"], digest), stats, None
 
         # Convert
         output_file = tempfile.NamedTemporaryFile(suffix=f'.{output_format}', delete=False)
-        mesh.export(output_file.name)
+        export_mesh(mesh, output_file.name)
 
-        return preview, stats, output_file.name
+        yield generate_preview(mesh, digest=digest), stats, output_file.name
 
     except Exception as e:
-        return None, f"❌ Error: {str(e)}", None
+        yield None, f"❌ Error: {str(e)}", None
 
 
-def transform_mesh_ui(input_file, scale, rotate_x, rotate_y, rotate_z, translate_x, translate_y, translate_z):
-    """Transform mesh with live preview"""
+def load_transform_ui(input_file):
+    """Load the uploaded mesh into session state and build its preview proxy"""
     if input_file is None:
-        return None, None, "Please upload a file first"
+        return None, None, None, "Please upload a file first", None
 
     try:
-        mesh = trimesh.load(input_file.name)
-        original_preview = generate_preview(mesh)
-
-        # Apply transformations
-        if scale != 1.0:
-            mesh.apply_scale(scale)
-
-        if rotate_x != 0:
-            mesh.apply_transform(trimesh.transformations.rotation_matrix(
-                np.radians(rotate_x), [1, 0, 0]
-            ))
-        if rotate_y != 0:
-            mesh.apply_transform(trimesh.transformations.rotation_matrix(
-                np.radians(rotate_y), [0, 1, 0]
-            ))
-        if rotate_z != 0:
-            mesh.apply_transform(trimesh.transformations.rotation_matrix(
-                np.radians(rotate_z), [0, 0, 1]
-            ))
-
-        if translate_x != 0 or translate_y != 0 or translate_z != 0:
-            mesh.apply_translation([translate_x, translate_y, translate_z])
-
-        transformed_preview = generate_preview(mesh)
-        stats = mesh_stats(mesh)
+        mesh = load_mesh(input_file.name)
+        digest = mesh_digest(mesh)
+        state = {
+            "name": Path(input_file.name).stem,
+            "mesh": mesh,
+            "proxy": lod_mesh(mesh, max_faces=PROXY_FACES, digest=digest)[1],
+            "hull": hull_points(mesh),
+            "stats": mesh_stats(mesh),
+        }
+        preview = generate_preview(mesh, digest=digest)
+        return state, preview, preview, state["stats"], None
 
-        # Save
-        output_file = tempfile.NamedTemporaryFile(suffix='.stl', delete=False)
-        mesh.export(output_file.name)
+    except Exception as e:
+        return None, None, None, f"❌ Error: {str(e)}", None
 
-        return original_preview, transformed_preview, stats, output_file.name
 
-    except Exception as e:
-        return None, None, f"❌ Error: {str(e)}", None
+def hull_points(mesh):
+    """Convex hull vertices: transforming these gives the exact transformed bounds"""
+    try:
+        return mesh.convex_hull.vertices
+    except Exception:
+        # Degenerate input (e.g. flat): the box corners bound it, if loosely
+        return trimesh.bounds.corners(mesh.bounds)
+
+
+def transform_matrix(scale, rotate_x, rotate_y, rotate_z, translate_x, translate_y, translate_z):
+    """Compose the slider values into one 4x4 matrix"""
+    return compose_matrix(scale, (rotate_x, rotate_y, rotate_z), (translate_x, translate_y, translate_z))
+
+
+def preview_transform_ui(state, scale, rotate_x, rotate_y, rotate_z, translate_x, translate_y, translate_z):
+    """Render the decimated proxy under the current transform"""
+    if state is None:
+        return None, "Please upload a file first"
+
+    matrix = transform_matrix(scale, rotate_x, rotate_y, rotate_z, translate_x, translate_y, translate_z)
+    proxy = state["proxy"]
+    # An affine map keeps the convex hull, so its few points give exact bounds
+    moved = apply_matrix(state["hull"], matrix)
+    bounds = np.array([moved.min(axis=0), moved.max(axis=0)])
+
+    # Frame original and transformed boxes together so moves are visible
+    frame = np.vstack([state["mesh"].bounds, bounds])
+    image = Image.fromarray(render(apply_matrix(proxy.vertices, matrix), proxy.faces, frame=frame))
+
+    size = bounds[1] - bounds[0]
+    stats = f"""{state["stats"]}
+**Transformed:**
+- X: {bounds[0][0]:.2f} to {bounds[1][0]:.2f} mm
+- Y: {bounds[0][1]:.2f} to {bounds[1][1]:.2f} mm
+- Z: {bounds[0][2]:.2f} to {bounds[1][2]:.2f} mm
+
+**Size:** {size[0]:.1f} × {size[1]:.1f} × {size[2]:.1f} mm
+"""
+    return image, stats
+
+
+def transform_mesh_ui(state, scale, rotate_x, rotate_y, rotate_z, translate_x, translate_y, translate_z):
+    """Apply the composed transform to the full-resolution mesh and export it"""
+    if state is None:
+        return None
+
+    matrix = transform_matrix(scale, rotate_x, rotate_y, rotate_z, translate_x, translate_y, translate_z)
+    mesh = state["mesh"]
+    transformed = trimesh.Trimesh(apply_matrix(mesh.vertices, matrix), mesh.faces, process=False)
+    if np.linalg.det(matrix[:3, :3]) < 0:
+        transformed.invert()
+
+    output_path = Path(tempfile.mkdtemp()) / f"{state['name']}_transformed.stl"
+    transformed.export(str(output_path))
+    return str(output_path)
 
 
 def boolean_operation_ui(mesh_a_file, mesh_b_file, operation):
     """Boolean operations with preview"""
     if mesh_a_file is None or mesh_b_file is None:
-        return None, None, None, "Please upload both files"
+        yield None, None, None, "Please upload both files", None
+        return
 
     try:
-        mesh_a = trimesh.load(mesh_a_file.name)
-        mesh_b = trimesh.load(mesh_b_file.name)
+        mesh_a = load_mesh(mesh_a_file.name)
+        mesh_b = load_mesh(mesh_b_file.name)
+
+        digest_a = mesh_digest(mesh_a)
+        digest_b = mesh_digest(mesh_b)
+        yield (
+            generate_preview(mesh_a, PREVIEW_TIERS["low"], digest_a),
+            generate_preview(mesh_b, PREVIEW_TIERS["low"], digest_b),
+            None, f"⏳ Computing {operation.lower()}...", None
+        )
+        preview_a = generate_preview(mesh_a, digest=digest_a)
+        preview_b = generate_preview(mesh_b, digest=digest_b)
 
-        preview_a = generate_preview(mesh_a)
-        preview_b = generate_preview(mesh_b)
+        # Same key as the MCP mesh.boolean tool, so results are shared
+        output_file = tempfile.NamedTemporaryFile(suffix='.stl', delete=False)
+        cache_key = result_cache().key(
+            "mesh.boolean", [mesh_a_file.name, mesh_b_file.name],
+            {"operation": operation.lower(), "format": ".stl"},
+            tool=f"trimesh {trimesh.__version__}"
+        )
+        timing = None
+        if result_cache().fetch(cache_key, output_file.name):
+            result = load_mesh(output_file.name)
+        else:
+            # Perform boolean (disjoint parts skip the backend)
+            result, info = boolean(mesh_a, mesh_b, operation)
+            timing = ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in info["timings"].items())
 
-        # Perform boolean
-        if operation == "Union":
-            result = mesh_a.union(mesh_b)
-        elif operation == "Difference":
-            result = mesh_a.difference(mesh_b)
-        elif operation == "Intersection":
-            result = mesh_a.intersection(mesh_b)
+            # Save
+            result.export(output_file.name)
+            result_cache().store(cache_key, output_file.name)
 
-        result_preview = generate_preview(result)
+        digest = mesh_digest(result)
         stats = mesh_stats(result)
-
-        # Save
-        output_file = tempfile.NamedTemporaryFile(suffix='.stl', delete=False)
-        result.export(output_file.name)
-
-        return preview_a, preview_b, result_preview, stats, output_file.name
+        if timing:
+            stats += f"\n\n**Boolean:** {info['strategy']} ({timing})"
+        yield preview_a, preview_b, generate_preview(result, PREVIEW_TIERS["low"], digest), stats, output_file.name
+        yield preview_a, preview_b, generate_preview(result, digest=digest), stats, output_file.name
 
     except Exception as e:
-        return None, None, None, f"❌ Error: {str(e)}", None
+        yield None, None, None, f"❌ Error: {str(e)}", None
 
 
 # Create Gradio Interface
@@ -294,7 +402,7 @@ with gr.Blocks(title="3MF Tools - Visual Mesh Processing", theme=gr.themes.Soft(
                     translate_y = gr.Slider(-100, 100, value=0, label="Move Y")
                     translate_z = gr.Slider(-100, 100, value=0, label="Move Z")
 
-                    transform_btn = gr.Button("Apply Transform", variant="primary")
+                    transform_btn = gr.Button("Export Transformed Mesh", variant="primary")
 
                 with gr.Column():
                     transform_stats = gr.Markdown()
@@ -304,11 +412,35 @@ with gr.Blocks(title="3MF Tools - Visual Mesh Processing", theme=gr.themes.Soft(
                 transform_before = gr.Image(label="Original")
                 transform_after = gr.Image(label="Transformed")
 
+            # Loaded mesh and its preview proxy, per browser session
+            transform_state = gr.State()
+            transform_sliders = [scale_slider, rotate_x, rotate_y, rotate_z,
+                                 translate_x, translate_y, translate_z]
+
+            transform_input.change(
+                load_transform_ui,
+                inputs=[transform_input],
+                outputs=[transform_state, transform_before, transform_after,
+                        transform_stats, transform_output]
+            )
+
+            # Re-render the proxy as sliders move; always_last drops stale
+            # intermediate positions so only the latest value is drawn
+            for slider in transform_sliders:
+                slider.change(
+                    preview_transform_ui,
+                    inputs=[transform_state] + transform_sliders,
+                    outputs=[transform_after, transform_stats],
+                    trigger_mode="always_last",
+                    show_progress="hidden",
+                    concurrency_limit=1,
+                    concurrency_id="transform_preview"
+                )
+
             transform_btn.click(
                 transform_mesh_ui,
-                inputs=[transform_input, scale_slider, rotate_x, rotate_y, rotate_z,
-                       translate_x, translate_y, translate_z],
-                outputs=[transform_before, transform_after, transform_stats, transform_output]
+                inputs=[transform_state] + transform_sliders,
+                outputs=[transform_output]
             )
 
         # Tab 4: Boolean Operations
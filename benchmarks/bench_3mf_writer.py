@@ -0,0 +1,83 @@
+#!/Users/marshalwalkerm4mini/3d-workflows/3mf_tools/venv/bin/python
+"""
+Benchmark: streaming 3MF writer vs trimesh's 3MF exporter
+
+Each exporter runs in a fresh subprocess so peak RSS is measured
+independently. Usage:
+
+    bench_3mf_writer.py [subdivisions] [compresslevel]
+
+Subdivisions 8 gives an icosphere with ~1.3M triangles.
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent.parent
+
+GENERATOR = r"""
+import numpy as np
+import trimesh
+mesh = trimesh.creation.icosphere(subdivisions={subdivisions})
+np.savez({source!r}, vertices=mesh.vertices, faces=mesh.faces)
+"""
+
+RUNNER = r"""
+import resource, sys, time
+sys.path.insert(0, {tools_dir!r})
+import numpy as np
+import trimesh
+from threeMF_tools.writer import write_3mf
+
+arrays = np.load({source!r})
+mesh = trimesh.Trimesh(arrays["vertices"], arrays["faces"], process=False)
+base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+start = time.perf_counter()
+if {method!r} == "native":
+    write_3mf({output!r}, [mesh], compresslevel={level})
+else:
+    mesh.export({output!r})
+elapsed = time.perf_counter() - start
+
+peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is KB on Linux
+print(len(mesh.faces), elapsed, (peak_rss - base_rss) * scale)
+"""
+
+
+def run(method, source, level, output):
+    """Run one exporter in a subprocess and return (faces, seconds, extra RSS bytes)"""
+    code = RUNNER.format(
+        tools_dir=str(TOOLS_DIR), source=source,
+        method=method, output=output, level=level
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    faces, seconds, rss = result.stdout.split()
+    return int(faces), float(seconds), int(rss)
+
+
+def main():
+    subdivisions = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    level = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+
+    print(f"{'exporter':<10} {'triangles':>10} {'seconds':>8} {'Mtri/s':>7} {'peak RSS':>10} {'size':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Build the test mesh in its own process: a forked child inherits
+        # the parent's RSS high-water mark, so the parent must stay small
+        source = str(Path(tmp) / "mesh.npz")
+        subprocess.run([sys.executable, "-c", GENERATOR.format(
+            subdivisions=subdivisions, source=source)], check=True)
+
+        for method in ("trimesh", "native"):
+            output = str(Path(tmp) / f"{method}.3mf")
+            faces, seconds, rss = run(method, source, level, output)
+            size = Path(output).stat().st_size
+            print(f"{method:<10} {faces:>10,} {seconds:>8.2f} {faces / seconds / 1e6:>7.2f} "
+                  f"{rss / 2**20:>8.0f}MB {size / 2**20:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/Users/marshalwalkerm4mini/3d-workflows/3mf_tools/venv/bin/python
+"""
+Benchmark: in-process repair backends vs the MeshFix subprocess
+
+The subprocess path is what mesh.repair used to do: write the mesh,
+run MeshFix, parse the ASCII OFF it writes back. When bin/meshfix is not
+built, pymeshfix's file interface run in a child Python stands in for it
+(same library, same OFF round-trip). Usage:
+
+    bench_repair.py [subdivisions] [holes]
+
+Subdivisions 7 gives an icosphere with ~330k triangles; `holes` faces
+are punched out of it at random so there is something to repair.
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+TOOLS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(TOOLS_DIR))
+
+from mesh_tools.repair import BACKENDS, MESHFIX_BIN, _available, repair_arrays  # noqa: E402
+
+STANDIN = r"""
+import sys
+import pymeshfix
+pymeshfix.clean_from_file(sys.argv[1], sys.argv[2])
+"""
+
+
+def broken_sphere(subdivisions: int, holes: int):
+    import trimesh
+
+    mesh = trimesh.creation.icosphere(subdivisions=subdivisions)
+    keep = np.ones(len(mesh.faces), dtype=bool)
+    keep[np.random.default_rng(0).choice(len(mesh.faces), holes, replace=False)] = False
+    return trimesh.Trimesh(mesh.vertices, mesh.faces[keep], process=False)
+
+
+def run_subprocess(source: Path, tmp: Path):
+    """Seconds for the file round-trip, and the face count read back"""
+    import trimesh
+
+    output = tmp / "fixed.off"
+    start = time.perf_counter()
+    if MESHFIX_BIN.exists():
+        cmd = [str(MESHFIX_BIN), str(source), str(output)]
+    else:
+        cmd = [sys.executable, "-c", STANDIN, str(source), str(output)]
+    subprocess.run(cmd, capture_output=True, check=True)
+    fixed = trimesh.load(output, force="mesh", process=False)
+    return time.perf_counter() - start, len(fixed.faces)
+
+
+def main():
+    import trimesh
+
+    subdivisions = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    holes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    mesh = broken_sphere(subdivisions, holes)
+    print(f"Input: {len(mesh.faces):,} triangles, {holes} punched out\n")
+    print(f"{'backend':<22} {'seconds':>8} {'faces out':>10} {'watertight':>10}")
+
+    for backend in BACKENDS:
+        if backend == "meshfix" or not _available(backend):
+            continue
+        start = time.perf_counter()
+        vertices, faces, _ = repair_arrays(mesh.vertices, mesh.faces, backend)
+        seconds = time.perf_counter() - start
+        watertight = trimesh.Trimesh(vertices, faces, process=False).is_watertight
+        print(f"{backend + ' (in-process)':<22} {seconds:>8.2f} {len(faces):>10,} {str(watertight):>10}")
+
+    if MESHFIX_BIN.exists() or _available("pymeshfix"):
+        label = "meshfix" if MESHFIX_BIN.exists() else "pymeshfix (subprocess)"
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            source = tmp / "input.stl"
+            start = time.perf_counter()
+            mesh.export(source)
+            export = time.perf_counter() - start
+            seconds, faces = run_subprocess(source, tmp)
+        print(f"{label:<22} {export + seconds:>8.2f} {faces:>10,} {'':>10}")
+
+
+if __name__ == "__main__":
+    main()
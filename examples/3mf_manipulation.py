@@ -8,6 +8,9 @@ import zipfile
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+# Make the repository packages importable when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 def unpack_3mf(three_mf_path, output_dir):
     """Unpack 3MF file to directory"""
     output_path = Path(output_dir)
@@ -68,6 +71,18 @@ def modify_metadata(unpacked_dir, metadata_dict):
     return True
 
 
+def set_metadata(three_mf_path, metadata_dict):
+    """Update metadata directly in a 3MF without unpacking it"""
+    from threeMF_tools.metadata import modify_metadata as modify_in_place
+
+    print(f"Updating metadata in {three_mf_path}...")
+    modify_in_place(three_mf_path, metadata_dict)
+    for key, value in metadata_dict.items():
+        print(f"  {key}: {value}")
+    print("✓ Metadata updated")
+    return True
+
+
 def repack_3mf(unpacked_dir, output_file):
     """Repack directory into 3MF file"""
     unpacked_path = Path(unpacked_dir)
@@ -89,64 +104,32 @@ def repack_3mf(unpacked_dir, output_file):
 def extract_meshes(three_mf_path, output_dir):
     """Extract all mesh files from 3MF"""
     import trimesh
+    from threeMF_tools.reader import iter_meshes
 
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
     print(f"Extracting meshes from {three_mf_path}...")
 
-    # Unpack
-    temp_dir = Path("temp_extract")
-    with zipfile.ZipFile(three_mf_path, 'r') as zf:
-        zf.extractall(temp_dir)
-
-    # Find 3dmodel.model
-    model_file = temp_dir / "3D" / "3dmodel.model"
-
-    if model_file.exists():
-        # Parse and extract meshes
-        tree = ET.parse(model_file)
-        root = tree.getroot()
+    # Stream meshes straight from the zip member (no temp extraction)
+    count = 0
+    for i, mesh_data in enumerate(iter_meshes(three_mf_path, all_parts=True)):
+        print(f"\n  Mesh {i}:")
 
-        ns = {'model': 'http://schemas.microsoft.com/3dmanufacturing/core/2015/02'}
-        meshes = root.findall('.//model:mesh', ns)
+        mesh = trimesh.Trimesh(
+            vertices=mesh_data["vertices"],
+            faces=mesh_data["faces"],
+            process=False
+        )
 
-        for i, mesh_elem in enumerate(meshes):
-            print(f"\n  Mesh {i}:")
+        # Save
+        output_file = output_path / f"mesh_{i}.stl"
+        mesh.export(output_file)
+        print(f"    Vertices: {len(mesh.vertices)}, Faces: {len(mesh.faces)}")
+        print(f"    Saved to {output_file}")
+        count += 1
 
-            # Extract vertices and triangles
-            vertices = []
-            for vertex in mesh_elem.findall('.//model:vertex', ns):
-                x = float(vertex.get('x'))
-                y = float(vertex.get('y'))
-                z = float(vertex.get('z'))
-                vertices.append([x, y, z])
-
-            faces = []
-            for triangle in mesh_elem.findall('.//model:triangle', ns):
-                v1 = int(triangle.get('v1'))
-                v2 = int(triangle.get('v2'))
-                v3 = int(triangle.get('v3'))
-                faces.append([v1, v2, v3])
-
-            # Create mesh
-            import numpy as np
-            mesh = trimesh.Trimesh(
-                vertices=np.array(vertices),
-                faces=np.array(faces)
-            )
-
-            # Save
-            output_file = output_path / f"mesh_{i}.stl"
-            mesh.export(output_file)
-            print(f"    Vertices: {len(vertices)}, Faces: {len(faces)}")
-            print(f"    Saved to {output_file}")
-
-    # Cleanup
-    import shutil
-    shutil.rmtree(temp_dir)
-
-    print(f"\n✓ Extracted {len(meshes)} meshes")
+    print(f"\n✓ Extracted {count} meshes")
 
 
 if __name__ == "__main__":
@@ -154,6 +137,7 @@ if __name__ == "__main__":
         print("Usage:")
         print("  Unpack:   3mf_manipulation.py unpack <input.3mf> [output_dir]")
         print("  Modify:   3mf_manipulation.py modify <unpacked_dir> <key> <value> ...")
+        print("  Metadata: 3mf_manipulation.py metadata <input.3mf> <key> <value> ...")
         print("  Repack:   3mf_manipulation.py repack <unpacked_dir> <output.3mf>")
         print("  Extract:  3mf_manipulation.py extract <input.3mf> [output_dir]")
         sys.exit(1)
@@ -173,6 +157,14 @@ if __name__ == "__main__":
                 metadata[sys.argv[i]] = sys.argv[i+1]
         modify_metadata(unpacked_dir, metadata)
 
+    elif command == "metadata":
+        input_file = sys.argv[2]
+        metadata = {}
+        for i in range(3, len(sys.argv), 2):
+            if i+1 < len(sys.argv):
+                metadata[sys.argv[i]] = sys.argv[i+1]
+        set_metadata(input_file, metadata)
+
     elif command == "repack":
         unpacked_dir = sys.argv[2]
         output_file = sys.argv[3]
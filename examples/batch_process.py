@@ -5,54 +5,88 @@ Example: Batch processing workflows
 
 import sys
 from pathlib import Path
-from multiprocessing import Pool, cpu_count
-import trimesh
+
+# Make the repository packages importable when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mesh_tools.batch import DEFAULT_TIMEOUT, format_result, run_batch
+from mesh_tools.loader import load_mesh
+from mesh_tools.quick_repair import QUICK_REPAIR_VERSION, quick_repair_mesh
+from mesh_tools.result_cache import default_cache as result_cache
+from mesh_tools.simplify import simplify_mesh
+from mesh_tools.validate import validate_file, write_report
+from threeMF_tools.writer import export_mesh
+
+# Per-run result log in each output directory, used to resume interrupted runs
+BATCH_LOG = "batch_log.jsonl"
+
 
 def process_single_repair(input_file):
     """Repair a single mesh"""
-    try:
-        mesh = trimesh.load(str(input_file))
+    input_file = Path(input_file)
+    output_file = Path("repaired") / input_file.name
+    output_file.parent.mkdir(exist_ok=True)
 
-        # Basic repair
-        mesh.remove_duplicate_faces()
-        mesh.remove_degenerate_faces()
-        mesh.fix_normals()
-        mesh.fill_holes()
+    # Skip meshes whose identical bytes were already repaired
+    cache_key = result_cache().key(
+        "batch.repair", [input_file], {"format": output_file.suffix},
+        tool=f"quick_repair {QUICK_REPAIR_VERSION}"
+    )
+    if result_cache().fetch(cache_key, output_file):
+        return "cached"
 
-        # Output
-        output_file = Path("repaired") / input_file.name
-        output_file.parent.mkdir(exist_ok=True)
-        mesh.export(str(output_file))
+    mesh = load_mesh(input_file)
 
-        return f"✓ {input_file.name}"
-    except Exception as e:
-        return f"✗ {input_file.name}: {e}"
+    # Basic repair: weld, clean, orient and fill in one pass
+    mesh, info = quick_repair_mesh(mesh)
 
+    # Output
+    mesh.export(str(output_file))
+    result_cache().store(cache_key, output_file)
 
-def process_single_simplify(args):
+    return (f"{info['holes_filled']} holes filled, {info['flipped_faces']} faces flipped, "
+            f"{info['duplicate_faces'] + info['degenerate_faces']} faces removed")
+
+
+def process_single_simplify(input_file, target_percent):
     """Simplify a single mesh"""
-    input_file, target_percent = args
+    input_file = Path(input_file)
+    mesh = load_mesh(input_file)
+    original_faces = len(mesh.faces)
+
+    # Simplify (in parallel chunks when the batch itself runs serially)
+    target_faces = int(original_faces * target_percent / 100)
+    simplified, _ = simplify_mesh(mesh, target_faces)
 
-    try:
-        mesh = trimesh.load(str(input_file))
-        original_faces = len(mesh.faces)
+    # Output
+    output_file = Path("simplified") / input_file.name
+    output_file.parent.mkdir(exist_ok=True)
+    simplified.export(str(output_file))
 
-        # Simplify
-        target_faces = int(original_faces * target_percent / 100)
-        simplified = mesh.simplify_quadratic_decimation(target_faces)
+    reduction = ((original_faces - len(simplified.faces)) / original_faces * 100)
+    return f"{original_faces} → {len(simplified.faces)} faces ({reduction:.1f}% reduction)"
 
-        # Output
-        output_file = Path("simplified") / input_file.name
-        output_file.parent.mkdir(exist_ok=True)
-        simplified.export(str(output_file))
 
-        reduction = ((original_faces - len(simplified.faces)) / original_faces * 100)
-        return f"✓ {input_file.name}: {original_faces} → {len(simplified.faces)} faces ({reduction:.1f}% reduction)"
-    except Exception as e:
-        return f"✗ {input_file.name}: {e}"
+def process_single_convert(input_file, output_dir, output_format):
+    """Convert a single mesh"""
+    input_file = Path(input_file)
+    mesh = load_mesh(input_file)
+    output_file = Path(output_dir) / f"{input_file.stem}.{output_format}"
+    export_mesh(mesh, str(output_file))
+    return ""
 
 
-def batch_repair(input_dir, parallel=True, workers=None):
+def print_summary(results, verb):
+    """Print the result list and success count"""
+    print("\nResults:")
+    for record in results:
+        print(f"  {format_result(record)}")
+
+    success_count = sum(1 for r in results if r["ok"])
+    print(f"\n✓ Complete: {success_count}/{len(results)} {verb}")
+
+
+def batch_repair(input_dir, parallel=True, workers=None, timeout=DEFAULT_TIMEOUT, resume=True):
     """Repair all meshes in directory"""
     input_path = Path(input_dir)
     mesh_files = list(input_path.glob("*.stl")) + list(input_path.glob("*.obj"))
@@ -65,26 +99,15 @@ def batch_repair(input_dir, parallel=True, workers=None):
     print(f"Mode: {'Parallel' if parallel else 'Sequential'}")
     print("")
 
-    if parallel:
-        if workers is None:
-            workers = min(cpu_count(), len(mesh_files))
-
-        print(f"Using {workers} workers")
-        with Pool(workers) as pool:
-            results = pool.map(process_single_repair, mesh_files)
-    else:
-        results = [process_single_repair(f) for f in mesh_files]
-
-    # Print results
-    print("\nResults:")
-    for result in results:
-        print(f"  {result}")
-
-    success_count = sum(1 for r in results if r.startswith("✓"))
-    print(f"\n✓ Complete: {success_count}/{len(mesh_files)} successful")
+    results = run_batch(
+        process_single_repair, mesh_files, parallel=parallel, workers=workers,
+        timeout=timeout, log_path=Path("repaired") / BATCH_LOG, resume=resume
+    )
+    print_summary(results, "successful")
 
 
-def batch_simplify(input_dir, target_percent=50, parallel=True, workers=None):
+def batch_simplify(input_dir, target_percent=50, parallel=True, workers=None,
+                   timeout=DEFAULT_TIMEOUT, resume=True):
     """Simplify all meshes in directory"""
     input_path = Path(input_dir)
     mesh_files = list(input_path.glob("*.stl")) + list(input_path.glob("*.obj"))
@@ -98,28 +121,16 @@ def batch_simplify(input_dir, target_percent=50, parallel=True, workers=None):
     print(f"Mode: {'Parallel' if parallel else 'Sequential'}")
     print("")
 
-    args = [(f, target_percent) for f in mesh_files]
-
-    if parallel:
-        if workers is None:
-            workers = min(cpu_count(), len(mesh_files))
-
-        print(f"Using {workers} workers")
-        with Pool(workers) as pool:
-            results = pool.map(process_single_simplify, args)
-    else:
-        results = [process_single_simplify(a) for a in args]
-
-    # Print results
-    print("\nResults:")
-    for result in results:
-        print(f"  {result}")
-
-    success_count = sum(1 for r in results if r.startswith("✓"))
-    print(f"\n✓ Complete: {success_count}/{len(mesh_files)} successful")
+    results = run_batch(
+        process_single_simplify, mesh_files, args=(target_percent,),
+        parallel=parallel, workers=workers, timeout=timeout,
+        log_path=Path("simplified") / BATCH_LOG, resume=resume
+    )
+    print_summary(results, "successful")
 
 
-def batch_convert(input_dir, output_format, parallel=True):
+def batch_convert(input_dir, output_format, parallel=True, workers=None,
+                  timeout=DEFAULT_TIMEOUT, resume=True):
     """Convert all meshes to specified format"""
     input_path = Path(input_dir)
     output_dir = Path(f"converted_{output_format}")
@@ -137,30 +148,15 @@ def batch_convert(input_dir, output_format, parallel=True):
 
     print(f"Converting {len(mesh_files)} files to {output_format}")
 
-    def convert_file(input_file):
-        try:
-            mesh = trimesh.load(str(input_file))
-            output_file = output_dir / f"{input_file.stem}.{output_format}"
-            mesh.export(str(output_file))
-            return f"✓ {input_file.name}"
-        except Exception as e:
-            return f"✗ {input_file.name}: {e}"
-
-    if parallel:
-        with Pool(cpu_count()) as pool:
-            results = pool.map(convert_file, mesh_files)
-    else:
-        results = [convert_file(f) for f in mesh_files]
-
-    # Print results
-    for result in results:
-        print(f"  {result}")
-
-    success_count = sum(1 for r in results if r.startswith("✓"))
-    print(f"\n✓ Complete: {success_count}/{len(mesh_files)} converted")
+    results = run_batch(
+        process_single_convert, mesh_files, args=(str(output_dir), output_format),
+        parallel=parallel, workers=workers, timeout=timeout,
+        log_path=output_dir / BATCH_LOG, resume=resume
+    )
+    print_summary(results, "converted")
 
 
-def batch_validate(input_dir):
+def batch_validate(input_dir, parallel=True, workers=None, report=None):
     """Validate all meshes and report issues"""
     input_path = Path(input_dir)
     mesh_files = list(input_path.glob("*.stl")) + list(input_path.glob("*.obj"))
@@ -171,32 +167,20 @@ def batch_validate(input_dir):
 
     print(f"Validating {len(mesh_files)} meshes\n")
 
-    issues = []
+    results = run_batch(validate_file, mesh_files, parallel=parallel, workers=workers)
 
-    for mesh_file in mesh_files:
-        try:
-            mesh = trimesh.load(str(mesh_file))
-
-            file_issues = []
-            if not mesh.is_watertight:
-                file_issues.append("not watertight")
-            if len(mesh.vertices) != len(mesh.unique_vertices):
-                dupes = len(mesh.vertices) - len(mesh.unique_vertices)
-                file_issues.append(f"{dupes} duplicate vertices")
-            if not mesh.is_winding_consistent:
-                file_issues.append("inconsistent winding")
-
-            if file_issues:
-                print(f"✗ {mesh_file.name}")
-                for issue in file_issues:
-                    print(f"    - {issue}")
-                issues.append((mesh_file.name, file_issues))
-            else:
-                print(f"✓ {mesh_file.name}")
-
-        except Exception as e:
-            print(f"✗ {mesh_file.name}: {e}")
-            issues.append((mesh_file.name, [str(e)]))
+    rows = []
+    issues = []
+    for record in sorted(results, key=lambda r: r["file"]):
+        name = Path(record["file"]).name
+        if record["ok"]:
+            rows.append({"file": record["file"], **record["result"]})
+            file_issues = record["result"]["issues"]
+        else:
+            rows.append({"file": record["file"], "error": record["message"]})
+            file_issues = [record["message"]]
+        if file_issues:
+            issues.append((name, file_issues))
 
     print(f"\n{'='*50}")
     print(f"Summary: {len(mesh_files) - len(issues)}/{len(mesh_files)} valid")
@@ -206,6 +190,9 @@ def batch_validate(input_dir):
         for filename, file_issues in issues:
             print(f"  {filename}: {', '.join(file_issues)}")
 
+    if report:
+        print(f"\nReport written: {write_report(rows, report)}")
+
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
@@ -213,8 +200,10 @@ if __name__ == "__main__":
         print("  Repair:    batch_process.py repair <input_dir> [--parallel] [--workers N]")
         print("  Simplify:  batch_process.py simplify <input_dir> [--percent N] [--parallel]")
         print("  Convert:   batch_process.py convert <input_dir> <format> [--parallel]")
-        print("  Validate:  batch_process.py validate <input_dir>")
+        print("  Validate:  batch_process.py validate <input_dir> [--parallel] [--report FILE.json|csv]")
         print("\nFormats: stl, obj, ply, off, 3mf")
+        print(f"\nOptions: --timeout SECONDS (per file, default {DEFAULT_TIMEOUT})")
+        print(f"         --restart (ignore {BATCH_LOG} and reprocess every file)")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -226,26 +215,35 @@ if __name__ == "__main__":
     if "--workers" in sys.argv:
         idx = sys.argv.index("--workers")
         workers = int(sys.argv[idx + 1])
+    timeout = DEFAULT_TIMEOUT
+    if "--timeout" in sys.argv:
+        idx = sys.argv.index("--timeout")
+        timeout = float(sys.argv[idx + 1])
+    resume = "--restart" not in sys.argv
 
     if command == "repair":
-        batch_repair(input_dir, parallel, workers)
+        batch_repair(input_dir, parallel, workers, timeout, resume)
 
     elif command == "simplify":
         percent = 50
         if "--percent" in sys.argv:
             idx = sys.argv.index("--percent")
             percent = int(sys.argv[idx + 1])
-        batch_simplify(input_dir, percent, parallel, workers)
+        batch_simplify(input_dir, percent, parallel, workers, timeout, resume)
 
     elif command == "convert":
         if len(sys.argv) < 4:
             print("Error: Output format required")
             sys.exit(1)
         output_format = sys.argv[3]
-        batch_convert(input_dir, output_format, parallel)
+        batch_convert(input_dir, output_format, parallel, workers, timeout, resume)
 
     elif command == "validate":
-        batch_validate(input_dir)
+        report = None
+        if "--report" in sys.argv:
+            idx = sys.argv.index("--report")
+            report = sys.argv[idx + 1]
+        batch_validate(input_dir, parallel, workers, report)
 
     else:
         print(f"Unknown command: {command}")
@@ -4,6 +4,11 @@ Example: Boolean operations on meshes
 """
 
 import sys
+from pathlib import Path
+
+# Make the repository packages importable when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 
 def boolean_operation(mesh_a_path, mesh_b_path, operation, output_path):
     """
@@ -12,6 +17,7 @@ def boolean_operation(mesh_a_path, mesh_b_path, operation, output_path):
     Operations: union, difference, intersection
     """
     import trimesh
+    from mesh_tools.boolean import OPERATIONS, boolean
 
     print(f"Loading meshes...")
     mesh_a = trimesh.load(str(mesh_a_path))
@@ -22,18 +28,17 @@ def boolean_operation(mesh_a_path, mesh_b_path, operation, output_path):
 
     print(f"\nPerforming {operation} operation...")
 
-    if operation == "union":
-        result = mesh_a.union(mesh_b)
-    elif operation == "difference":
-        result = mesh_a.difference(mesh_b)
-    elif operation == "intersection":
-        result = mesh_a.intersection(mesh_b)
-    else:
+    if operation not in OPERATIONS:
         print(f"Error: Unknown operation '{operation}'")
         print("Valid operations: union, difference, intersection")
         return None
 
+    result, info = boolean(mesh_a, mesh_b, operation)
+
     print(f"Result: {len(result.vertices)} vertices, {len(result.faces)} faces")
+    print(f"Strategy: {info['strategy']}")
+    for stage, seconds in info["timings"].items():
+        print(f"  {stage:<10} {seconds * 1000:8.1f} ms")
 
     print(f"\nSaving to {output_path}...")
     result.export(str(output_path))
@@ -6,12 +6,16 @@ Example: Convert between different 3D mesh formats
 import sys
 from pathlib import Path
 
+# Make the repository packages importable when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 def convert_mesh(input_file, output_file):
     """
     Convert mesh between formats
     Supports: STL, OBJ, PLY, OFF, 3MF, and more
     """
     import trimesh
+    from threeMF_tools.writer import export_mesh
 
     print(f"Loading {input_file}...")
     mesh = trimesh.load(str(input_file))
@@ -22,7 +26,7 @@ def convert_mesh(input_file, output_file):
     print(f"  Watertight: {mesh.is_watertight}")
 
     print(f"\nExporting to {output_file}...")
-    mesh.export(str(output_file))
+    export_mesh(mesh, str(output_file))
 
     print(f"✓ Conversion complete!")
     return output_file
@@ -33,7 +37,7 @@ def batch_convert(input_dir, output_format):
     Convert all meshes in a directory to a specific format
     """
     import trimesh
-    from pathlib import Path
+    from threeMF_tools.writer import export_mesh
 
     input_path = Path(input_dir)
     output_dir = input_path / f"converted_{output_format}"
@@ -53,7 +57,7 @@ def batch_convert(input_dir, output_format):
 
         try:
             mesh = trimesh.load(str(mesh_file))
-            mesh.export(str(output_file))
+            export_mesh(mesh, str(output_file))
             print(f"  ✓ Saved to {output_file}")
         except Exception as e:
             print(f"  ✗ Error: {e}")
@@ -4,63 +4,57 @@ Example: Repair a broken mesh using MeshFix
 """
 
 import sys
-import subprocess
 from pathlib import Path
 
-def repair_mesh(input_file, output_file=None):
+# Make the repository packages importable when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def repair_mesh(input_file, output_file=None, backend=None):
     """
     Repair mesh using MeshFix and convert to STL
+
+    Runs in-process with pymeshfix (or pymeshlab) when installed and
+    falls back to bin/meshfix otherwise.
     """
-    import trimesh
+    from mesh_tools.loader import load_mesh
+    from mesh_tools.repair import repair_mesh as repair
 
     # Get paths
     input_path = Path(input_file)
     if output_file is None:
         output_file = input_path.stem + "_repaired.stl"
 
-    # Step 1: Run MeshFix
-    print(f"Repairing {input_file}...")
-    meshfix_bin = Path(__file__).parent.parent / "bin" / "meshfix"
-
-    result = subprocess.run(
-        [str(meshfix_bin), str(input_path)],
-        capture_output=True,
-        text=True
-    )
+    def progress(done, total, record):
+        print(f"  Tile {done}/{total}: {record['faces']:,} faces in {record['seconds']:.1f}s")
 
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}")
-        return None
-
-    # MeshFix outputs filename_fixed.off
-    fixed_off = input_path.parent / f"{input_path.stem}_fixed.off"
-
-    if not fixed_off.exists():
-        print("Error: MeshFix did not produce output file")
+    print(f"Repairing {input_file}...")
+    try:
+        # Meshes above TILED_REPAIR_FACES are repaired in tiles
+        mesh, info = repair(load_mesh(str(input_path)), backend, progress=progress)
+    except Exception as e:
+        print(f"Error: {e}")
         return None
 
-    # Step 2: Convert OFF to STL
-    print(f"Converting to STL...")
-    mesh = trimesh.load(str(fixed_off))
     mesh.export(str(output_file))
 
     print(f"✓ Repaired mesh saved to: {output_file}")
+    print(f"  Backend: {info['backend']} ({info['seconds']:.2f}s"
+          + (f", {info['tiles']} tiles)" if "tiles" in info else ")"))
     print(f"  Vertices: {len(mesh.vertices)}")
     print(f"  Faces: {len(mesh.faces)}")
 
-    # Cleanup intermediate file
-    fixed_off.unlink()
-
     return output_file
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: repair_mesh.py <input.stl> [output.stl]")
+        print("Usage: repair_mesh.py <input.stl> [output.stl] [backend]")
         sys.exit(1)
 
     input_file = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    backend = sys.argv[3] if len(sys.argv) > 3 else None
 
-    result = repair_mesh(input_file, output_file)
+    result = repair_mesh(input_file, output_file, backend)
     sys.exit(0 if result else 1)
@@ -4,102 +4,500 @@ MCP Tool Server for 3MF/Mesh/Slicer Automation Toolchain
 Exposes mesh, 3MF, and slicer operations via MCP protocol
 """
 
+import asyncio
 import json
 import sys
 import os
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent directory to path for imports
 TOOLS_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(TOOLS_DIR))
 
+from mesh_tools.result_cache import default_cache as result_cache
+from slicer_tools.slice_cache import slice_cache
+
+# Memory budget for the in-process mesh cache (MB)
+MESH_CACHE_MB = float(os.environ.get("MCP_MESH_CACHE_MB", "1024"))
+
+# Subprocess timeouts (seconds)
+REPAIR_TIMEOUT = 60
+SLICE_TIMEOUT = 300
+
+
+def _mesh_nbytes(mesh) -> int:
+    """Approximate memory held by a loaded mesh or scene"""
+    if hasattr(mesh, "geometry"):
+        return sum(_mesh_nbytes(g) for g in mesh.geometry.values())
+    return mesh.vertices.nbytes + mesh.faces.nbytes
+
+
+class MeshCache:
+    """LRU registry of parsed meshes keyed on path + mtime + size
+
+    `mesh.load` hands out opaque handles; every other mesh tool accepts
+    either a handle or a plain path and resolves it through this cache,
+    so a chain of tools on the same file only parses it once.
+    """
+
+    def __init__(self, budget_bytes: int = None):
+        if budget_bytes is None:
+            budget_bytes = int(MESH_CACHE_MB * 1024 * 1024)
+        self.budget_bytes = budget_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # (path, mtime_ns, size) -> (mesh, nbytes)
+        self._handles = {}             # handle -> real path
+        # Tools run on worker threads; parsing happens outside the lock
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str) -> tuple:
+        st = os.stat(path)
+        return (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+
+    def handle_for(self, path: str) -> str:
+        """Register path and return its opaque handle"""
+        real = os.path.realpath(path)
+        handle = "mesh:" + hashlib.sha1(real.encode()).hexdigest()[:16]
+        with self._lock:
+            self._handles[handle] = real
+        return handle
+
+    def resolve(self, ref: str) -> str:
+        """Turn a handle or path into a filesystem path"""
+        if ref in self._handles:
+            return self._handles[ref]
+        if ref.startswith("mesh:"):
+            raise ValueError(f"Unknown mesh handle: {ref}")
+        return ref
+
+    def get(self, ref: str):
+        """Return the parsed mesh for a handle or path, loading on miss"""
+        path = self.resolve(ref)
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        from mesh_tools.loader import load_mesh
+        mesh = load_mesh(path)
+        with self._lock:
+            self._store(key, mesh)
+        return mesh
+
+    def peek(self, path: str):
+        """(key, mesh) if path's current version is cached, else None; not counted"""
+        try:
+            key = self._key(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        return None if entry is None else (key, entry[0])
+
+    def seed(self, key: tuple, mesh):
+        """Cache a mesh parsed elsewhere (see peek); stale keys just never hit"""
+        with self._lock:
+            self._store(key, mesh)
+
+    def put(self, path: str, mesh) -> str:
+        """Cache a mesh that was just written to path and return its handle"""
+        key = self._key(path)
+        with self._lock:
+            self._store(key, mesh)
+        return self.handle_for(path)
+
+    def _store(self, key: tuple, mesh):
+        # Drop stale versions of the same file before inserting
+        for old in [k for k in self._entries if k[0] == key[0]]:
+            self.bytes -= self._entries.pop(old)[1]
+
+        nbytes = _mesh_nbytes(mesh)
+        if nbytes > self.budget_bytes:
+            return
+        self._entries[key] = (mesh, nbytes)
+        self.bytes += nbytes
+
+        while self.bytes > self.budget_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def merge_counts(self, counts: dict):
+        """Add hit/miss/eviction counts recorded in a worker process"""
+        with self._lock:
+            for name in ("hits", "misses", "evictions"):
+                setattr(self, name, getattr(self, name) + counts.get(name, 0))
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and current memory use"""
+        return {
+            "entries": len(self._entries),
+            "handles": len(self._handles),
+            "bytes": self.bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+MESH_CACHE = MeshCache()
+
+
 class MeshTools:
     """Mesh manipulation tools - low output, file-based operations"""
 
     @staticmethod
-    def load(path: str) -> dict:
-        """Load mesh from file"""
+    def load(path: str, lod: float = None, max_faces: int = None) -> dict:
+        """Load mesh from file and return a handle usable by other mesh tools
+
+        Binary STLs are welded straight from the memory-mapped records
+        (no trimesh parse); the mesh is cached for the tools that follow.
+        mesh.probe gives counts and bounds without building the mesh.
+
+        With lod (a fraction from LOD_LEVELS) or max_faces the handle points
+        at a cached level-of-detail copy instead, so previews and rough
+        checks never load the full mesh after the first time.
+        """
         try:
-            import trimesh
-            mesh = trimesh.load(path)
-            return {"status": "success", "vertices": len(mesh.vertices), "faces": len(mesh.faces)}
+            path = MESH_CACHE.resolve(path)
+            if lod is not None or max_faces is not None:
+                from mesh_tools.lod import lod_path
+
+                level, lod_file = lod_path(path, lod, max_faces)
+                if lod_file is not None:
+                    mesh = MESH_CACHE.get(str(lod_file))
+                    return {
+                        "status": "success",
+                        "handle": MESH_CACHE.handle_for(str(lod_file)),
+                        "lod": level,
+                        "vertices": len(mesh.vertices),
+                        "faces": len(mesh.faces),
+                        "bounds": mesh.bounds.tolist(),
+                        "extents": mesh.extents.tolist(),
+                    }
+
+            mesh = MESH_CACHE.get(path)
+            return {
+                "status": "success",
+                "handle": MESH_CACHE.handle_for(path),
+                "vertices": len(mesh.vertices),
+                "faces": len(mesh.faces),
+                "bounds": mesh.bounds.tolist(),
+                "extents": mesh.extents.tolist(),
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def lod(path: str) -> dict:
+        """Build (once) and list the level-of-detail pyramid of a mesh"""
+        try:
+            from mesh_tools.lod import build_lods
+            from mesh_tools.probe import probe
+
+            levels = build_lods(MESH_CACHE.resolve(path))
+            return {
+                "status": "success",
+                "levels": [{"lod": level, "handle": MESH_CACHE.handle_for(str(lod_file)),
+                            "faces": probe(str(lod_file))["faces"]}
+                           for level, lod_file in sorted(levels.items(), reverse=True)],
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def probe(path: str, bounds: bool = False) -> dict:
+        """Counts, format and optional bounds from file headers, without loading"""
+        try:
+            from mesh_tools.probe import probe
+            return {"status": "success", **probe(MESH_CACHE.resolve(path), bounds)}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
     @staticmethod
     def save(mesh_data: str, output_path: str) -> dict:
-        """Save mesh to file (mesh_data is path to existing mesh)"""
+        """Save mesh to file (mesh_data is a handle or path to existing mesh)"""
         try:
-            import trimesh
-            mesh = trimesh.load(mesh_data)
-            mesh.export(output_path)
-            return {"status": "success", "path": output_path}
+            from threeMF_tools.writer import export_mesh
+            mesh = MESH_CACHE.get(mesh_data)
+            export_mesh(mesh, output_path)
+            handle = MESH_CACHE.put(output_path, mesh)
+            return {"status": "success", "path": output_path, "handle": handle}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
     @staticmethod
-    def repair(input_path: str, output_path: str = None) -> dict:
-        """Repair mesh using MeshFix"""
-        import subprocess
+    def _repair_command(input_path: str, output_path: str = None) -> tuple:
+        """Build the MeshFix command line; returns (argv, output_path, cache_key)"""
+        from mesh_tools.repair import MESHFIX_BIN
+
+        input_path = MESH_CACHE.resolve(input_path)
         if not output_path:
             output_path = input_path.replace('.stl', '_repaired.stl')
 
-        meshfix_bin = TOOLS_DIR / "bin" / "meshfix"
-        if not meshfix_bin.exists():
-            return {"status": "error", "message": "MeshFix binary not found"}
+        if not MESHFIX_BIN.exists():
+            raise FileNotFoundError("MeshFix binary not found")
+
+        key = result_cache().key("mesh.repair", [input_path],
+                                 {"format": Path(output_path).suffix}, tool=MESHFIX_BIN)
+        return [str(MESHFIX_BIN), input_path, output_path], output_path, key
+
+    @staticmethod
+    def repair(input_path: str, output_path: str = None, backend: str = None,
+               tiled: bool = None) -> dict:
+        """
+        Repair a mesh (input_path may be a handle).
 
+        Runs in-process on arrays with pymeshfix or pymeshlab when
+        installed, otherwise falls back to the bin/meshfix subprocess.
+
+        Args:
+            input_path: Mesh to repair (path or handle)
+            output_path: Repaired mesh (default: <input>_repaired.stl)
+            backend: "pymeshfix", "pymeshlab" or "meshfix" (default: first available)
+            tiled: Repair in octree tiles on a process pool (default: for
+                meshes above TILED_REPAIR_FACES); progress goes to stderr
+        """
+        try:
+            from mesh_tools.repair import backend_name, backend_version, repair_mesh
+
+            backend = backend_name(backend)
+            if backend == "meshfix" and not tiled:
+                cmd, output_path, key = MeshTools._repair_command(input_path, output_path)
+                result = run_command(cmd, output_path, REPAIR_TIMEOUT, key)
+                if result.get("status") == "success":
+                    result["backend"] = backend
+                return result
+
+            input_path = MESH_CACHE.resolve(input_path)
+            if not output_path:
+                output_path = input_path.replace('.stl', '_repaired.stl')
+            key = result_cache().key("mesh.repair", [input_path],
+                                     {"format": Path(output_path).suffix, "tiled": tiled},
+                                     tool=backend_version(backend))
+            if result_cache().fetch(key, output_path):
+                return {"status": "success", "path": output_path, "backend": backend,
+                        "handle": MESH_CACHE.handle_for(output_path), "cached": True}
+
+            def progress(done, total, record):
+                print(f"mesh.repair {Path(input_path).name}: tile {done}/{total} "
+                      f"({record['faces']:,} faces, {record['seconds']:.1f}s)",
+                      file=sys.stderr, flush=True)
+
+            repaired, info = repair_mesh(MESH_CACHE.get(input_path), backend, tiled, progress)
+            repaired.export(output_path)
+            result_cache().store(key, output_path)
+            handle = MESH_CACHE.put(output_path, repaired)
+            result = {"status": "success", "path": output_path, "handle": handle,
+                      "backend": backend, "seconds": info["seconds"],
+                      "vertices": len(repaired.vertices), "faces": len(repaired.faces)}
+            if "tiles" in info:
+                result["tiles"] = info["tiles"]
+                result["timings"] = info["timings"]
+            return result
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def simplify(input_path: str, output_path: str = None, target_faces: int = None,
+                 max_error: float = None, workers: int = None) -> dict:
+        """
+        Decimate a mesh in parallel spatial chunks (input_path may be a handle).
+
+        Args:
+            input_path: Mesh to simplify (path or handle)
+            output_path: Simplified mesh (default: <input>_simplified.stl)
+            target_faces: Face count to reach
+            max_error: Largest allowed deviation from the input, in mesh
+                units (instead of target_faces)
+            workers: Processes for the chunks (default: CPU count)
+        """
         try:
-            result = subprocess.run(
-                [str(meshfix_bin), input_path, "-o", output_path],
-                capture_output=True, text=True, timeout=60
+            from mesh_tools.simplify import backend_version, simplify_mesh
+
+            if (target_faces is None) == (max_error is None):
+                return {"status": "error", "message": "Give exactly one of target_faces or max_error"}
+
+            input_path = MESH_CACHE.resolve(input_path)
+            if not output_path:
+                output_path = input_path.replace('.stl', '_simplified.stl')
+            key = result_cache().key(
+                "mesh.simplify", [input_path],
+                {"target_faces": target_faces, "max_error": max_error,
+                 "format": Path(output_path).suffix},
+                tool=backend_version(),
             )
-            if result.returncode == 0:
-                return {"status": "success", "path": output_path}
-            else:
-                return {"status": "error", "message": result.stderr}
+            if result_cache().fetch(key, output_path):
+                return {"status": "success", "path": output_path,
+                        "handle": MESH_CACHE.handle_for(output_path), "cached": True}
+
+            simplified, info = simplify_mesh(MESH_CACHE.get(input_path), target_faces,
+                                             max_error, workers)
+            simplified.export(output_path)
+            result_cache().store(key, output_path)
+            handle = MESH_CACHE.put(output_path, simplified)
+            result = {"status": "success", "path": output_path, "handle": handle,
+                      "faces_in": info["faces_in"], "faces_out": info["faces_out"],
+                      "chunks": info["chunks"], "timings": info["timings"]}
+            if "error" in info:
+                result["error"] = info["error"]
+            return result
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
     @staticmethod
     def boolean(operation: str, mesh_a_path: str, mesh_b_path: str, output_path: str) -> dict:
-        """Perform boolean operation on two meshes"""
+        """Perform boolean operation on two meshes (handles or paths)"""
+        try:
+            import trimesh
+            from mesh_tools.boolean import OPERATIONS, boolean
+
+            mesh_a_path = MESH_CACHE.resolve(mesh_a_path)
+            mesh_b_path = MESH_CACHE.resolve(mesh_b_path)
+            key = result_cache().key(
+                "mesh.boolean", [mesh_a_path, mesh_b_path],
+                {"operation": operation, "format": Path(output_path).suffix},
+                tool=f"trimesh {trimesh.__version__}",
+            )
+            if result_cache().fetch(key, output_path):
+                return {"status": "success", "path": output_path,
+                        "handle": MESH_CACHE.handle_for(output_path), "cached": True}
+
+            if operation not in OPERATIONS:
+                return {"status": "error", "message": f"Unknown operation: {operation}"}
+
+            mesh_a = MESH_CACHE.get(mesh_a_path)
+            mesh_b = MESH_CACHE.get(mesh_b_path)
+            result, info = boolean(mesh_a, mesh_b, operation)
+
+            result.export(output_path)
+            result_cache().store(key, output_path)
+            handle = MESH_CACHE.put(output_path, result)
+            return {"status": "success", "path": output_path, "handle": handle,
+                    "strategy": info["strategy"], "timings": info["timings"]}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def boolean_many(base_path: str, operand_paths: list, output_path: str,
+                     operation: str = "difference", workers: int = None) -> dict:
+        """
+        Apply one boolean between a base and many operands in memory.
+
+        Args:
+            base_path: Base mesh (path or handle)
+            operand_paths: Operand meshes (paths or handles), e.g. cutters
+            output_path: Result mesh file
+            operation: "difference" (default), "union" or "intersection"
+            workers: Processes for the operand union (default: CPU count)
+        """
         try:
             import trimesh
-            mesh_a = trimesh.load(mesh_a_path)
-            mesh_b = trimesh.load(mesh_b_path)
-
-            if operation == "union":
-                result = mesh_a.union(mesh_b)
-            elif operation == "difference":
-                result = mesh_a.difference(mesh_b)
-            elif operation == "intersection":
-                result = mesh_a.intersection(mesh_b)
-            else:
+            from mesh_tools.boolean import OPERATIONS, boolean_many
+
+            if operation not in OPERATIONS:
                 return {"status": "error", "message": f"Unknown operation: {operation}"}
 
+            base_path = MESH_CACHE.resolve(base_path)
+            operand_paths = [MESH_CACHE.resolve(p) for p in operand_paths]
+            key = result_cache().key(
+                "mesh.boolean_many", [base_path, *operand_paths],
+                {"operation": operation, "format": Path(output_path).suffix},
+                tool=f"trimesh {trimesh.__version__}",
+            )
+            if result_cache().fetch(key, output_path):
+                return {"status": "success", "path": output_path,
+                        "handle": MESH_CACHE.handle_for(output_path), "cached": True}
+
+            result, info = boolean_many(
+                MESH_CACHE.get(base_path), [MESH_CACHE.get(p) for p in operand_paths],
+                operation, workers=workers,
+            )
             result.export(output_path)
-            return {"status": "success", "path": output_path}
+            result_cache().store(key, output_path)
+            handle = MESH_CACHE.put(output_path, result)
+            return {"status": "success", "path": output_path, "handle": handle,
+                    "operands": info["operands"], "skipped": info["skipped"],
+                    "groups": info["groups"], "timings": info["timings"]}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
     @staticmethod
     def transform(mesh_path: str, output_path: str, scale=None, rotate=None, translate=None) -> dict:
-        """Transform mesh (scale/rotate/translate)"""
+        """Transform mesh (scale/rotate/translate); mesh_path may be a handle"""
         try:
             import trimesh
-            import numpy as np
 
-            mesh = trimesh.load(mesh_path)
+            import numpy as np
+            from mesh_tools.transform import compose_matrix, transformed
 
-            if scale:
-                mesh.apply_scale(scale)
+            # Compose scale -> rotate -> translate into one matrix
+            matrix = compose_matrix(scale=scale or 1.0)
             if rotate:
-                mesh.apply_transform(trimesh.transformations.rotation_matrix(*rotate))
+                if len(rotate) == 4 and all(np.isscalar(v) for v in rotate):
+                    # Documented flat form: [angle, x, y, z]
+                    rotate = [rotate[0], rotate[1:]]
+                matrix = trimesh.transformations.rotation_matrix(*rotate) @ matrix
             if translate:
-                mesh.apply_translation(translate)
+                matrix = compose_matrix(translate=translate) @ matrix
 
+            # Cached meshes are shared; transformed() builds a new mesh
+            mesh = transformed(MESH_CACHE.get(mesh_path), matrix)
             mesh.export(output_path)
-            return {"status": "success", "path": output_path}
+            handle = MESH_CACHE.put(output_path, mesh)
+            return {"status": "success", "path": output_path, "handle": handle}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def transform_batch(items: list, output_path: str = None, output_dir: str = None,
+                        instances: bool = True, workers: int = None) -> dict:
+        """
+        Transform many meshes, each by one 4x4 matrix.
+
+        Args:
+            items: [{"path", "matrix" | "scale"/"rotate"/"translate",
+                "output_path"?, "name"?}] or [path, matrix] pairs; paths may be handles
+            output_path: Write every placement into this one .3mf instead
+            output_dir: Folder for per-item outputs without output_path
+            instances: In .3mf mode, write repeated sources once
+            workers: Thread count
+        """
+        try:
+            from mesh_tools.transform import transform_many, transform_to_3mf
+
+            resolved = []
+            for item in items:
+                item = {"path": item[0], "matrix": item[1]} if isinstance(item, (list, tuple)) else dict(item)
+                item["path"] = MESH_CACHE.resolve(item["path"])
+                resolved.append(item)
+
+            if output_path:
+                result = transform_to_3mf(resolved, output_path, load=MESH_CACHE.get,
+                                          workers=workers, instances=instances)
+                return {"status": "success", **result}
+
+            results = transform_many(resolved, output_dir, load=MESH_CACHE.get, workers=workers)
+            errors = [r for r in results if "error" in r]
+            return {
+                "status": "error" if errors else "success",
+                "outputs": [r["output_path"] for r in results if "output_path" in r],
+                "errors": errors,
+            }
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
@@ -123,14 +521,32 @@ class ThreeMFTools:
             return {"status": "error", "message": str(e)}
 
     @staticmethod
-    def modify_metadata(three_mf_path: str, metadata: dict) -> dict:
-        """Modify 3MF metadata (stub - needs lib3mf integration)"""
-        return {"status": "stub", "message": "Metadata modification requires lib3mf Python bindings"}
+    def modify_metadata(three_mf_path: str, metadata: dict, output_path: str = None) -> dict:
+        """Set/remove 3MF model metadata in place (other members copied raw)"""
+        try:
+            from threeMF_tools.metadata import modify_metadata
+            path = modify_metadata(three_mf_path, metadata, output_path=output_path)
+            return {"status": "success", "path": path, "updated": sorted(metadata)}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
 
     @staticmethod
-    def replace_mesh(three_mf_path: str, mesh_index: int, new_mesh_path: str) -> dict:
-        """Replace mesh in 3MF file (stub)"""
-        return {"status": "stub", "message": "Mesh replacement requires lib3mf Python bindings"}
+    def replace_mesh(three_mf_path: str, mesh_index: int, new_mesh_path: str,
+                     output_path: str = None) -> dict:
+        """Replace one mesh in a 3MF file (new_mesh_path may be a handle)"""
+        try:
+            from threeMF_tools.splice import replace_mesh
+
+            mesh = MESH_CACHE.get(new_mesh_path)
+            if hasattr(mesh, "geometry"):
+                import trimesh
+                mesh = trimesh.util.concatenate(mesh.dump())
+
+            result = replace_mesh(three_mf_path, int(mesh_index), mesh.vertices, mesh.faces,
+                                  output_path=output_path)
+            return {"status": "success", **result}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
 
     @staticmethod
     def repack(unpacked_dir: str, output_file: str) -> dict:
@@ -148,30 +564,284 @@ class ThreeMFTools:
             return {"status": "error", "message": str(e)}
 
 
+def run_command(cmd: list, output_path: str, timeout: float, cache_key: str = None,
+                cache=None) -> dict:
+    """Run an external tool (or reuse a cached result) and report its output path"""
+    import subprocess
+
+    cache = cache or result_cache()
+    if cache_key and cache.fetch(cache_key, output_path):
+        return {"status": "success", "path": output_path, "cached": True}
+
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if result.returncode == 0:
+        if cache_key and os.path.exists(output_path):
+            cache.store(cache_key, output_path)
+        return {"status": "success", "path": output_path}
+    return {"status": "error", "message": result.stderr}
+
+
+async def run_command_async(cmd: list, output_path: str, timeout: float,
+                            cache_key: str = None, cache=None) -> dict:
+    """Async variant of run_command that doesn't block the event loop"""
+    loop = asyncio.get_running_loop()
+    cache = cache or result_cache()
+    if cache_key and await loop.run_in_executor(None, cache.fetch, cache_key, output_path):
+        return {"status": "success", "path": output_path, "cached": True}
+
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return {"status": "error", "message": f"Command '{cmd[0]}' timed out after {timeout} seconds"}
+
+    if proc.returncode == 0:
+        if cache_key and os.path.exists(output_path):
+            await loop.run_in_executor(None, cache.store, cache_key, output_path)
+        return {"status": "success", "path": output_path}
+    return {"status": "error", "message": stderr.decode(errors="replace")}
+
+
 class SlicerTools:
     """Slicer integration tools"""
 
+    @staticmethod
+    def _cura_command(model_path: str, profile_path: str, output_gcode: str) -> tuple:
+        """Build the CuraEngine command line; returns (argv, output_gcode, cache_key)"""
+        cura_bin = Path(os.environ.get("CURAENGINE", TOOLS_DIR / "bin" / "curaengine"))
+        if not cura_bin.exists():
+            raise FileNotFoundError("CuraEngine binary not found")
+
+        cmd = [str(cura_bin), "slice", "-j", profile_path, "-o", output_gcode, "-l", model_path]
+        # Keyed on geometry, not file bytes, so re-exported models still hit
+        key = slice_cache().key(model_path, profile_path, cura_bin)
+        return cmd, output_gcode, key
+
+    @staticmethod
+    def _attach_analysis(result: dict) -> dict:
+        """Add the G-code analysis (layers, time, filament, bounds) to a successful slice"""
+        if result.get("status") == "success" and os.path.exists(result.get("path", "")):
+            from slicer_tools.gcode_analyzer import analysis_for
+            try:
+                result["analysis"] = analysis_for(result["path"])
+            except Exception as e:
+                result["analysis_error"] = str(e)
+        return result
+
     @staticmethod
     def slice_with_cura(model_path: str, profile_path: str, output_gcode: str) -> dict:
         """Slice model using CuraEngine"""
-        import subprocess
+        try:
+            cmd, output_gcode, key = SlicerTools._cura_command(model_path, profile_path, output_gcode)
+            result = run_command(cmd, output_gcode, SLICE_TIMEOUT, key, slice_cache())
+            return SlicerTools._attach_analysis(result)
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
 
-        cura_bin = TOOLS_DIR / "bin" / "curaengine"
-        if not cura_bin.exists():
-            return {"status": "error", "message": "CuraEngine binary not found"}
+    @staticmethod
+    def analyze_gcode(gcode_path: str, filament_diameter: float = None,
+                      filament_density: float = None) -> dict:
+        """Layer count, print time, filament and bounds of a G-code file"""
+        try:
+            from slicer_tools.gcode_analyzer import analysis_for
+            options = {}
+            if filament_diameter:
+                options["filament_diameter"] = filament_diameter
+            if filament_density:
+                options["filament_density"] = filament_density
+            return {"status": "success", "path": gcode_path, **analysis_for(gcode_path, **options)}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def slice_batch(jobs: list, profile_path: str = None, output_dir: str = None,
+                    wait: bool = True, timeout: float = SLICE_TIMEOUT) -> dict:
+        """
+        Slice many models on the local slicing farm.
 
+        Args:
+            jobs: [{"model_path", "profile_path"?, "output_gcode"?, "priority"?}]
+                or plain model paths
+            profile_path: Profile for jobs that don't name one
+            output_dir: Folder for jobs without output_gcode
+                (<stem>.gcode, next to the model by default)
+            wait: Block until all jobs finish; otherwise return job ids at once
+            timeout: Per-job timeout in seconds
+        """
         try:
-            result = subprocess.run(
-                [str(cura_bin), "slice", "-j", profile_path, "-o", output_gcode, "-l", model_path],
-                capture_output=True, text=True, timeout=300
-            )
-            if result.returncode == 0:
-                return {"status": "success", "path": output_gcode}
-            else:
-                return {"status": "error", "message": result.stderr}
+            farm = slice_farm()
+            job_ids = []
+            for job in jobs:
+                if isinstance(job, str):
+                    job = {"model_path": job}
+                model = Path(job["model_path"])
+                output_gcode = job.get("output_gcode") or str(
+                    Path(output_dir or model.parent) / f"{model.stem}.gcode")
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+                cmd, output_gcode, key = SlicerTools._cura_command(
+                    str(model), job.get("profile_path") or profile_path, output_gcode)
+                job_ids.append(farm.submit(cmd, output_gcode, priority=job.get("priority", 0),
+                                           timeout=timeout, cache_key=key, name=model.name))
+            if not wait:
+                return {"status": "success", "jobs": job_ids}
+            return SlicerTools.job_status(job_ids, wait=True)
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def job_status(job_ids: list = None, wait: bool = False) -> dict:
+        """Records of farm jobs (all when job_ids is omitted), optionally waiting for them"""
+        try:
+            farm = slice_farm()
+            if job_ids is None:
+                job_ids = farm.job_ids()
+            records = farm.wait(job_ids) if wait else [farm.status(j) for j in job_ids]
+            records = [SlicerTools._attach_analysis(r) for r in records]
+            failed = [r["id"] for r in records if r["status"] in ("error", "timeout")]
+            return {"status": "error" if failed else "success", "jobs": records, "failed": failed}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def cancel(job_ids: list) -> dict:
+        """Cancel queued farm jobs and kill running ones"""
+        try:
+            farm = slice_farm()
+            cancelled = [job_id for job_id in job_ids if farm.cancel(job_id)]
+            return {"status": "success", "cancelled": cancelled}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def _bambu_command(model_path: str, output_path: str, profile=None, filaments=None,
+                       plate: int = 0) -> tuple:
+        """OrcaSlicer/BambuStudio command line; returns (argv, project path, cache key)"""
+        from slicer_tools.bambu_cli import preset_list, project_path, slice_command
+        from slicer_tools.slice_cache import profile_hash, project_hash
+
+        project = project_path(output_path)
+        cmd = slice_command(model_path, project, profile, filaments, plate)
+        key = slice_cache().key(model_path, None, cmd[0], {
+            "cli": "orca",
+            # Per-object settings in .3mf projects change the G-code, not the geometry
+            "project": project_hash(model_path),
+            "settings": [profile_hash(p) for p in preset_list(profile)],
+            "filaments": [profile_hash(p) for p in preset_list(filaments)],
+            "plate": plate,
+        })
+        return cmd, project, key
+
+    @staticmethod
+    def slice_bambu(model_path: str = None, output_path: str = None, profile=None,
+                    filaments=None, plate: int = 0, jobs: list = None, output_dir: str = None,
+                    printer_ip: str = None, access_code: str = None,
+                    timeout: float = SLICE_TIMEOUT) -> dict:
+        """
+        Slice with a local OrcaSlicer/BambuStudio and optionally upload.
+
+        Args:
+            model_path: Model to slice (or use jobs)
+            output_path: .gcode.3mf project or .gcode (plate 1)
+            profile: Machine + process presets (list or "a.json;b.json")
+            filaments: Filament presets
+            plate: Plate to slice (0 = all)
+            jobs: Batch of {"model_path", "output_path"?, "priority"?} (or
+                paths), sliced in parallel on the slice farm
+            output_dir: Folder for batch jobs without output_path
+                (<stem>.gcode.3mf next to the model by default)
+            printer_ip: Upload each sliced project to this printer (FTPS)
+            access_code: Printer LAN access code (default: $BAMBU_ACCESS_CODE)
+            timeout: Per-slice timeout in seconds
+        """
+        try:
+            from slicer_tools.bambu_cli import finish_slice, upload_to_printer
+
+            if jobs is None:
+                jobs = [{"model_path": model_path, "output_path": output_path}]
+            farm = slice_farm()
+            submitted = []
+            for job in jobs:
+                if isinstance(job, str):
+                    job = {"model_path": job}
+                model = Path(job["model_path"])
+                target = job.get("output_path") or str(
+                    Path(output_dir or model.parent) / f"{model.stem}.gcode.3mf")
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+                try:
+                    cmd, project, key = SlicerTools._bambu_command(
+                        str(model), target, job.get("profile") or profile,
+                        job.get("filaments") or filaments, plate)
+                except Exception as e:
+                    # Bad input (missing model/preset): fail this job only
+                    submitted.append(({"id": None, "name": model.name, "status": "error",
+                                       "message": str(e)}, target))
+                    continue
+                job_id = farm.submit(cmd, project, priority=job.get("priority", 0),
+                                     timeout=timeout, cache_key=key, name=model.name)
+                submitted.append((job_id, target))
+
+            finished = iter(farm.wait([j for j, _ in submitted if isinstance(j, str)]))
+            results = []
+            for job_id, target in submitted:
+                record = next(finished) if isinstance(job_id, str) else job_id
+                if record["status"] == "success":
+                    record.update(finish_slice(record["path"], target))
+                    if record["path"].endswith(".gcode"):
+                        SlicerTools._attach_analysis(record)
+                    if printer_ip and record["status"] == "success":
+                        record["upload"] = upload_to_printer(
+                            record.get("project", record["path"]), printer_ip, access_code)
+                results.append(record)
+
+            failed = [r["id"] or r["name"] for r in results if r["status"] != "success"
+                      or r.get("upload", {}).get("status") == "error"]
+            if model_path and len(results) == 1:
+                return {**results[0], "status": "error" if failed else "success"}
+            return {"status": "error" if failed else "success", "jobs": results, "failed": failed}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    @staticmethod
+    def cache_stats() -> dict:
+        """Report slice cache usage"""
+        return {"status": "success", **slice_cache().stats()}
+
+
+_slice_farm = None
+_slice_farm_lock = threading.Lock()
+
+
+def slice_farm():
+    """Process-wide SliceFarm, started on first use"""
+    global _slice_farm
+    with _slice_farm_lock:
+        if _slice_farm is None:
+            from slicer_tools.slice_farm import SliceFarm
+            slots = os.environ.get("TOOLS_SLICE_SLOTS")
+            _slice_farm = SliceFarm(slots=int(slots) if slots else None, cache=slice_cache())
+        return _slice_farm
+
+
+class ServerTools:
+    """Server introspection tools"""
+
+    @staticmethod
+    def stats() -> dict:
+        """Report mesh cache, result and slice cache, and slice farm counters"""
+        return {
+            "status": "success",
+            "mesh_cache": MESH_CACHE.stats(),
+            "result_cache": result_cache().stats(),
+            "slice_cache": slice_cache().stats(),
+            "slice_farm": _slice_farm.stats() if _slice_farm is not None else None,
+        }
+
 
 # MCP Server Interface
 def handle_tool_call(tool_name: str, arguments: dict) -> dict:
@@ -194,32 +864,189 @@ def handle_tool_call(tool_name: str, arguments: dict) -> dict:
     elif namespace == "slicer":
         if hasattr(SlicerTools, method):
             return getattr(SlicerTools, method)(**arguments)
+    elif namespace == "server":
+        if hasattr(ServerTools, method):
+            return getattr(ServerTools, method)(**arguments)
 
     return {"error": f"Unknown tool: {tool_name}"}
 
 
-def main():
-    """MCP server main loop"""
-    print("3MF Tools MCP Server started", file=sys.stderr)
+def _cache_counts() -> dict:
+    caches = {"mesh_cache": MESH_CACHE, "result_cache": result_cache()}
+    return {name: {counter: getattr(cache, counter) for counter in ("hits", "misses", "evictions")}
+            for name, cache in caches.items()}
+
+
+def process_tool_call(tool_name: str, arguments: dict, meshes: list = ()) -> tuple:
+    """
+    Process pool entry point: run a tool call in a worker.
+
+    meshes are (key, mesh) pairs from the parent's MeshCache.peek; they
+    seed the worker's cache so inputs the parent already parsed aren't
+    parsed again. Workers keep their own cache counters, so the call also
+    returns how much it moved them, for the parent to add to its own.
+
+    Returns:
+        (result, {cache name: {"hits": n, "misses": n, "evictions": n}})
+    """
+    for key, mesh in meshes:
+        MESH_CACHE.seed(key, mesh)
+    before = _cache_counts()
+    result = handle_tool_call(tool_name, arguments)
+    after = _cache_counts()
+    deltas = {name: {counter: after[name][counter] - before[name][counter]
+                     for counter in after[name]}
+              for name in after}
+    return result, deltas
+
+
+# Concurrent dispatch
+# CPU-bound tools run in a process pool so they don't hold the GIL
+PROCESS_TOOLS = {"mesh.boolean", "mesh.transform", "mesh.repair"}
+
+# Tools that wrap an external binary: (command builder, timeout, cache, post-processing)
+SUBPROCESS_TOOLS = {
+    "slicer.slice_with_cura": (SlicerTools._cura_command, SLICE_TIMEOUT, slice_cache,
+                               SlicerTools._attach_analysis),
+}
+
+# Arguments that may carry a mesh handle instead of a path
+HANDLE_ARGS = ("path", "mesh_data", "mesh_a_path", "mesh_b_path", "mesh_path",
+               "input_path", "new_mesh_path", "base_path")
+
+# Max in-flight calls per namespace; override with MCP_CONCURRENCY="mesh=2,slicer=1"
+DEFAULT_CONCURRENCY = {"mesh": max(4, os.cpu_count() or 1), "threeMF": 4, "slicer": 2, "server": 16}
 
-    while True:
+
+def concurrency_limits() -> dict:
+    """Per-namespace limits from DEFAULT_CONCURRENCY and MCP_CONCURRENCY"""
+    limits = dict(DEFAULT_CONCURRENCY)
+    for item in os.environ.get("MCP_CONCURRENCY", "").split(","):
+        if "=" in item:
+            namespace, value = item.split("=", 1)
+            limits[namespace.strip()] = max(1, int(value))
+    return limits
+
+
+class Dispatcher:
+    """Runs tool calls concurrently with per-namespace limits"""
+
+    def __init__(self, limits: dict = None, process_workers: int = None):
+        self.limits = limits or concurrency_limits()
+        self.process_workers = process_workers
+        self._semaphores = {}
+        self._process_pool = None
+
+    def _semaphore(self, namespace: str) -> asyncio.Semaphore:
+        if namespace not in self._semaphores:
+            limit = self.limits.get(namespace, DEFAULT_CONCURRENCY["mesh"])
+            self._semaphores[namespace] = asyncio.Semaphore(limit)
+        return self._semaphores[namespace]
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # Spawn, not fork: forking while the stdin/executor threads hold
+            # locks (import lock, cache lock) can deadlock the workers
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._process_pool
+
+    async def dispatch(self, tool_name: str, arguments: dict) -> dict:
+        """Run one tool call on the right executor"""
+        loop = asyncio.get_running_loop()
+        namespace = str(tool_name).split('.')[0]
+
+        async with self._semaphore(namespace):
+            if tool_name in SUBPROCESS_TOOLS:
+                builder, timeout, cache, finish = SUBPROCESS_TOOLS[tool_name]
+                try:
+                    # Builders hash input files for the cache key; keep that off the loop
+                    cmd, output_path, key = await loop.run_in_executor(
+                        None, lambda: builder(**arguments)
+                    )
+                except Exception as e:
+                    return {"status": "error", "message": str(e)}
+                result = await run_command_async(cmd, output_path, timeout, key, cache())
+                if finish is not None:
+                    # Post-processing reads the output; keep it off the loop
+                    result = await loop.run_in_executor(None, finish, result)
+                return result
+
+            if tool_name in PROCESS_TOOLS:
+                # Worker processes have their own cache, so pass real paths,
+                # plus any of those meshes this process has already parsed
+                try:
+                    arguments = {
+                        key: MESH_CACHE.resolve(value) if key in HANDLE_ARGS else value
+                        for key, value in arguments.items()
+                    }
+                except ValueError as e:
+                    return {"status": "error", "message": str(e)}
+                paths = {arguments[key] for key in HANDLE_ARGS if isinstance(arguments.get(key), str)}
+                meshes = [entry for entry in map(MESH_CACHE.peek, paths) if entry is not None]
+                result, deltas = await loop.run_in_executor(
+                    self.process_pool, process_tool_call, tool_name, arguments, meshes
+                )
+                MESH_CACHE.merge_counts(deltas["mesh_cache"])
+                result_cache().merge_counts(deltas["result_cache"])
+                if result.get("handle") and result.get("path"):
+                    MESH_CACHE.handle_for(result["path"])
+                return result
+
+            return await loop.run_in_executor(None, handle_tool_call, tool_name, arguments)
+
+    async def handle_line(self, line: str):
+        """Parse one request line, run it and write the response"""
+        request_id = None
         try:
-            line = sys.stdin.readline()
+            request = json.loads(line)
+            request_id = request.get("id")
+            result = await self.dispatch(request.get("tool"), request.get("arguments", {}))
+        except Exception as e:
+            result = {"error": str(e)}
+
+        if request_id is not None:
+            result = {"id": request_id, **result}
+        print(json.dumps(result))
+        sys.stdout.flush()
+
+    def close(self):
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+
+
+async def serve():
+    """Read requests from stdin and answer them as they complete"""
+    loop = asyncio.get_running_loop()
+    dispatcher = Dispatcher()
+    stdin_reader = ThreadPoolExecutor(max_workers=1)
+    pending = set()
+
+    try:
+        while True:
+            line = await loop.run_in_executor(stdin_reader, sys.stdin.readline)
             if not line:
                 break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(dispatcher.handle_line(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
 
-            request = json.loads(line)
-            tool_name = request.get("tool")
-            arguments = request.get("arguments", {})
+        if pending:
+            await asyncio.gather(*pending)
+    finally:
+        dispatcher.close()
+        stdin_reader.shutdown()
 
-            result = handle_tool_call(tool_name, arguments)
-            print(json.dumps(result))
-            sys.stdout.flush()
 
-        except Exception as e:
-            error_response = {"error": str(e)}
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+def main():
+    """MCP server main loop"""
+    print("3MF Tools MCP Server started", file=sys.stderr)
+    asyncio.run(serve())
 
 
 if __name__ == "__main__":
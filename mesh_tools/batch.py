@@ -0,0 +1,302 @@
+"""
+Pipelined batch engine for per-file mesh jobs
+
+Jobs are scheduled largest file first so the slowest meshes start
+immediately and small ones fill the gaps at the end. Results stream back
+as they finish, with progress and an ETA based on bytes processed. The
+per-file time limit is enforced from the parent: a worker that overruns
+is killed and replaced, even mid-way through a C extension call.
+
+Every result is appended to a JSON-lines log; re-running the same batch
+skips files whose log entry succeeded for the same file contents and
+arguments, so an interrupted run resumes where it stopped.
+
+Workers must be module-level functions (picklable) with the signature
+worker(input_path: str, *args). They return a short detail message
+(or a JSON-serializable dict of results) on success and raise on failure.
+"""
+
+import hashlib
+import json
+import os
+import signal
+import sys
+import time
+from multiprocessing import Pipe, Process, cpu_count
+from multiprocessing.connection import wait
+from pathlib import Path
+
+# Default per-file time limit in seconds
+DEFAULT_TIMEOUT = 600
+
+
+def job_key(worker, input_path: str, args: tuple) -> str:
+    """Identify a job by worker, arguments and the input file's size/mtime"""
+    st = os.stat(input_path)
+    material = [
+        f"{worker.__module__}.{worker.__qualname__}",
+        list(args),
+        os.path.realpath(input_path),
+        st.st_size,
+        st.st_mtime_ns,
+    ]
+    blob = json.dumps(material, default=str).encode()
+    return hashlib.sha1(blob).hexdigest()
+
+
+def _record(input_path: str, ok: bool, message: str, seconds: float, result=None) -> dict:
+    record = {
+        "file": input_path,
+        "ok": ok,
+        "message": message or "",
+        "seconds": round(seconds, 3),
+    }
+    if result is not None:
+        record["result"] = result
+    return record
+
+
+def run_job(worker, args: tuple, input_path: str) -> dict:
+    """Run one job in this process and return its result record"""
+    start = time.perf_counter()
+    result = None
+    try:
+        message = worker(input_path, *args)
+        if isinstance(message, dict):
+            result, message = message, ""
+        ok = True
+    except Exception as e:
+        message = str(e) or type(e).__name__
+        ok = False
+    return _record(input_path, ok, message, time.perf_counter() - start, result)
+
+
+def _serve(worker, args: tuple, conn):
+    """Worker process loop: run each path received on conn and send back its record"""
+    # Ctrl-C is handled by the parent, which kills its workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            input_path = conn.recv()
+        except EOFError:
+            return
+        if input_path is None:
+            return
+        conn.send(run_job(worker, args, input_path))
+
+
+def _spawn(worker, args: tuple, daemon: bool):
+    parent, child = Pipe()
+    process = Process(target=_serve, args=(worker, args, child), daemon=daemon)
+    process.start()
+    child.close()
+    return process, parent
+
+
+def run_isolated(worker, args: tuple, paths: list, workers: int, timeout: float = None,
+                 daemon: bool = True):
+    """
+    Run jobs in worker processes and yield result records as they finish.
+
+    The time limit is enforced by this (parent) process: a worker still
+    busy when its job's limit expires is killed, which also stops a long
+    call into a C extension, and replaced by a fresh one. A worker that
+    dies mid-job (segfault, OOM kill) fails only that job.
+
+    Args:
+        worker: Module-level function worker(input_path, *args) -> str | dict
+        args: Extra arguments passed to every job
+        paths: Input file paths, started in this order
+        workers: Number of worker processes
+        timeout: Per-file limit in seconds (None or 0 disables it)
+        daemon: Daemonic workers can't start pools of their own; pass False
+            to let a lone worker use nested parallelism (e.g. simplify)
+    """
+    idle = [_spawn(worker, args, daemon) for _ in range(min(workers, len(paths)))]
+    busy = {}   # conn -> (process, input_path, start)
+    queue = list(reversed(paths))
+    try:
+        while queue or busy:
+            while queue and idle:
+                process, conn = idle.pop()
+                input_path = queue.pop()
+                conn.send(input_path)
+                busy[conn] = (process, input_path, time.perf_counter())
+
+            wait_for = None
+            if timeout:
+                first_deadline = min(start for _, _, start in busy.values()) + timeout
+                wait_for = max(first_deadline - time.perf_counter(), 0)
+            ready = wait(list(busy) + [process.sentinel for process, _, _ in busy.values()],
+                         wait_for)
+
+            now = time.perf_counter()
+            for conn, (process, input_path, start) in list(busy.items()):
+                if conn in ready:
+                    try:
+                        record = conn.recv()
+                    except EOFError:
+                        # Closed without a record: the worker died
+                        process.join()
+                    else:
+                        del busy[conn]
+                        idle.append((process, conn))
+                        yield record
+                        continue
+                if not process.is_alive():
+                    message = f"worker exited with code {process.exitcode}"
+                elif timeout and now - start >= timeout:
+                    process.kill()
+                    message = f"timed out after {timeout:g}s"
+                else:
+                    continue
+                process.join()
+                conn.close()
+                del busy[conn]
+                if queue:
+                    idle.append(_spawn(worker, args, daemon))
+                yield _record(input_path, False, message, now - start)
+    finally:
+        for process, conn in idle:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for process, _, _ in busy.values():
+            process.kill()
+        for process, conn in idle + [(process, conn) for conn, (process, _, _) in busy.items()]:
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            conn.close()
+
+
+def read_log(log_path) -> dict:
+    """Return {job key: record} for successful entries in a result log"""
+    done = {}
+    if not log_path or not os.path.exists(log_path):
+        return done
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial last line from an interrupted run
+                continue
+            if record.get("ok") and "key" in record:
+                done[record["key"]] = record
+    return done
+
+
+def format_result(record: dict) -> str:
+    """Render a result record as a one-line ✓/✗ summary"""
+    name = Path(record["file"]).name
+    if record["ok"]:
+        detail = f": {record['message']}" if record["message"] else ""
+        return f"✓ {name}{detail}"
+    return f"✗ {name}: {record['message']}"
+
+
+def _format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def run_batch(worker, files: list, args: tuple = (), parallel: bool = True,
+              workers: int = None, timeout: float = DEFAULT_TIMEOUT,
+              log_path=None, resume: bool = True, stream=sys.stdout) -> list:
+    """
+    Run worker over files and stream progress.
+
+    Args:
+        worker: Module-level function worker(input_path, *args) -> str | dict
+        files: Input file paths
+        args: Extra arguments passed to every job
+        parallel: Use a pool of worker processes (otherwise one job at a
+            time, in a single worker process when timeout is set and in
+            this process when it isn't)
+        workers: Pool size (default: CPU count, capped at the job count)
+        timeout: Per-file limit in seconds (None or 0 disables it),
+            enforced by killing the job's worker process
+        log_path: JSON-lines result log used for resume
+        resume: Skip files that already succeeded according to the log
+        stream: Where progress lines are written
+
+    Returns:
+        List of result records (file, ok, message, seconds, size, key, and
+        result for dict-returning workers), including skipped files
+        marked with "resumed": True
+    """
+    jobs = []
+    for path in files:
+        path = str(path)
+        jobs.append((os.path.getsize(path), path, job_key(worker, path, args)))
+    # Largest first: long jobs start early instead of trailing at the end
+    jobs.sort(key=lambda job: job[0], reverse=True)
+
+    results = []
+    done = read_log(log_path) if resume else {}
+    pending = []
+    for size, path, key in jobs:
+        if key in done:
+            results.append({**done[key], "file": path, "resumed": True})
+        else:
+            pending.append((size, path, key))
+
+    if results:
+        print(f"Resuming: {len(results)} already done, {len(pending)} remaining", file=stream)
+    if not pending:
+        return results
+
+    sizes = {path: size for size, path, _ in pending}
+    keys = {path: key for _, path, key in pending}
+    total_bytes = sum(sizes.values())
+    done_bytes = 0
+    start = time.perf_counter()
+
+    log = None
+    if log_path:
+        Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+        log = open(log_path, "a", encoding="utf-8")
+
+    paths = [path for _, path, _ in pending]
+    outcomes = None
+    try:
+        if parallel:
+            if workers is None:
+                workers = min(cpu_count(), len(paths))
+            print(f"Using {workers} workers", file=stream)
+            outcomes = run_isolated(worker, tuple(args), paths, workers, timeout)
+        elif timeout:
+            # One non-daemonic worker, so the limit can still be enforced
+            # and the job may start pools of its own
+            outcomes = run_isolated(worker, tuple(args), paths, 1, timeout, daemon=False)
+        else:
+            outcomes = (run_job(worker, tuple(args), path) for path in paths)
+
+        for index, record in enumerate(outcomes, 1):
+            record["size"] = sizes[record["file"]]
+            record["key"] = keys[record["file"]]
+            results.append(record)
+            if log:
+                log.write(json.dumps(record) + "\n")
+                log.flush()
+
+            done_bytes += record["size"]
+            elapsed = time.perf_counter() - start
+            remaining = total_bytes - done_bytes
+            eta = elapsed / done_bytes * remaining if done_bytes else 0
+            print(
+                f"[{index}/{len(paths)}] {format_result(record)} "
+                f"({record['seconds']:.1f}s, ETA {_format_eta(eta)})",
+                file=stream, flush=True,
+            )
+    finally:
+        if outcomes is not None:
+            # Stops and reaps the workers
+            outcomes.close()
+        if log:
+            log.close()
+
+    return results
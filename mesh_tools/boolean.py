@@ -0,0 +1,339 @@
+"""
+Boolean operations with spatial early-outs
+
+Before anything reaches the boolean backend the operands are tested for
+overlap, cheapest first:
+
+1. Axis-aligned boxes. Disjoint operands need no backend at all: union
+   is a concatenation, difference returns A, intersection is empty.
+2. Oriented boxes (separating-axis test), which catch diagonal parts
+   whose axis-aligned boxes overlap.
+3. Shells. Each operand is split into connected shells, and only shells
+   whose boxes overlap a shell of the other operand go to the backend.
+   The untouched shells are stitched back onto the result unchanged
+   (union keeps both sides, difference keeps A's, intersection drops them).
+
+Every stage is timed and reported with the result.
+
+boolean_many applies one operation between a base and many operands
+(e.g. a body and 200 cutters): operands that cannot touch the base are
+dropped, the rest are grouped into clusters of overlapping boxes, each
+cluster is unioned in a balanced tree whose levels run in a process
+pool, the clusters are concatenated (their volumes are disjoint) and a
+single boolean against the base finishes the job, all in memory.
+"""
+
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+OPERATIONS = ("union", "difference", "intersection")
+
+# Smallest tree level (total faces) worth starting worker processes for;
+# below this the spawn and import cost outweighs the unions
+POOL_MIN_FACES = 200_000
+
+
+def boxes_overlap(bounds_a, bounds_b) -> bool:
+    """True if two (2, 3) axis-aligned boxes intersect (touching counts)"""
+    return bool(np.all(bounds_a[0] <= bounds_b[1]) and np.all(bounds_b[0] <= bounds_a[1]))
+
+
+def obbs_overlap(obb_a, obb_b) -> bool:
+    """
+    Separating-axis test for two oriented boxes.
+
+    Args:
+        obb_a, obb_b: (transform 4x4, extents (3,)) pairs as given by
+            trimesh's bounding_box_oriented primitive
+    """
+    rot_a, center_a = obb_a[0][:3, :3], obb_a[0][:3, 3]
+    rot_b, center_b = obb_b[0][:3, :3], obb_b[0][:3, 3]
+    half_a = np.asarray(obb_a[1]) / 2
+    half_b = np.asarray(obb_b[1]) / 2
+    offset = center_b - center_a
+
+    axes = [rot_a[:, i] for i in range(3)] + [rot_b[:, i] for i in range(3)]
+    axes += [np.cross(rot_a[:, i], rot_b[:, j]) for i in range(3) for j in range(3)]
+    for axis in axes:
+        norm = np.linalg.norm(axis)
+        if norm < 1e-12:
+            # Parallel edge pair; covered by the face axes
+            continue
+        axis = axis / norm
+        radius_a = np.sum(half_a * np.abs(rot_a.T @ axis))
+        radius_b = np.sum(half_b * np.abs(rot_b.T @ axis))
+        if abs(offset @ axis) > radius_a + radius_b:
+            return False
+    return True
+
+
+def _oriented_box(mesh):
+    box = mesh.bounding_box_oriented
+    return box.primitive.transform, box.primitive.extents
+
+
+def _as_mesh(mesh):
+    """Concatenate a Scene into a single Trimesh"""
+    if hasattr(mesh, "geometry"):
+        return mesh.dump(concatenate=True)
+    return mesh
+
+
+def split_shells(mesh) -> list:
+    """Connected shells of a mesh (the mesh itself if it has only one)"""
+    if mesh.body_count <= 1:
+        return [mesh]
+    return list(mesh.split(only_watertight=False))
+
+
+def _concatenate(meshes: list):
+    import trimesh
+
+    meshes = [m for m in meshes if len(m.faces)]
+    if not meshes:
+        return trimesh.Trimesh()
+    if len(meshes) == 1:
+        return meshes[0]
+    return trimesh.util.concatenate(meshes)
+
+
+def _backend(operation: str, mesh_a, mesh_b):
+    import trimesh
+
+    if operation == "union":
+        return trimesh.boolean.union([mesh_a, mesh_b])
+    if operation == "difference":
+        return trimesh.boolean.difference([mesh_a, mesh_b])
+    return trimesh.boolean.intersection([mesh_a, mesh_b])
+
+
+def _disjoint_result(operation: str, mesh_a, mesh_b):
+    import trimesh
+
+    if operation == "union":
+        return _concatenate([mesh_a, mesh_b])
+    if operation == "difference":
+        return mesh_a
+    return trimesh.Trimesh()
+
+
+def boolean(mesh_a, mesh_b, operation: str):
+    """
+    Boolean operation with overlap early-outs and shell partitioning.
+
+    Args:
+        mesh_a, mesh_b: Trimesh (or Scene) operands
+        operation: "union", "difference" or "intersection"
+
+    Returns:
+        (result Trimesh, info) where info has strategy ("aabb-disjoint",
+        "obb-disjoint", "shells" or "full"), shell counts and per-stage
+        timings in seconds
+    """
+    operation = operation.lower()
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+
+    timings = {}
+    info = {"operation": operation, "timings": timings}
+    mesh_a, mesh_b = _as_mesh(mesh_a), _as_mesh(mesh_b)
+
+    def stage(name, start):
+        timings[name] = round(time.perf_counter() - start, 6)
+
+    start = time.perf_counter()
+    overlap = boxes_overlap(mesh_a.bounds, mesh_b.bounds)
+    stage("aabb", start)
+    if not overlap:
+        info["strategy"] = "aabb-disjoint"
+        return _disjoint_result(operation, mesh_a, mesh_b), info
+
+    start = time.perf_counter()
+    overlap = obbs_overlap(_oriented_box(mesh_a), _oriented_box(mesh_b))
+    stage("obb", start)
+    if not overlap:
+        info["strategy"] = "obb-disjoint"
+        return _disjoint_result(operation, mesh_a, mesh_b), info
+
+    # Shell partitioning: only shells whose boxes meet go to the backend
+    start = time.perf_counter()
+    shells_a = split_shells(mesh_a)
+    shells_b = split_shells(mesh_b)
+    bounds_a = np.array([s.bounds for s in shells_a])
+    bounds_b = np.array([s.bounds for s in shells_b])
+    # (len_a, len_b) pairwise box overlap
+    meets = np.all(
+        (bounds_a[:, None, 0] <= bounds_b[None, :, 1])
+        & (bounds_b[None, :, 0] <= bounds_a[:, None, 1]),
+        axis=2,
+    )
+    touch_a = meets.any(axis=1)
+    touch_b = meets.any(axis=0)
+    stage("partition", start)
+    info["shells"] = {
+        "a": len(shells_a), "b": len(shells_b),
+        "a_active": int(touch_a.sum()), "b_active": int(touch_b.sum()),
+    }
+
+    if not touch_a.any():
+        info["strategy"] = "shells-disjoint"
+        return _disjoint_result(operation, mesh_a, mesh_b), info
+
+    whole = touch_a.all() and touch_b.all()
+    active_a = mesh_a if whole else _concatenate([s for s, t in zip(shells_a, touch_a) if t])
+    active_b = mesh_b if whole else _concatenate([s for s, t in zip(shells_b, touch_b) if t])
+
+    start = time.perf_counter()
+    result = _backend(operation, active_a, active_b)
+    stage("backend", start)
+    info["strategy"] = "full" if whole else "shells"
+    info["backend_faces"] = int(len(active_a.faces) + len(active_b.faces))
+
+    if whole:
+        return result, info
+
+    # Stitch the untouched shells back on
+    start = time.perf_counter()
+    kept = []
+    if operation in ("union", "difference"):
+        kept += [s for s, t in zip(shells_a, touch_a) if not t]
+    if operation == "union":
+        kept += [s for s, t in zip(shells_b, touch_b) if not t]
+    result = _concatenate([result] + kept)
+    stage("stitch", start)
+    return result, info
+
+
+def overlap_groups(bounds: np.ndarray) -> list:
+    """
+    Cluster (N, 2, 3) boxes into groups connected by overlap.
+
+    Boxes in different groups are disjoint, so the union of a group
+    never interacts with another group.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    count = len(bounds)
+    meets = np.all(
+        (bounds[:, None, 0] <= bounds[None, :, 1]) & (bounds[None, :, 0] <= bounds[:, None, 1]),
+        axis=2,
+    )
+    rows, cols = np.nonzero(np.triu(meets, 1))
+    graph = coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(count, count))
+    _, labels = connected_components(graph, directed=False)
+    return [np.flatnonzero(labels == label) for label in np.unique(labels)]
+
+
+def _union_pair(pair):
+    """Process pool worker: union two (vertices, faces) meshes"""
+    import trimesh
+
+    a, b = (trimesh.Trimesh(v, f, process=False) for v, f in pair)
+    result, _ = boolean(a, b, "union")
+    return result.vertices, result.faces
+
+
+def union_tree(groups: list, workers: int = None) -> list:
+    """
+    Union each group of meshes in a balanced binary tree.
+
+    All groups advance one tree level at a time, and the pairwise unions
+    of a level run in a process pool (once a level reaches
+    POOL_MIN_FACES), so n operands take log2(n) rounds instead of n
+    sequential unions.
+
+    Args:
+        groups: Lists of Trimesh
+        workers: Process count (default: CPU count; 1 runs in-process)
+
+    Returns:
+        One Trimesh per group
+    """
+    import trimesh
+    from concurrent.futures import ProcessPoolExecutor
+
+    levels = [[(m.vertices, m.faces) for m in group] for group in groups]
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    try:
+        while any(len(level) > 1 for level in levels):
+            pairs = [(level[i], level[i + 1]) for level in levels for i in range(0, len(level) - 1, 2)]
+            faces = sum(len(a[1]) + len(b[1]) for a, b in pairs)
+            if pool is None and workers > 1 and len(pairs) > 1 and faces >= POOL_MIN_FACES:
+                pool = ProcessPoolExecutor(max_workers=workers,
+                                           mp_context=multiprocessing.get_context("spawn"))
+            merged = iter(pool.map(_union_pair, pairs) if pool else map(_union_pair, pairs))
+            levels = [
+                [next(merged) for _ in range(len(level) // 2)] + level[len(level) // 2 * 2:]
+                for level in levels
+            ]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return [trimesh.Trimesh(*level[0], process=False) for level in levels]
+
+
+def boolean_many(base, operands: list, operation: str = "difference", workers: int = None):
+    """
+    Apply one boolean between a base mesh and many operands.
+
+    Computes base OP (operand_1 | operand_2 | ...): difference removes
+    every operand from the base, intersection keeps the parts of the base
+    inside any operand, union merges everything.
+
+    Args:
+        base: Trimesh (or Scene)
+        operands: Trimesh (or Scene) operands
+        operation: "union", "difference" or "intersection"
+        workers: Processes for the operand union (default: CPU count)
+
+    Returns:
+        (result Trimesh, info) with operand, skipped and group counts, the
+        strategy of the final boolean and per-stage timings in seconds
+    """
+    operation = operation.lower()
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+
+    timings = {}
+    info = {"operation": operation, "operands": len(operands), "timings": timings}
+    base = _as_mesh(base)
+    operands = [m for m in (_as_mesh(m) for m in operands) if len(m.faces)]
+
+    def stage(name, start):
+        timings[name] = round(time.perf_counter() - start, 6)
+
+    # Operands that miss the base cannot change a difference or intersection
+    start = time.perf_counter()
+    if operation != "union":
+        operands = [m for m in operands if boxes_overlap(base.bounds, m.bounds)]
+    info["skipped"] = info["operands"] - len(operands)
+    stage("filter", start)
+    if not operands:
+        info["groups"] = 0
+        info["strategy"] = "aabb-disjoint"
+        return _disjoint_result(operation, base, _concatenate([])), info
+
+    start = time.perf_counter()
+    bounds = np.array([m.bounds for m in operands])
+    # Order along the longest axis so tree neighbours are spatial neighbours
+    axis = np.argmax(np.ptp(bounds.reshape(-1, 3), axis=0))
+    groups = [sorted(group, key=lambda i: bounds[i, 0, axis]) for group in overlap_groups(bounds)]
+    info["groups"] = len(groups)
+    stage("group", start)
+
+    start = time.perf_counter()
+    merged = union_tree([[operands[i] for i in group] for group in groups], workers)
+    tool = _concatenate(merged)
+    stage("union", start)
+
+    start = time.perf_counter()
+    result, final = boolean(base, tool, operation)
+    stage("boolean", start)
+    info["strategy"] = final["strategy"]
+    return result, info
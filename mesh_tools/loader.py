@@ -0,0 +1,30 @@
+"""
+Mesh loading entry point
+
+Binary STLs go through the memory-mapped reader; everything else (ASCII
+STL, OBJ, PLY, OFF, 3MF, ...) is handed to trimesh.load.
+"""
+
+from mesh_tools.stl_reader import binary_triangle_count, load_stl
+
+
+def is_binary_stl(path: str) -> bool:
+    """True for .stl files whose size matches the binary record layout"""
+    return str(path).lower().endswith(".stl") and binary_triangle_count(str(path)) is not None
+
+
+def load_mesh(path: str, **kwargs):
+    """
+    Load a mesh file, using the memory-mapped reader for binary STL.
+
+    kwargs are those of trimesh.load. Binary STLs come back welded, so
+    process defaults to False for them; force="scene" wraps the mesh in
+    a Scene.
+    """
+    import trimesh
+
+    if is_binary_stl(path):
+        force = kwargs.pop("force", None)
+        mesh = load_stl(str(path), **kwargs)
+        return trimesh.Scene(mesh) if force == "scene" else mesh
+    return trimesh.load(str(path), **kwargs)
@@ -0,0 +1,199 @@
+"""
+Level-of-detail pyramids
+
+Previews, bounds checks and collision pre-tests don't need every triangle
+of a 5M-face scan. build_lods decimates a mesh once into a pyramid of
+LOD_LEVELS (fractions of the full face count), each level simplified
+from the one above it with mesh_tools.simplify, and stores the levels
+in a sidecar DiskCache keyed by content hash. Later requests for any
+level of the same content are a hash plus a small file read.
+
+Levels are stored as binary PLY so the cached files can be handed to
+every tool that takes a mesh path. Files are keyed by the digest of
+their bytes and in-memory meshes by mesh_digest, so the same model may
+get one pyramid per source.
+"""
+
+import hashlib
+import os
+import threading
+
+from mesh_tools.result_cache import CACHE_DIR, DiskCache, file_digest
+
+# Fractions of the full face count; 1.0 is the full mesh and isn't stored
+LOD_LEVELS = (1.0, 0.25, 0.05, 0.01)
+
+# Levels are never decimated below this many faces
+MIN_LOD_FACES = 500
+
+LOD_CACHE_MB = float(os.environ.get("TOOLS_LOD_CACHE_MB", "1024"))
+
+# Bump when decimation changes so stale pyramids are not reused
+LOD_VERSION = 2
+
+# One build per digest at a time; concurrent requests wait for it.
+# {digest: [lock, callers holding or waiting on it]}, dropped by the last
+_build_locks = {}
+_build_locks_lock = threading.Lock()
+
+
+class LodCache(DiskCache):
+    """DiskCache of pyramid levels keyed on content digest + level"""
+
+    def __init__(self, root=None, budget_bytes: int = None):
+        if root is None:
+            root = CACHE_DIR / "lod"
+        if budget_bytes is None:
+            budget_bytes = int(LOD_CACHE_MB * 1024 * 1024)
+        super().__init__(root, budget_bytes)
+
+    @staticmethod
+    def key(digest: str, level: float) -> str:
+        material = f"{digest}:{float(level)}:{LOD_VERSION}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+
+_lod_cache = None
+
+
+def lod_cache() -> LodCache:
+    """Process-wide LodCache"""
+    global _lod_cache
+    if _lod_cache is None:
+        _lod_cache = LodCache()
+    return _lod_cache
+
+
+def pick_level(faces: int, max_faces: int, levels=LOD_LEVELS) -> float:
+    """Largest level with at most max_faces faces (else the smallest level)"""
+    fitting = [level for level in levels if faces * level <= max_faces]
+    return max(fitting) if fitting else min(levels)
+
+
+def _digest(source) -> str:
+    from mesh_tools.render import mesh_digest
+
+    if isinstance(source, (str, os.PathLike)):
+        return file_digest(source)
+    return mesh_digest(source)
+
+
+def _full_mesh(source):
+    from mesh_tools.loader import load_mesh
+
+    mesh = load_mesh(str(source)) if isinstance(source, (str, os.PathLike)) else source
+    if hasattr(mesh, "geometry"):
+        mesh = mesh.dump(concatenate=True)
+    return mesh
+
+
+def build_lods(source, levels=LOD_LEVELS, digest: str = None, workers: int = None) -> dict:
+    """
+    Build and store the pyramid for a mesh, skipping levels already cached.
+
+    Args:
+        source: Mesh file path or trimesh.Trimesh/Scene
+        levels: Fractions of the full face count
+        digest: Content digest if already known (see lod_path)
+        workers: Processes for the decimation (default: CPU count)
+
+    Returns:
+        {level: path of the cached PLY} for every level below 1.0
+    """
+    digest = digest or _digest(source)
+    with _build_locks_lock:
+        entry = _build_locks.setdefault(digest, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            return _build_levels(source, levels, digest, workers)
+    finally:
+        with _build_locks_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _build_locks[digest]
+
+
+def _build_levels(source, levels, digest: str, workers: int) -> dict:
+    """build_lods under the digest's lock"""
+    import trimesh
+
+    from mesh_tools.simplify import simplify_arrays
+
+    cache = lod_cache()
+    paths = {level: cache.get(LodCache.key(digest, level), ".ply")
+             for level in levels if level < 1.0}
+    if all(paths.values()):
+        return paths
+
+    mesh = _full_mesh(source)
+    vertices, faces = mesh.vertices, mesh.faces
+    full_faces = len(faces)
+    # Each level is decimated from the one above it, not from the full mesh
+    for level in sorted(paths, reverse=True):
+        target = max(int(full_faces * level), MIN_LOD_FACES)
+        if target < len(faces):
+            vertices, faces, _ = simplify_arrays(vertices, faces, target_faces=target,
+                                                 workers=workers)
+        if paths[level] is None:
+            data = trimesh.Trimesh(vertices, faces, process=False).export(file_type="ply")
+            paths[level] = cache.put_bytes(LodCache.key(digest, level), data, ".ply")
+    return paths
+
+
+def lod_path(source, level: float = None, max_faces: int = None, digest: str = None,
+             full_faces: int = None):
+    """
+    Cached file of one pyramid level, building the pyramid on first use.
+
+    Give either a level from LOD_LEVELS (smaller values snap up to the
+    next level) or max_faces to pick the largest level that fits.
+
+    Args:
+        source: Mesh file path or trimesh.Trimesh/Scene
+        level: Fraction of the full face count
+        max_faces: Face budget instead of a level
+        digest: Content digest if already known: file_digest for paths,
+            mesh_digest for meshes
+        full_faces: Face count of the full mesh if already known
+
+    Returns:
+        (level, path), with path None for level 1.0 (use the full mesh)
+    """
+    if (level is None) == (max_faces is None):
+        raise ValueError("Give exactly one of level or max_faces")
+
+    if max_faces is not None:
+        if full_faces is None:
+            if isinstance(source, (str, os.PathLike)):
+                from mesh_tools.probe import probe
+                full_faces = probe(str(source))["faces"]
+            else:
+                full_faces = len(_full_mesh(source).faces)
+        level = pick_level(full_faces, max_faces)
+    else:
+        fitting = [candidate for candidate in LOD_LEVELS if candidate >= level]
+        level = min(fitting) if fitting else 1.0
+
+    if level >= 1.0:
+        return 1.0, None
+    return level, build_lods(source, digest=digest)[level]
+
+
+def lod_mesh(source, level: float = None, max_faces: int = None, digest: str = None):
+    """
+    lod_path, loaded: a trimesh.Trimesh for the chosen level.
+
+    Returns:
+        (level, mesh); level 1.0 returns the full mesh
+    """
+    import trimesh
+
+    full_faces = None
+    if not isinstance(source, (str, os.PathLike)):
+        source = _full_mesh(source)
+        full_faces = len(source.faces)
+    level, path = lod_path(source, level, max_faces, digest, full_faces)
+    if path is None:
+        return level, _full_mesh(source)
+    return level, trimesh.load(str(path), process=False)
@@ -0,0 +1,256 @@
+"""
+Header-only mesh statistics
+
+Counts come from the cheapest source each format offers: the binary STL
+triangle count, PLY element and OFF count headers, and token counts over
+the raw bytes for ASCII STL, OBJ and 3MF (streamed out of the zip member,
+never parsed into a tree). Bounds are optional because they always need
+a pass over the vertex data.
+"""
+
+import os
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+# Bytes per read when scanning text or zip members
+SCAN_CHUNK = 1 << 20
+
+# Largest PLY header we look for end_header in
+PLY_HEADER_MAX = 1 << 16
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+
+def count_tokens(stream, tokens: list) -> list:
+    """
+    Count occurrences of byte tokens in a stream read chunk by chunk.
+
+    The last len(token) - 1 bytes are carried between chunks, which can
+    never hold a whole token, so nothing is counted twice.
+    """
+    counts = [0] * len(tokens)
+    keep = max(len(t) for t in tokens) - 1
+    tail = b""
+    while True:
+        chunk = stream.read(SCAN_CHUNK)
+        if not chunk:
+            break
+        buf = tail + chunk
+        for i, token in enumerate(tokens):
+            # Only count matches that end inside the new data
+            counts[i] += buf.count(token) - tail.count(token)
+        tail = buf[-keep:] if keep else b""
+    return counts
+
+
+def _bounds(vertices) -> list:
+    """[[min], [max]] of (N, 3) vertices, or None when empty"""
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    if not len(vertices):
+        return None
+    return [vertices.min(axis=0).tolist(), vertices.max(axis=0).tolist()]
+
+
+def probe_stl(path: str, bounds: bool = False) -> dict:
+    """Binary STL count from the header; ASCII STL by counting endfacet"""
+    from mesh_tools.stl_reader import binary_triangle_count, stl_stats
+
+    count = binary_triangle_count(path)
+    if count is not None:
+        result = {"format": "stl-binary", "vertices": None, "faces": count}
+        if bounds:
+            result["bounds"] = stl_stats(path)["bounds"]
+        return result
+
+    with open(path, "rb") as f:
+        faces, = count_tokens(f, [b"endfacet"])
+    result = {"format": "stl-ascii", "vertices": None, "faces": faces}
+    if bounds:
+        import trimesh
+        result["bounds"] = trimesh.load(path, process=False).bounds.tolist()
+    return result
+
+
+def _ply_header(path: str):
+    """Return (format, [(element, count, [(type, name) or ('list', name)])], header bytes)"""
+    with open(path, "rb") as f:
+        head = f.read(PLY_HEADER_MAX)
+    end = head.find(b"end_header")
+    if not head.startswith(b"ply") or end < 0:
+        raise ValueError(f"Not a PLY file: {path}")
+    header_len = head.index(b"\n", end) + 1
+
+    fmt = None
+    elements = []
+    for line in head[:header_len].decode("ascii", "replace").splitlines():
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property" and elements:
+            if words[1] == "list":
+                elements[-1][2].append(("list", words[-1]))
+            else:
+                elements[-1][2].append((words[1], words[-1]))
+    return fmt, elements, header_len
+
+
+def probe_ply(path: str, bounds: bool = False) -> dict:
+    """Counts from the PLY element lines; bounds via memmap (binary) or loadtxt (ASCII)"""
+    fmt, elements, header_len = _ply_header(path)
+    counts = {name: count for name, count, _ in elements}
+    result = {"format": "ply", "vertices": counts.get("vertex"), "faces": counts.get("face")}
+    if not bounds:
+        return result
+
+    result["bounds"] = None
+    if not elements or elements[0][0] != "vertex":
+        return result
+    _, count, props = elements[0]
+    names = [name for _, name in props]
+    if not {"x", "y", "z"} <= set(names):
+        return result
+
+    if fmt == "ascii":
+        # Vertex lines directly follow the header
+        with open(path, "rb") as f:
+            f.seek(header_len)
+            lines = [f.readline() for _ in range(count)]
+        columns = [names.index(axis) for axis in "xyz"]
+        result["bounds"] = _bounds(np.loadtxt(lines, usecols=columns, ndmin=2))
+    elif all(kind != "list" for kind, _ in props):
+        order = "<" if fmt == "binary_little_endian" else ">"
+        dtype = np.dtype([(name, order + PLY_TYPES[kind]) for kind, name in props])
+        records = np.memmap(path, dtype=dtype, mode="r", offset=header_len, shape=(count,))
+        result["bounds"] = _bounds(np.column_stack([records[a] for a in "xyz"]))
+    return result
+
+
+def probe_off(path: str, bounds: bool = False) -> dict:
+    """Counts from the OFF header line"""
+    with open(path, "rb") as f:
+        words = []
+        # Counts follow the OFF keyword, possibly on the same line
+        while len(words) < 3:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"Truncated OFF header: {path}")
+            line = line.split(b"#")[0].split()
+            if line and line[0].endswith(b"OFF"):
+                line = line[1:]
+            words.extend(line)
+        vertices, faces = int(words[0]), int(words[1])
+        result = {"format": "off", "vertices": vertices, "faces": faces}
+        if bounds:
+            lines = []
+            while len(lines) < vertices:
+                line = f.readline()
+                if not line:
+                    break
+                if line.split(b"#")[0].strip():
+                    lines.append(line)
+            result["bounds"] = _bounds(np.loadtxt(lines, usecols=(0, 1, 2), ndmin=2))
+    return result
+
+
+class _Prefixed:
+    """File-like wrapper that yields a prefix before the wrapped stream"""
+
+    def __init__(self, prefix: bytes, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size: int) -> bytes:
+        if self.prefix:
+            data, self.prefix = self.prefix + self.stream.read(size), b""
+            return data
+        return self.stream.read(size)
+
+
+def probe_obj(path: str, bounds: bool = False) -> dict:
+    """Count "v " and "f " records in an OBJ without parsing them"""
+    with open(path, "rb") as f:
+        # Prime with a newline so a first-line record is counted too
+        stream = _Prefixed(b"\n", f)
+        vertices, faces = count_tokens(stream, [b"\nv ", b"\nf "])
+    result = {"format": "obj", "vertices": vertices, "faces": faces}
+    if bounds:
+        import trimesh
+        result["bounds"] = trimesh.load(path, force="mesh", process=False).bounds.tolist()
+    return result
+
+
+def probe_3mf(path: str, bounds: bool = False) -> dict:
+    """Count vertex/triangle/object tags in the streamed model parts"""
+    from threeMF_tools.reader import iter_meshes, model_parts
+
+    vertices = faces = objects = 0
+    with zipfile.ZipFile(path, "r") as zf:
+        for part in model_parts(zf):
+            with zf.open(part) as stream:
+                # "<triangle" also matches "<triangles"; "<vertex" does not match "<vertices"
+                v, t, ts, o = count_tokens(
+                    stream, [b"<vertex", b"<triangle", b"<triangles", b"<object"]
+                )
+            vertices += v
+            faces += t - ts
+            objects += o
+
+    result = {"format": "3mf", "vertices": vertices, "faces": faces, "objects": objects}
+    if bounds:
+        lo = np.full(3, np.inf)
+        hi = np.full(3, -np.inf)
+        for mesh in iter_meshes(path, all_parts=True):
+            if len(mesh["vertices"]):
+                lo = np.minimum(lo, mesh["vertices"].min(axis=0))
+                hi = np.maximum(hi, mesh["vertices"].max(axis=0))
+        result["bounds"] = [lo.tolist(), hi.tolist()] if np.isfinite(lo).all() else None
+    return result
+
+
+PROBES = {
+    ".stl": probe_stl,
+    ".ply": probe_ply,
+    ".off": probe_off,
+    ".obj": probe_obj,
+    ".3mf": probe_3mf,
+}
+
+
+def probe(path: str, bounds: bool = False) -> dict:
+    """
+    Mesh statistics from file headers and lightweight scans.
+
+    Args:
+        path: Mesh file
+        bounds: Also compute the axis-aligned bounds (scans vertex data;
+            3MF bounds are in object coordinates)
+
+    Returns:
+        Dict with format, vertices (None where the format has no shared
+        vertices, e.g. STL), faces, file_size and optionally bounds
+    """
+    suffix = Path(path).suffix.lower()
+    handler = PROBES.get(suffix)
+    if handler is not None:
+        result = handler(str(path), bounds)
+    else:
+        # No cheap path for this format: load it
+        import trimesh
+        mesh = trimesh.load(str(path), force="mesh")
+        result = {"format": suffix.lstrip("."), "vertices": len(mesh.vertices), "faces": len(mesh.faces)}
+        if bounds:
+            result["bounds"] = mesh.bounds.tolist()
+
+    result["file_size"] = os.path.getsize(path)
+    return result
@@ -0,0 +1,343 @@
+"""
+Fused quick repair
+
+The old quick repair called trimesh's merge_vertices, duplicate and
+degenerate face removal, fix_normals and fill_holes one after another,
+and each call invalidated the mesh caches and rebuilt adjacency. Here
+the vertex weld map and one sorted edge table (the same construction as
+validate.py) are built once, and every step works from them:
+
+1. weld vertices by exact position
+2. drop degenerate faces (repeated vertex or zero area)
+3. drop duplicate faces (same three vertices in any order)
+4. sort the directed edges once: shared edges give face adjacency and
+   the winding parity of each face pair, and unshared edges give the
+   boundary
+5. orient: flip faces so each connected patch is consistently wound,
+   via a BFS spanning forest and pointer jumping over it (no per-face
+   Python loop)
+6. fill boundary loops of up to MAX_HOLE_EDGES edges (a triangle, or a
+   fan around the loop centroid); holes pinched at a vertex are split
+   into separate loops first
+7. turn closed components with negative volume inside out
+
+Every step is timed.
+"""
+
+import time
+
+import numpy as np
+
+# Largest boundary loop (in edges) that is filled
+MAX_HOLE_EDGES = 32
+
+# Faces with twice their area below this fraction of the squared bounding
+# box diagonal count as degenerate
+DEGENERATE_TOL = 1e-14
+
+# Bump when the output for the same input changes (cache keys use it)
+QUICK_REPAIR_VERSION = 1
+
+
+def _edge_table(faces: np.ndarray, vertex_count: int):
+    """
+    Sort the directed edges of faces by undirected key.
+
+    Returns:
+        (order, keys, starts, counts): edge i of face f is index 3*f + i
+        before sorting; order sorts them, keys are the sorted undirected
+        keys, and starts/counts delimit the groups of equal keys
+    """
+    a = faces.ravel()
+    b = np.roll(faces, -1, axis=1).ravel()
+    n = max(vertex_count, 1)
+    keys = np.minimum(a, b) * n + np.maximum(a, b)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    if len(keys):
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        counts = np.diff(np.r_[starts, len(keys)])
+    else:
+        starts = counts = np.zeros(0, dtype=np.int64)
+    return order, keys, starts, counts
+
+
+def _orient(faces: np.ndarray, order, starts, counts):
+    """
+    Consistent winding per connected patch.
+
+    Returns:
+        (flip mask, per-face component label)
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+    count = len(faces)
+    a = faces.ravel()
+    b = np.roll(faces, -1, axis=1).ravel()
+    forward = (a < b)[order]
+
+    # Manifold shared edges: the two faces and whether they traverse the
+    # edge in the same direction (parity 1 = one of them must flip)
+    shared = starts[counts == 2]
+    face_i = order[shared] // 3
+    face_j = order[shared + 1] // 3
+    parity = (forward[shared] == forward[shared + 1]).astype(np.int8)
+    # Faces sharing two edges would sum in the sparse matrix; keep one
+    _, unique = np.unique(np.minimum(face_i, face_j) * count + np.maximum(face_i, face_j),
+                          return_index=True)
+    face_i, face_j, parity = face_i[unique], face_j[unique], parity[unique]
+
+    graph = coo_matrix((np.ones(len(face_i)), (face_i, face_j)), shape=(count, count))
+    _, labels = connected_components(graph, directed=False)
+
+    # A virtual node count links to one root per component, so a single
+    # BFS spans the whole forest
+    roots = np.unique(labels, return_index=True)[1]
+    rows = np.r_[face_i, face_j, np.full(len(roots), count)]
+    cols = np.r_[face_j, face_i, roots]
+    # Stored as parity + 1 so zero-parity entries are not dropped
+    data = np.r_[parity, parity, np.zeros(len(roots), dtype=np.int8)] + 1
+    tree = coo_matrix((data, (rows, cols)), shape=(count + 1, count + 1)).tocsr()
+    _, parent = breadth_first_order(tree, count, directed=False, return_predecessors=True)
+
+    parent = parent.astype(np.int64)
+    parent[count] = count
+    # Parity of each face relative to its BFS parent (roots: 0)
+    acc = np.zeros(count + 1, dtype=np.int8)
+    acc[:count] = np.asarray(tree[parent[:count], np.arange(count)]).ravel() - 1
+
+    # Pointer jumping: XOR of the parities along each face's path to its root
+    pointer = parent
+    while np.any(pointer != count):
+        acc = acc ^ acc[pointer]
+        pointer = pointer[pointer]
+    return acc[:count].astype(bool), labels
+
+
+def _split_cycles(edges: list) -> list:
+    """
+    Split a balanced set of directed edges (in == out at every vertex)
+    into simple cycles, cutting a cycle off whenever the walk returns to
+    a vertex already on its path (pinched holes become separate loops).
+    """
+    outgoing = {}
+    for u, v in edges:
+        outgoing.setdefault(u, []).append(v)
+    cycles = []
+    for start in list(outgoing):
+        while outgoing[start]:
+            path = [start]
+            index = {start: 0}
+            node = start
+            while True:
+                nxt = outgoing[node].pop()
+                if nxt not in index:
+                    index[nxt] = len(path)
+                    path.append(nxt)
+                    node = nxt
+                    continue
+                cut = index[nxt]
+                cycles.append(path[cut:])
+                for vertex in path[cut + 1:]:
+                    del index[vertex]
+                path = path[:cut + 1]
+                node = nxt
+                if not outgoing[node]:
+                    # Only possible back at the start, with the path empty
+                    break
+    return cycles
+
+
+def _boundary_loops(edges: np.ndarray, max_edges: int) -> list:
+    """
+    Vertex loops of the directed boundary edges (a, b).
+
+    Boundary components whose vertices have as many edges in as out are
+    split into simple cycles; loops of 3 to max_edges vertices are
+    returned.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    if not len(edges):
+        return []
+    nodes, local = np.unique(edges, return_inverse=True)
+    local = local.reshape(-1, 2)
+    graph = coo_matrix((np.ones(len(local)), (local[:, 0], local[:, 1])),
+                       shape=(len(nodes), len(nodes)))
+    _, labels = connected_components(graph, directed=False)
+    out_degree = np.bincount(local[:, 0], minlength=len(nodes))
+    in_degree = np.bincount(local[:, 1], minlength=len(nodes))
+
+    # Components worth walking: balanced, and small enough to hold loops
+    # of at most max_edges (pinched holes hold several)
+    components = labels.max() + 1
+    unbalanced = np.bincount(labels, weights=out_degree != in_degree, minlength=components) > 0
+    edge_counts = np.bincount(labels[local[:, 0]], minlength=components)
+    wanted = ~unbalanced & (edge_counts >= 3) & (edge_counts <= 4 * max_edges)
+    edge_labels = labels[local[:, 0]]
+    keep = wanted[edge_labels]
+    if not keep.any():
+        return []
+
+    order = np.argsort(edge_labels[keep], kind="stable")
+    grouped = local[keep][order]
+    bounds = np.flatnonzero(np.r_[True, np.diff(edge_labels[keep][order]) != 0, True])
+    loops = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        for cycle in _split_cycles(grouped[lo:hi].tolist()):
+            if 3 <= len(cycle) <= max_edges:
+                loops.append(nodes[cycle])
+    return loops
+
+
+def quick_repair(vertices, faces, max_hole_edges: int = MAX_HOLE_EDGES):
+    """
+    Weld, clean, orient and fill a triangle mesh in one pass.
+
+    Args:
+        vertices: (N, 3) float array
+        faces: (M, 3) integer array
+        max_hole_edges: Largest boundary loop to fill
+
+    Returns:
+        (vertices, faces, info) where info has the count for each step
+        and per-step timings in seconds
+    """
+    from mesh_tools.validate import weld_vertices
+
+    timings = {}
+    info = {"timings": timings}
+
+    def stage(name, start):
+        timings[name] = round(time.perf_counter() - start, 6)
+
+    # 1. Weld
+    start = time.perf_counter()
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    count, inverse = weld_vertices(vertices)
+    welded = np.empty((count, 3), dtype=np.float64)
+    welded[inverse] = vertices
+    info["merged_vertices"] = int(len(vertices) - count)
+    vertices = welded
+    faces = inverse[faces] if len(faces) else faces
+    stage("weld", start)
+
+    # 2. Degenerate faces
+    start = time.perf_counter()
+    repeated = ((faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2])
+                | (faces[:, 2] == faces[:, 0]))
+    corners = vertices[faces]
+    doubled_area = np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0],
+                                           corners[:, 2] - corners[:, 0]), axis=1)
+    scale = np.ptp(vertices, axis=0) if len(vertices) else np.zeros(3)
+    flat = doubled_area <= DEGENERATE_TOL * float(scale @ scale)
+    degenerate = repeated | flat
+    info["degenerate_faces"] = int(degenerate.sum())
+    faces = faces[~degenerate]
+    stage("degenerate", start)
+
+    # 3. Duplicate faces (first occurrence kept)
+    start = time.perf_counter()
+    ordered = np.sort(faces, axis=1)
+    _, first = np.unique(ordered.view(np.dtype((np.void, ordered.itemsize * 3))).ravel(),
+                         return_index=True)
+    info["duplicate_faces"] = int(len(faces) - len(first))
+    faces = faces[np.sort(first)]
+    stage("duplicate", start)
+
+    # 4. Edge table, shared by orientation and hole filling
+    start = time.perf_counter()
+    order, keys, starts, counts = _edge_table(faces, len(vertices))
+    info["non_manifold_edges"] = int((counts > 2).sum())
+    stage("adjacency", start)
+
+    # 5. Orientation
+    start = time.perf_counter()
+    if len(faces):
+        flip, labels = _orient(faces, order, starts, counts)
+    else:
+        flip, labels = np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64)
+    # Boundary edges straight from the table, before flipping (edge 3f + i
+    # starts at corner i of the unflipped face)
+    boundary = order[starts[counts == 1]]
+    face_of = boundary // 3
+    a = faces[face_of, boundary % 3]
+    b = np.roll(faces, -1, axis=1)[face_of, boundary % 3]
+    faces[flip] = faces[flip][:, ::-1]
+    info["flipped_faces"] = int(flip.sum())
+    stage("orient", start)
+
+    # 6. Holes: the patch runs against the (oriented) boundary edges
+    start = time.perf_counter()
+    reversed_edge = flip[face_of]
+    a, b = np.where(reversed_edge, b, a), np.where(reversed_edge, a, b)
+    open_labels = labels[face_of]
+    loops = _boundary_loops(np.column_stack([b, a]), max_hole_edges)
+
+    patches = []
+    new_vertices = []
+    vertex_label = np.zeros(len(vertices), dtype=np.int64)
+    vertex_label[faces.ravel()] = np.repeat(labels, 3)
+    filled_labels = []
+    for loop in loops:
+        filled_labels.append(vertex_label[loop[0]])
+        if len(loop) == 3:
+            patches.append(loop[None, :])
+            continue
+        # Fan around the loop centroid
+        center = len(vertices) + len(new_vertices)
+        new_vertices.append(vertices[loop].mean(axis=0))
+        patches.append(np.column_stack([loop, np.roll(loop, -1), np.full(len(loop), center)]))
+    if patches:
+        patch_faces = np.concatenate(patches)
+        patch_labels = vertex_label[patch_faces[:, 0]]
+        vertices = np.vstack([vertices, np.array(new_vertices).reshape(-1, 3)])
+        faces = np.concatenate([faces, patch_faces])
+        labels = np.concatenate([labels, patch_labels])
+    info["holes_filled"] = len(loops)
+    filled_edges = sum(len(loop) for loop in loops)
+    info["boundary_edges_left"] = int(len(boundary) - filled_edges)
+    stage("fill", start)
+
+    # 7. Inside-out closed components
+    start = time.perf_counter()
+    inverted = 0
+    if len(faces):
+        corners = vertices[faces]
+        signed = np.einsum("ij,ij->i", corners[:, 0], np.cross(corners[:, 1], corners[:, 2]))
+        volume = np.bincount(labels, weights=signed)
+        open_edges = np.bincount(open_labels, minlength=len(volume))
+        open_edges -= np.bincount(np.array(filled_labels, dtype=np.int64),
+                                  weights=[len(loop) for loop in loops],
+                                  minlength=len(volume)).astype(np.int64)
+        flip_component = (volume < 0) & (open_edges == 0)
+        inverted = int(flip_component.sum())
+        if inverted:
+            flip = flip_component[labels]
+            faces[flip] = faces[flip][:, ::-1]
+    info["inverted_components"] = inverted
+    stage("invert", start)
+
+    # Drop vertices nothing references any more
+    used, faces = np.unique(faces, return_inverse=True)
+    vertices = vertices[used]
+    faces = faces.reshape(-1, 3)
+    return vertices, faces, info
+
+
+def quick_repair_mesh(mesh, max_hole_edges: int = MAX_HOLE_EDGES):
+    """
+    quick_repair for a Trimesh (or Scene).
+
+    Returns:
+        (repaired Trimesh, info)
+    """
+    import trimesh
+
+    if hasattr(mesh, "geometry"):
+        mesh = mesh.dump(concatenate=True)
+    vertices, faces, info = quick_repair(mesh.vertices, mesh.faces, max_hole_edges)
+    return trimesh.Trimesh(vertices, faces, process=False), info
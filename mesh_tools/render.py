@@ -0,0 +1,251 @@
+"""
+Headless software preview renderer
+
+Meshes are drawn with a NumPy z-buffer rasterizer: vertices are projected
+orthographically from a fixed camera, every triangle's pixel bounding box
+is expanded into candidate fragments in batches, barycentric tests keep
+the covered ones, and the nearest fragment per pixel wins. Faces are flat
+shaded by a light just above and left of the camera. No OpenGL context
+or display is needed.
+
+Rendered PNGs are cached on disk keyed by mesh contents, camera and
+resolution, so re-rendering an unchanged mesh (the "before" image of a
+repair, the original in the transform tab) costs a hash.
+"""
+
+import hashlib
+import io
+import os
+
+import numpy as np
+
+from mesh_tools.result_cache import CACHE_DIR, DiskCache
+
+# Camera as (elevation, azimuth) in degrees, z up
+DEFAULT_CAMERA = (30.0, 45.0)
+
+# Preview sizes: low renders first, full replaces it
+PREVIEW_TIERS = {
+    "low": (200, 150),
+    "full": (800, 600),
+}
+
+MESH_COLOR = np.array([102, 153, 204], dtype=np.float64)
+BACKGROUND = (245, 245, 245)
+AMBIENT = 0.3
+# Light direction in view space (right, up, toward camera): upper left
+LIGHT = np.array([-0.4, 0.6, 1.0]) / np.linalg.norm([-0.4, 0.6, 1.0])
+
+# Fraction of the image left empty around the mesh
+MARGIN = 0.05
+
+# Candidate fragments per rasterization batch
+FRAGMENT_BATCH = 1 << 22
+
+PREVIEW_CACHE_MB = float(os.environ.get("TOOLS_PREVIEW_CACHE_MB", "256"))
+
+# Bump when rendering changes so old cached images are not reused
+RENDER_VERSION = 1
+
+
+def view_basis(camera=DEFAULT_CAMERA) -> np.ndarray:
+    """
+    Rows (right, up, toward camera) for an orthographic view.
+
+    Projecting a point onto the rows gives its image x, image y and
+    depth (larger is nearer the camera).
+    """
+    elevation, azimuth = np.radians(camera)
+    toward = np.array([
+        np.cos(elevation) * np.sin(azimuth),
+        -np.cos(elevation) * np.cos(azimuth),
+        np.sin(elevation),
+    ])
+    right = np.cross([0.0, 0.0, 1.0], toward)
+    norm = np.linalg.norm(right)
+    right = right / norm if norm > 1e-9 else np.array([1.0, 0.0, 0.0])
+    up = np.cross(toward, right)
+    return np.array([right, up, toward])
+
+
+def _rasterize(px, py, depth, shade, width, height, zbuf, image):
+    """Draw triangles (k, 3) pixel coordinates into zbuf/image in place"""
+    x0, x1, x2 = px.T
+    y0, y1, y2 = py.T
+    area = (y1 - y2) * (x0 - x2) + (x2 - x1) * (y0 - y2)
+    keep = np.abs(area) > 1e-12
+
+    # Pixel-center bounding boxes, clipped to the image
+    xmin = np.clip(np.ceil(px.min(axis=1) - 0.5), 0, width).astype(np.int64)
+    xmax = np.clip(np.floor(px.max(axis=1) - 0.5), -1, width - 1).astype(np.int64)
+    ymin = np.clip(np.ceil(py.min(axis=1) - 0.5), 0, height).astype(np.int64)
+    ymax = np.clip(np.floor(py.max(axis=1) - 0.5), -1, height - 1).astype(np.int64)
+    box_w = np.maximum(xmax - xmin + 1, 0)
+    box_h = np.maximum(ymax - ymin + 1, 0)
+    counts = np.where(keep, box_w * box_h, 0)
+
+    tris = np.flatnonzero(counts)
+    if not len(tris):
+        return
+    ends = np.cumsum(counts[tris])
+
+    # Split into batches of at most FRAGMENT_BATCH fragments (a single
+    # triangle bigger than that is a batch of its own)
+    start = 0
+    while start < len(tris):
+        base = ends[start - 1] if start else 0
+        stop = max(int(np.searchsorted(ends, base + FRAGMENT_BATCH, side="right")), start + 1)
+        batch = tris[start:stop]
+        n = counts[batch]
+        tid = np.repeat(batch, n)
+        offset = np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n)
+        fx = xmin[tid] + offset % box_w[tid]
+        fy = ymin[tid] + offset // box_w[tid]
+
+        cx = fx + 0.5
+        cy = fy + 0.5
+        inv = 1.0 / area[tid]
+        l0 = ((y1[tid] - y2[tid]) * (cx - x2[tid]) + (x2[tid] - x1[tid]) * (cy - y2[tid])) * inv
+        l1 = ((y2[tid] - y0[tid]) * (cx - x2[tid]) + (x0[tid] - x2[tid]) * (cy - y2[tid])) * inv
+        l2 = 1.0 - l0 - l1
+        eps = -1e-9
+        inside = (l0 >= eps) & (l1 >= eps) & (l2 >= eps)
+
+        tid = tid[inside]
+        z = (l0[inside] * depth[tid, 0] + l1[inside] * depth[tid, 1]
+             + l2[inside] * depth[tid, 2])
+        pixel = fy[inside] * width + fx[inside]
+
+        # Nearest fragment per pixel within the batch, then against the buffer
+        order = np.lexsort((-z, pixel))
+        pixel, z, tid = pixel[order], z[order], tid[order]
+        first = np.r_[True, pixel[1:] != pixel[:-1]]
+        pixel, z, tid = pixel[first], z[first], tid[first]
+        closer = z > zbuf[pixel]
+        zbuf[pixel[closer]] = z[closer]
+        image[pixel[closer]] = shade[tid[closer]]
+
+        start = stop
+
+
+def render(vertices, faces, resolution=PREVIEW_TIERS["full"], camera=DEFAULT_CAMERA,
+           frame=None) -> np.ndarray:
+    """
+    Render a flat-shaded preview.
+
+    Args:
+        vertices: (N, 3) float array
+        faces: (M, 3) integer array
+        resolution: (width, height) in pixels
+        camera: (elevation, azimuth) in degrees
+        frame: Points (K, 3) to fit the view to instead of the vertices,
+            e.g. the corners of a larger box so movement stays visible
+
+    Returns:
+        (height, width, 3) uint8 RGB array
+    """
+    width, height = resolution
+    image = np.empty((width * height, 3), dtype=np.uint8)
+    image[:] = BACKGROUND
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    if not len(faces):
+        return image.reshape(height, width, 3)
+
+    basis = view_basis(camera)
+    view = vertices @ basis.T
+
+    # Fit the projected bounds into the image
+    fit = view if frame is None else np.asarray(frame, dtype=np.float64) @ basis.T
+    lo = fit[:, :2].min(axis=0)
+    hi = fit[:, :2].max(axis=0)
+    extent = np.maximum(hi - lo, 1e-12)
+    scale = min(width * (1 - 2 * MARGIN) / extent[0], height * (1 - 2 * MARGIN) / extent[1])
+    center = (lo + hi) / 2
+    sx = (view[:, 0] - center[0]) * scale + width / 2
+    sy = height / 2 - (view[:, 1] - center[1]) * scale
+
+    # Flat shading, two-sided so open meshes still read correctly
+    tri = view[faces]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    lengths[lengths == 0] = 1.0
+    intensity = AMBIENT + (1 - AMBIENT) * np.abs(normals @ LIGHT) / lengths
+    shade = np.clip(MESH_COLOR * intensity[:, None], 0, 255).astype(np.uint8)
+
+    zbuf = np.full(width * height, -np.inf)
+    _rasterize(sx[faces], sy[faces], view[:, 2][faces], shade, width, height, zbuf, image)
+    return image.reshape(height, width, 3)
+
+
+def mesh_digest(mesh) -> str:
+    """Hash of a mesh's vertex and face arrays (scenes are concatenated)"""
+    if hasattr(mesh, "geometry"):
+        mesh = mesh.dump(concatenate=True)
+    h = hashlib.blake2b(digest_size=20)
+    h.update(np.ascontiguousarray(mesh.vertices, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(mesh.faces, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+class PreviewCache(DiskCache):
+    """DiskCache of rendered PNGs keyed on mesh digest + camera + resolution (+ frame)"""
+
+    def __init__(self, root=None, budget_bytes: int = None):
+        if root is None:
+            root = CACHE_DIR / "previews"
+        if budget_bytes is None:
+            budget_bytes = int(PREVIEW_CACHE_MB * 1024 * 1024)
+        super().__init__(root, budget_bytes)
+
+    @staticmethod
+    def key(digest: str, resolution, camera, frame=None) -> str:
+        material = f"{digest}:{tuple(resolution)}:{tuple(camera)}:{RENDER_VERSION}"
+        if frame is not None:
+            frame = np.ascontiguousarray(frame, dtype=np.float64)
+            material += f":{hashlib.sha256(frame.tobytes()).hexdigest()}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+
+_preview_cache = None
+
+
+def preview_cache() -> PreviewCache:
+    """Process-wide PreviewCache"""
+    global _preview_cache
+    if _preview_cache is None:
+        _preview_cache = PreviewCache()
+    return _preview_cache
+
+
+def preview_image(mesh, resolution=PREVIEW_TIERS["full"], camera=DEFAULT_CAMERA, frame=None,
+                  digest: str = None):
+    """
+    Cached preview of a mesh or scene as a PIL image.
+
+    Args:
+        mesh: trimesh.Trimesh or Scene
+        resolution: (width, height)
+        camera: (elevation, azimuth) in degrees
+        frame: Points (K, 3) to fit the view to instead of the vertices,
+            e.g. the corners of a larger box so movement stays visible
+        digest: mesh_digest(mesh) if already known (saves rehashing when
+            rendering several tiers of the same mesh)
+    """
+    from PIL import Image
+
+    if hasattr(mesh, "geometry"):
+        mesh = mesh.dump(concatenate=True)
+    key = PreviewCache.key(digest or mesh_digest(mesh), resolution, camera, frame)
+    cache = preview_cache()
+
+    cached = cache.get(key, ".png")
+    if cached is not None:
+        with Image.open(cached) as image:
+            return image.copy()
+
+    image = Image.fromarray(render(mesh.vertices, mesh.faces, resolution, camera, frame))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    cache.put_bytes(key, buffer.getvalue(), ".png")
+    return image
@@ -0,0 +1,455 @@
+"""
+Mesh repair backends
+
+MeshFix used to run as bin/meshfix, which writes an ASCII OFF file that
+then has to be parsed back; on large meshes that round-trip costs more
+than the repair. The in-process backends take and return NumPy arrays
+instead:
+
+- pymeshfix: the MeshFix library itself (same algorithm as the binary)
+- pymeshlab: MeshLab's cleaning filters (duplicates, non-manifold
+  edges, holes, orientation)
+
+The binary stays as a fallback when neither package is installed.
+TOOLS_REPAIR_BACKEND picks a backend explicitly.
+
+Meshes above TILED_REPAIR_FACES (10M+ triangle scans) are repaired in
+tiles instead of in one piece. An octree over the face centroids splits
+the mesh into leaves of at most TILE_FACES faces. Each leaf is grown by
+an overlap margin and repaired in a worker process, with holes capped at
+MAX_HOLE_EDGES. A tile keeps only the original faces it owns and the new
+patches it is responsible for. The pieces are then welded back together
+by vertex position. Patches that touch the tile's cut edge are caps over
+the cut, not real holes, and are thrown away. A hole wider than the
+overlap can fall into that case and stay open. Tiles get hole filling
+(plus non-manifold edge repair with pymeshlab) but not MeshFix's
+self-intersection cleanup, which re-triangulates across tile borders.
+"""
+
+import multiprocessing
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+TOOLS_DIR = Path(__file__).parent.parent
+MESHFIX_BIN = TOOLS_DIR / "bin" / "meshfix"
+
+# Tried in order; the first one that imports (or exists) is used
+BACKENDS = ("pymeshfix", "pymeshlab", "meshfix")
+DEFAULT_BACKEND = os.environ.get("TOOLS_REPAIR_BACKEND") or None
+
+# Largest hole (in edges) closed by pymeshlab and by tiled repairs
+MAX_HOLE_EDGES = 1000
+
+REPAIR_TIMEOUT = 60
+
+# Meshes above this many faces are repaired in tiles
+TILED_REPAIR_FACES = int(os.environ.get("TOOLS_REPAIR_TILE_THRESHOLD", "2000000"))
+
+# Octree leaf size (faces owned per tile, before the overlap is added)
+TILE_FACES = int(os.environ.get("TOOLS_REPAIR_TILE_FACES", "500000"))
+
+# Overlap added around each tile, as a fraction of its longest side
+TILE_OVERLAP = 0.1
+
+# Octree depth limit (8^8 leaves is far beyond any real mesh)
+OCTREE_DEPTH = 8
+
+
+def _available(backend: str) -> bool:
+    if backend == "meshfix":
+        return MESHFIX_BIN.exists()
+    try:
+        __import__(backend)
+        return True
+    except ImportError:
+        return False
+
+
+def backend_name(backend: str = None) -> str:
+    """
+    Resolve the repair backend to use.
+
+    Args:
+        backend: "pymeshfix", "pymeshlab" or "meshfix" (default:
+            TOOLS_REPAIR_BACKEND, else the first one available)
+
+    Raises:
+        ValueError: unknown backend
+        FileNotFoundError: nothing available (or the requested one is missing)
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend is not None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown repair backend: {backend}")
+        if not _available(backend):
+            raise FileNotFoundError(f"Repair backend not available: {backend}")
+        return backend
+    for candidate in BACKENDS:
+        if _available(candidate):
+            return candidate
+    raise FileNotFoundError("No repair backend: install pymeshfix or pymeshlab, or add bin/meshfix")
+
+
+def backend_version(backend: str) -> str:
+    """Version string for cache keys"""
+    if backend == "meshfix":
+        return str(MESHFIX_BIN)
+    module = __import__(backend)
+    return f"{backend} {getattr(module, '__version__', 'unknown')}"
+
+
+def _pymeshfix(vertices: np.ndarray, faces: np.ndarray):
+    import pymeshfix
+
+    fixer = pymeshfix.MeshFix(vertices, faces)
+    fixer.repair()
+    return fixer.points, fixer.faces
+
+
+def _pymeshlab(vertices: np.ndarray, faces: np.ndarray):
+    import pymeshlab
+
+    ms = pymeshlab.MeshSet()
+    ms.add_mesh(pymeshlab.Mesh(vertex_matrix=vertices, face_matrix=faces))
+    ms.meshing_remove_duplicate_vertices()
+    ms.meshing_remove_duplicate_faces()
+    ms.meshing_remove_null_faces()
+    ms.meshing_repair_non_manifold_edges()
+    ms.meshing_remove_unreferenced_vertices()
+    ms.meshing_close_holes(maxholesize=MAX_HOLE_EDGES)
+    ms.meshing_re_orient_faces_coherently()
+    mesh = ms.current_mesh()
+    return mesh.vertex_matrix(), mesh.face_matrix()
+
+
+def _meshfix_binary(vertices: np.ndarray, faces: np.ndarray, timeout: float = REPAIR_TIMEOUT):
+    """Subprocess fallback: write STL, run bin/meshfix, read its output back"""
+    import trimesh
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "input.stl"
+        output = Path(tmp) / "output.off"
+        trimesh.Trimesh(vertices, faces, process=False).export(source)
+        result = subprocess.run([str(MESHFIX_BIN), str(source), str(output)],
+                                capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr or result.stdout or "MeshFix failed")
+        fixed = trimesh.load(output, force="mesh", process=False)
+        return fixed.vertices, fixed.faces
+
+
+_RUNNERS = {"pymeshfix": _pymeshfix, "pymeshlab": _pymeshlab, "meshfix": _meshfix_binary}
+
+
+def repair_arrays(vertices, faces, backend: str = None):
+    """
+    Repair a triangle mesh given as arrays.
+
+    Args:
+        vertices: (N, 3) float array
+        faces: (M, 3) integer array
+        backend: See backend_name()
+
+    Returns:
+        (vertices, faces, info) where info has the backend used and its
+        time in seconds
+    """
+    backend = backend_name(backend)
+    vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+    faces = np.ascontiguousarray(faces, dtype=np.int32)
+    start = time.perf_counter()
+    vertices, faces = _RUNNERS[backend](vertices, faces)
+    info = {"backend": backend, "seconds": round(time.perf_counter() - start, 6)}
+    return np.asarray(vertices, dtype=np.float64), np.asarray(faces, dtype=np.int64), info
+
+
+def _pymeshfix_tile(vertices: np.ndarray, faces: np.ndarray):
+    import pymeshfix
+
+    # Hole filling only. MeshFix.repair() keeps just the largest component
+    # and fills every hole including the tile's cut edge, and clean()
+    # re-triangulates across faces that other tiles own
+    tin = pymeshfix.PyTMesh()
+    tin.set_quiet(True)
+    tin.load_array(vertices, faces)
+    tin.fill_small_boundaries(nbe=MAX_HOLE_EDGES, refine=True)
+    return tin.return_arrays()
+
+
+def _pymeshlab_tile(vertices: np.ndarray, faces: np.ndarray):
+    import pymeshlab
+
+    # No re-orientation: a tile alone cannot tell which side is outside
+    ms = pymeshlab.MeshSet()
+    ms.add_mesh(pymeshlab.Mesh(vertex_matrix=vertices, face_matrix=faces))
+    ms.meshing_remove_duplicate_faces()
+    ms.meshing_remove_null_faces()
+    ms.meshing_repair_non_manifold_edges()
+    ms.meshing_close_holes(maxholesize=MAX_HOLE_EDGES)
+    mesh = ms.current_mesh()
+    return mesh.vertex_matrix(), mesh.face_matrix()
+
+
+_TILE_RUNNERS = {"pymeshfix": _pymeshfix_tile, "pymeshlab": _pymeshlab_tile}
+
+
+def octree_tiles(centroids: np.ndarray, max_faces: int = TILE_FACES, max_depth: int = OCTREE_DEPTH):
+    """
+    Split face centroids into octree leaves of at most max_faces.
+
+    Leaves are half-open boxes [lo, hi) that cover the root box, so every
+    face has exactly one owner. Empty leaves are dropped.
+
+    Returns:
+        (boxes as a (T, 2, 3) array, per-face owner tile index)
+    """
+    lo = centroids.min(axis=0)
+    hi = centroids.max(axis=0)
+    # Nudge the top face of the root box out so the maximum is inside
+    hi = hi + np.maximum(np.abs(hi), 1.0) * 1e-9
+
+    boxes = []
+    owner = np.empty(len(centroids), dtype=np.int64)
+    stack = [(lo, hi, np.arange(len(centroids)), 0)]
+    while stack:
+        lo, hi, index, depth = stack.pop()
+        if len(index) <= max_faces or depth >= max_depth:
+            owner[index] = len(boxes)
+            boxes.append((lo, hi))
+            continue
+        mid = (lo + hi) / 2
+        upper = centroids[index] >= mid
+        octant = upper[:, 0] * 4 + upper[:, 1] * 2 + upper[:, 2]
+        for code in range(8):
+            child = index[octant == code]
+            if len(child):
+                bits = np.array([code >> 2 & 1, code >> 1 & 1, code & 1], dtype=bool)
+                stack.append((np.where(bits, mid, lo), np.where(bits, hi, mid), child, depth + 1))
+    return np.array(boxes), owner
+
+
+def _rows(array: np.ndarray) -> np.ndarray:
+    """View each row of a 2D array as one opaque value (for unique/isin)"""
+    array = np.ascontiguousarray(array)
+    return array.view(np.dtype((np.void, array.dtype.itemsize * array.shape[1]))).ravel()
+
+
+def _box_owner(point: np.ndarray, boxes: np.ndarray) -> int:
+    """
+    Tile whose half-open box [lo, hi) contains point, or the nearest box
+    when it falls in a dropped empty leaf or outside the root box.
+    """
+    inside = np.all((boxes[:, 0] <= point) & (point < boxes[:, 1]), axis=1)
+    if inside.any():
+        return int(np.argmax(inside))
+    gap = np.maximum(boxes[:, 0] - point, 0) + np.maximum(point - boxes[:, 1], 0)
+    return int(np.argmin(np.linalg.norm(gap, axis=1)))
+
+
+def _repair_tile(task):
+    """
+    Process pool worker: repair one tile and keep the part it owns.
+
+    Args:
+        task: (vertices, faces, owned face mask, cut vertex mask, tile
+            index, all tile boxes, backend); masks are tile-local
+
+    Returns:
+        (vertices, faces, record)
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    vertices, faces, owned_faces, cut, tile, boxes, backend = task
+    start = time.perf_counter()
+    out_vertices, out_faces = _TILE_RUNNERS[backend](vertices, faces.astype(np.int32))
+    out_vertices = np.asarray(out_vertices, dtype=np.float64)
+    out_faces = np.asarray(out_faces, dtype=np.int64).reshape(-1, 3)
+
+    # Map output vertices back to input vertices by exact position
+    # (the backends keep coordinates of vertices they don't touch)
+    n_in = len(vertices)
+    _, inverse = np.unique(_rows(np.vstack([vertices, out_vertices])), return_inverse=True)
+    inverse = inverse.ravel()
+    lookup = np.full(inverse.max() + 1, -1, dtype=np.int64)
+    lookup[inverse[:n_in]] = np.arange(n_in)
+    to_input = lookup[inverse[n_in:]]
+
+    # Original faces that survived, in their input winding
+    mapped = to_input[out_faces]
+    known = np.all(mapped >= 0, axis=1)
+    out_keys = _rows(np.sort(mapped[known], axis=1))
+    survived = np.isin(_rows(np.sort(faces, axis=1)), out_keys)
+    kept = faces[survived & owned_faces]
+    in_keys = _rows(np.sort(faces, axis=1))
+    is_new = ~known
+    is_new[known] = ~np.isin(out_keys, in_keys)
+
+    # New faces grouped into patches (connected through shared vertices)
+    new_faces = out_faces[is_new]
+    patches = []
+    if len(new_faces):
+        edges = np.concatenate([new_faces[:, [0, 1]], new_faces[:, [1, 2]]])
+        graph = coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])),
+                           shape=(len(out_vertices),) * 2)
+        _, labels = connected_components(graph, directed=False)
+        face_labels = labels[new_faces[:, 0]]
+        for label in np.unique(face_labels):
+            patch = new_faces[face_labels == label]
+            original = to_input[np.unique(patch)]
+            original = original[original >= 0]
+            if not len(original) or cut[original].any():
+                # Cap over the tile's cut edge (or a floating piece): not ours
+                continue
+            # The patch belongs to the tile whose box holds the centroid of
+            # its original vertices. Every tile that sees the whole patch
+            # computes the same owner, and a patch that fits in the overlap
+            # is seen whole by its owner
+            if _box_owner(vertices[original].mean(axis=0), boxes) == tile:
+                patches.append(patch)
+
+    # Assemble: input vertices, then the new vertices the patches use
+    patch_faces = np.concatenate(patches) if patches else np.empty((0, 3), dtype=np.int64)
+    fresh = np.unique(patch_faces[to_input[patch_faces] < 0]) if len(patch_faces) else []
+    index = to_input.copy()
+    index[fresh] = n_in + np.arange(len(fresh))
+    all_vertices = np.vstack([vertices, out_vertices[fresh]])
+    all_faces = np.concatenate([kept, index[patch_faces]])
+
+    # Drop vertices no kept face uses
+    used, all_faces = np.unique(all_faces, return_inverse=True)
+    record = {
+        "faces": int(len(faces)),
+        "owned": int(owned_faces.sum()),
+        "kept": int(len(kept)),
+        "patches": len(patches),
+        "patch_faces": int(len(patch_faces)),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return all_vertices[used], all_faces.reshape(-1, 3), record
+
+
+def repair_tiled(vertices, faces, backend: str = None, tile_faces: int = TILE_FACES,
+                 overlap: float = TILE_OVERLAP, workers: int = None, progress=None):
+    """
+    Repair a large mesh in overlapping octree tiles on a process pool.
+
+    Args:
+        vertices: (N, 3) float array
+        faces: (M, 3) integer array
+        backend: "pymeshfix" or "pymeshlab" (the MeshFix binary cannot
+            limit which holes it fills, so it cannot repair tiles)
+        tile_faces: Faces owned per tile
+        overlap: Margin around each tile, as a fraction of its longest side
+        workers: Processes (default: CPU count; 1 runs in-process)
+        progress: Called as progress(done, total, record) when a tile finishes
+
+    Returns:
+        (vertices, faces, info) where info has the backend, tile count,
+        per-tile records and stage timings
+    """
+    from mesh_tools.validate import weld_vertices
+
+    backend = backend_name(backend)
+    if backend not in _TILE_RUNNERS:
+        raise ValueError(f"Tiled repair needs pymeshfix or pymeshlab, not {backend}")
+
+    timings = {}
+    start = time.perf_counter()
+    vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+    faces = np.ascontiguousarray(faces, dtype=np.int64).reshape(-1, 3)
+    centroids = vertices[faces].mean(axis=1)
+    boxes, owner = octree_tiles(centroids, tile_faces)
+    valence = np.bincount(faces.ravel(), minlength=len(vertices))
+    timings["partition"] = round(time.perf_counter() - start, 6)
+
+    def tasks():
+        for tile, (lo, hi) in enumerate(boxes):
+            margin = overlap * np.max(hi - lo)
+            inside = np.all((centroids >= lo - margin) & (centroids <= hi + margin), axis=1)
+            tile_faces_global = faces[inside]
+            used, local = np.unique(tile_faces_global, return_inverse=True)
+            # Cut vertices: some of their faces were left out of the tile
+            cut = np.bincount(local.ravel(), minlength=len(used)) < valence[used]
+            yield tile, (vertices[used], local.reshape(-1, 3), owner[inside] == tile, cut,
+                         tile, boxes, backend)
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    total = len(boxes)
+    pieces = [None] * total
+    records = [None] * total
+
+    def finished(tile, result):
+        pieces[tile] = result[:2]
+        records[tile] = {"tile": tile, **result[2]}
+        if progress is not None:
+            progress(sum(r is not None for r in records), total, records[tile])
+
+    if workers == 1 or total == 1:
+        for tile, task in tasks():
+            finished(tile, _repair_tile(task))
+    else:
+        # Keep only a few tiles in flight so their arrays aren't all
+        # pickled into the pool's queue at once
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            running = {}
+            for tile, task in tasks():
+                running[pool.submit(_repair_tile, task)] = tile
+                while len(running) >= 2 * workers:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished(running.pop(future), future.result())
+            for future in list(running):
+                finished(running.pop(future), future.result())
+    timings["tiles"] = round(time.perf_counter() - start, 6)
+
+    # Weld the seams: tiles share the exact coordinates of original vertices
+    start = time.perf_counter()
+    offsets = np.cumsum([0] + [len(v) for v, _ in pieces])
+    all_vertices = np.vstack([v for v, _ in pieces])
+    all_faces = np.concatenate([f + offset for (_, f), offset in zip(pieces, offsets)])
+    count, inverse = weld_vertices(all_vertices)
+    welded = np.empty((count, 3), dtype=np.float64)
+    welded[inverse] = all_vertices
+    all_faces = inverse[all_faces]
+    all_faces = all_faces[(all_faces[:, 0] != all_faces[:, 1]) & (all_faces[:, 1] != all_faces[:, 2])
+                          & (all_faces[:, 0] != all_faces[:, 2])]
+    timings["stitch"] = round(time.perf_counter() - start, 6)
+
+    info = {"backend": backend, "tiles": total, "tile_records": records, "timings": timings,
+            "seconds": round(sum(timings.values()), 6)}
+    return welded, all_faces, info
+
+
+def repair_mesh(mesh, backend: str = None, tiled: bool = None, progress=None):
+    """
+    Repair a Trimesh (or Scene) in memory.
+
+    Args:
+        mesh: Trimesh or Scene
+        backend: See backend_name()
+        tiled: Repair in octree tiles (default: above TILED_REPAIR_FACES)
+        progress: Per-tile callback for tiled repairs, see repair_tiled()
+
+    Returns:
+        (repaired Trimesh, info)
+    """
+    import trimesh
+
+    if hasattr(mesh, "geometry"):
+        mesh = mesh.dump(concatenate=True)
+    if tiled is None:
+        tiled = len(mesh.faces) > TILED_REPAIR_FACES
+    if tiled:
+        vertices, faces, info = repair_tiled(mesh.vertices, mesh.faces, backend, progress=progress)
+    else:
+        vertices, faces, info = repair_arrays(mesh.vertices, mesh.faces, backend)
+    return trimesh.Trimesh(vertices, faces, process=False), info
@@ -0,0 +1,282 @@
+"""
+Content-addressed on-disk cache for tool results
+
+Results of expensive operations (repair, boolean, slicing) are stored under
+a key derived from the input file bytes, the operation name, its arguments
+and the version of the tool that produced them. A hit materializes the
+cached file at the requested output path as a copy (a reflink where the
+filesystem supports it), so re-submitted identical jobs cost a hash and
+a copy instead of a run. Outputs never share an inode with the cache, so
+writing to an output later cannot corrupt a cached entry.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("TOOLS_CACHE_DIR", Path.home() / ".cache" / "3mf_tools"))
+RESULT_CACHE_MB = float(os.environ.get("TOOLS_RESULT_CACHE_MB", "2048"))
+
+# Bytes per read when hashing files
+HASH_CHUNK = 1 << 20
+
+# Files whose digest is remembered
+DIGEST_MEMO_SIZE = 256
+
+# Linux ioctl that clones a file's extents (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+_digest_memo = OrderedDict()
+_digest_lock = threading.Lock()
+
+
+def file_digest(path) -> str:
+    """
+    SHA-256 of a file's bytes, memoized on path + mtime + size for the
+    DIGEST_MEMO_SIZE most recently used files.
+    """
+    st = os.stat(path)
+    memo_key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+    with _digest_lock:
+        if memo_key in _digest_memo:
+            _digest_memo.move_to_end(memo_key)
+            return _digest_memo[memo_key]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _digest_lock:
+        _digest_memo[memo_key] = digest
+        while len(_digest_memo) > DIGEST_MEMO_SIZE:
+            _digest_memo.popitem(last=False)
+    return digest
+
+
+def copy_file(source, destination):
+    """Copy a file's bytes, as a reflink (shared extents, copy on write) where supported"""
+    try:
+        import fcntl
+
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(source, destination)
+
+
+def tool_version(tool) -> str:
+    """
+    Version string for a tool: the digest of a binary's bytes, or the
+    string itself for library versions (e.g. "trimesh 4.5.3").
+    """
+    if tool is None:
+        return ""
+    if os.path.isfile(str(tool)):
+        return file_digest(tool)
+    return str(tool)
+
+
+class DiskCache:
+    """Directory of files keyed by hex digest with a byte budget and LRU eviction
+
+    Recency is tracked with each entry's atime, set explicitly on every hit,
+    so it works on noatime mounts and never touches mtime. Entries are
+    written read-only.
+
+    The total size is kept in memory and updated on every write; the
+    directory is only scanned on the first write and when the total goes
+    over budget. That rescan also picks up entries written by other
+    processes sharing the directory.
+    """
+
+    def __init__(self, root, budget_bytes: int):
+        self.root = Path(root)
+        self.budget_bytes = budget_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bytes in the directory as of the last scan plus our writes since
+        self._bytes = None
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, suffix: str = "") -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = ""):
+        """Return the cached file path, or None on miss"""
+        path = self.path_for(key, suffix)
+        try:
+            st = path.stat()
+            os.utime(path, (time.time(), st.st_mtime))
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key: str, source, suffix: str = "") -> Path:
+        """Store a copy of source under key and enforce the byte budget"""
+        return self._write(key, suffix, lambda tmp: shutil.copyfile(source, tmp))
+
+    def put_bytes(self, key: str, data: bytes, suffix: str = "") -> Path:
+        """Store data under key and enforce the byte budget"""
+        return self._write(key, suffix, lambda tmp: Path(tmp).write_bytes(data))
+
+    def _write(self, key: str, suffix: str, fill) -> Path:
+        # Write to a temp file in the shard, then rename into place
+        path = self.path_for(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            fill(tmp)
+            os.chmod(tmp, 0o444)
+            size = os.path.getsize(tmp)
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += size - replaced
+        self.evict()
+        return path
+
+    def _entries(self) -> list:
+        entries = []
+        if not self.root.exists():
+            return entries
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_atime, st.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until under budget"""
+        with self._lock:
+            if self._bytes is not None and self._bytes <= self.budget_bytes:
+                return
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.budget_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+        with self._lock:
+            self._bytes = total
+
+    def merge_counts(self, counts: dict):
+        """Add hit/miss/eviction counts recorded elsewhere (e.g. in a worker process)"""
+        with self._lock:
+            for name in ("hits", "misses", "evictions"):
+                setattr(self, name, getattr(self, name) + counts.get(name, 0))
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ResultCache(DiskCache):
+    """DiskCache for operation outputs keyed on inputs + operation + args + tool"""
+
+    def __init__(self, root=None, budget_bytes: int = None):
+        if root is None:
+            root = CACHE_DIR / "results"
+        if budget_bytes is None:
+            budget_bytes = int(RESULT_CACHE_MB * 1024 * 1024)
+        super().__init__(root, budget_bytes)
+
+    @staticmethod
+    def key(operation: str, inputs: list, args: dict = None, tool=None) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            operation: Operation name (e.g. "mesh.repair")
+            inputs: Input file paths; their bytes are hashed
+            args: JSON-serializable arguments that affect the result
+            tool: Binary path (hashed) or library version string
+        """
+        material = {
+            "operation": operation,
+            "inputs": [file_digest(p) for p in inputs],
+            "args": args or {},
+            "tool": tool_version(tool),
+        }
+        blob = json.dumps(material, sort_keys=True, default=str).encode()
+        return hashlib.sha256(blob).hexdigest()
+
+    def fetch(self, key: str, output_path) -> bool:
+        """On hit, copy the cached result to output_path"""
+        suffix = Path(output_path).suffix
+        cached = self.get(key, suffix)
+        if cached is None:
+            return False
+
+        # Copy next to the output, then rename over it: readers never see a
+        # partial file, and an output hardlinked to the entry gets its own inode
+        output_path = Path(output_path)
+        tmp = output_path.with_name(f".{output_path.name}.{os.urandom(4).hex()}.tmp")
+        # Created with the usual umask permissions (mkstemp would make it 0600)
+        os.close(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+        try:
+            copy_file(cached, tmp)
+            os.replace(tmp, output_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return True
+
+    def store(self, key: str, output_path) -> Path:
+        """Add a freshly produced output to the cache"""
+        return self.put(key, output_path, Path(output_path).suffix)
+
+
+_default_cache = None
+
+
+def default_cache() -> ResultCache:
+    """Process-wide ResultCache using CACHE_DIR and RESULT_CACHE_MB"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
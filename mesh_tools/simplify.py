@@ -0,0 +1,341 @@
+"""
+Parallel quadric decimation
+
+trimesh's simplify_quadric_decimation runs on one core. Here the mesh
+is split into spatial chunks (the octree from repair.py), and the chunks
+are decimated in a process pool with their border vertices locked, so
+neighbouring chunks still meet exactly and are welded back by position.
+The locked seams keep their full resolution, so a light second pass
+decimates a band of faces around the seams, this time with the band's
+own border locked.
+
+The target is either a face count or an error bound. A face count is
+split between the chunk interiors in proportion to their size, and the
+faces along the locked seams are left for the seam pass, which
+decimates them to the same ratio. An error bound is the largest
+distance from the input vertices to the simplified surface.
+fast_simplification has no error threshold, so each chunk searches for
+the smallest face count that stays within the bound, measured on a
+sample of ERROR_SAMPLES vertices.
+The chunk pass and the seam pass each get half of the bound.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+# Faces per chunk; meshes up to this size are decimated in one piece
+CHUNK_FACES = int(os.environ.get("TOOLS_SIMPLIFY_CHUNK_FACES", "250000"))
+
+# Rings of faces (of the decimated mesh) around the seams that the second
+# pass decimates; narrower bands leave too little room to collapse the
+# full-resolution strip along the seam without distorting it
+SEAM_RINGS = 6
+
+# Vertices sampled per error measurement, and candidate faces per vertex
+ERROR_SAMPLES = 20000
+ERROR_NEIGHBOURS = 8
+ERROR_BATCH = 256
+
+# Error-bound search: decimation attempts per chunk and smallest fraction tried
+ERROR_STEPS = 6
+MIN_FRACTION = 0.01
+
+# fast_simplification aggressiveness (its default)
+AGGRESSIVENESS = 7.0
+
+
+def backend_version() -> str:
+    """Version string for cache keys"""
+    try:
+        import fast_simplification
+    except ImportError:
+        raise FileNotFoundError("Simplification needs fast_simplification: "
+                                "pip install fast-simplification") from None
+    return f"fast_simplification {getattr(fast_simplification, '__version__', 'unknown')}"
+
+
+def _decimate(vertices: np.ndarray, faces: np.ndarray, target: int, lock_border: bool):
+    import fast_simplification
+
+    if target >= len(faces):
+        return vertices, faces
+    out_vertices, out_faces = fast_simplification.simplify(
+        vertices, faces.astype(np.int32), target_count=max(int(target), 4),
+        agg=AGGRESSIVENESS, preserve_border=lock_border)
+    return np.asarray(out_vertices, dtype=np.float64), np.asarray(out_faces, dtype=np.int64)
+
+
+def surface_error(points: np.ndarray, vertices: np.ndarray, faces: np.ndarray,
+                  samples: int = None) -> float:
+    """
+    Largest distance from (a sample of) points to the surface (vertices, faces).
+
+    Every point is first measured against the ERROR_NEIGHBOURS faces with
+    the nearest centroids, which can only overestimate. Exact closest-point
+    queries then run on the worst points, a batch at a time, until no
+    remaining estimate exceeds the largest exact distance found.
+    """
+    import trimesh
+    from scipy.spatial import cKDTree
+
+    samples = samples or ERROR_SAMPLES
+    if len(points) > samples:
+        points = points[np.random.default_rng(0).choice(len(points), samples, replace=False)]
+    if len(points) == 0 or len(faces) == 0:
+        return 0.0
+    triangles = vertices[faces]
+    k = min(ERROR_NEIGHBOURS, len(faces))
+    _, nearest = cKDTree(triangles.mean(axis=1)).query(points, k=k)
+    repeated = np.repeat(points, k, axis=0)
+    closest = trimesh.triangles.closest_point(triangles[nearest.ravel()], repeated)
+    estimate = np.linalg.norm(closest - repeated, axis=1).reshape(-1, k).min(axis=1)
+
+    mesh = trimesh.Trimesh(vertices, faces, process=False)
+    order = np.argsort(-estimate)
+    error = 0.0
+    for start in range(0, len(order), ERROR_BATCH):
+        batch = order[start:start + ERROR_BATCH]
+        if estimate[batch[0]] <= error:
+            break
+        _, distance, _ = trimesh.proximity.closest_point(mesh, points[batch])
+        error = max(error, float(distance.max()))
+    return error
+
+
+def _decimate_to_error(vertices: np.ndarray, faces: np.ndarray, max_error: float, lock_border: bool):
+    """
+    Fewest faces within max_error, by geometric bisection on the kept fraction.
+
+    Returns:
+        (vertices, faces, measured error)
+    """
+    best = (vertices, faces, 0.0)
+    good, bad = 1.0, None
+    fraction = 0.25
+    for _ in range(ERROR_STEPS):
+        out_vertices, out_faces = _decimate(vertices, faces, len(faces) * fraction, lock_border)
+        error = surface_error(vertices, out_vertices, out_faces)
+        if error <= max_error:
+            good = fraction
+            if len(out_faces) < len(best[1]):
+                best = (out_vertices, out_faces, error)
+            if fraction <= MIN_FRACTION:
+                break
+            fraction = max(fraction / 4, MIN_FRACTION) if bad is None else np.sqrt(good * bad)
+        else:
+            bad = fraction
+            fraction = np.sqrt(good * bad)
+    return best
+
+
+def _simplify_chunk(task):
+    """
+    Process pool worker: decimate one chunk.
+
+    Args:
+        task: (vertices, faces, target face count or None, max error or
+            None, lock_border)
+
+    Returns:
+        (vertices, faces, record)
+    """
+    vertices, faces, target, max_error, lock_border = task
+    start = time.perf_counter()
+    record = {"faces_in": int(len(faces))}
+    if max_error is not None:
+        vertices, faces, record["error"] = _decimate_to_error(vertices, faces, max_error, lock_border)
+    else:
+        vertices, faces = _decimate(vertices, faces, target, lock_border)
+    record["faces_out"] = int(len(faces))
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return vertices, faces, record
+
+
+def _submesh(vertices: np.ndarray, faces: np.ndarray):
+    """Compact vertices to those the faces use"""
+    used, local = np.unique(faces, return_inverse=True)
+    return vertices[used], local.reshape(-1, 3)
+
+
+def _weld(pieces: list):
+    """Concatenate (vertices, faces) pieces and weld identical positions"""
+    from mesh_tools.validate import weld_vertices
+
+    offsets = np.cumsum([0] + [len(v) for v, _ in pieces])
+    all_vertices = np.vstack([v for v, _ in pieces])
+    all_faces = np.concatenate([f + offset for (_, f), offset in zip(pieces, offsets)])
+    count, inverse = weld_vertices(all_vertices)
+    welded = np.empty((count, 3), dtype=np.float64)
+    welded[inverse] = all_vertices
+    return welded, inverse[all_faces]
+
+
+def _run(tasks: list, workers: int, progress=None) -> list:
+    """Run chunk tasks in a spawn pool (or in-process); results in task order"""
+    results = [None] * len(tasks)
+
+    def finished(index, result):
+        results[index] = result
+        if progress is not None:
+            progress(sum(r is not None for r in results), len(tasks), result[2])
+
+    # Daemonic processes (multiprocessing.Pool workers) cannot have children
+    if workers == 1 or len(tasks) == 1 or multiprocessing.current_process().daemon:
+        for index, task in enumerate(tasks):
+            finished(index, _simplify_chunk(task))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        running = {}
+        for index, task in enumerate(tasks):
+            running[pool.submit(_simplify_chunk, task)] = index
+            # A few chunks in flight at a time, so their arrays aren't
+            # all pickled into the pool's queue at once
+            while len(running) >= 2 * workers:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished(running.pop(future), future.result())
+        for future in list(running):
+            finished(running.pop(future), future.result())
+    return results
+
+
+def simplify_arrays(vertices, faces, target_faces: int = None, max_error: float = None,
+                    workers: int = None, chunk_faces: int = CHUNK_FACES, progress=None):
+    """
+    Decimate a triangle mesh in parallel chunks.
+
+    Args:
+        vertices: (N, 3) float array
+        faces: (M, 3) integer array
+        target_faces: Face count to reach (approximately)
+        max_error: Largest allowed distance from input vertices to the
+            result, in mesh units (instead of target_faces)
+        workers: Processes (default: CPU count; 1 runs in-process)
+        chunk_faces: Faces per chunk
+        progress: Called as progress(done, total, record) per chunk
+
+    Returns:
+        (vertices, faces, info) with face counts, chunk count, per-chunk
+        records, seam pass record and stage timings
+    """
+    from mesh_tools.repair import octree_tiles
+
+    if (target_faces is None) == (max_error is None):
+        raise ValueError("Give exactly one of target_faces or max_error")
+
+    timings = {}
+    vertices = np.ascontiguousarray(vertices, dtype=np.float64)
+    faces = np.ascontiguousarray(faces, dtype=np.int64).reshape(-1, 3)
+    info = {"faces_in": int(len(faces)), "timings": timings}
+    workers = workers or os.cpu_count() or 1
+
+    def stage(name, start):
+        timings[name] = round(time.perf_counter() - start, 6)
+
+    # Small meshes: one piece, borders free
+    if len(faces) <= chunk_faces:
+        start = time.perf_counter()
+        out_vertices, out_faces, record = _simplify_chunk(
+            (vertices, faces, target_faces, max_error, False))
+        stage("simplify", start)
+        info.update(chunks=1, chunk_records=[record], faces_out=record["faces_out"])
+        if "error" in record:
+            info["error"] = record["error"]
+        return out_vertices, out_faces, info
+
+    # 1. Spatial chunks
+    start = time.perf_counter()
+    centroids = vertices[faces].mean(axis=1)
+    _, owner = octree_tiles(centroids, chunk_faces)
+    ratio = None if target_faces is None else target_faces / len(faces)
+    chunk_error = None if max_error is None else max_error / 2
+    # Faces touching a vertex shared with another chunk keep their locked
+    # border, so they can't count against a chunk's budget: each chunk gets
+    # its interior at the global ratio plus this strip, and the seam pass
+    # takes the strip down to the global ratio
+    corner_owner = np.repeat(owner, 3)
+    vertex_owner = np.full(len(vertices), -1, dtype=np.int64)
+    vertex_owner[faces.ravel()] = corner_owner
+    shared = np.zeros(len(vertices), dtype=bool)
+    shared[faces.ravel()[vertex_owner[faces.ravel()] != corner_owner]] = True
+    strip = shared[faces].any(axis=1)
+    tasks = []
+    for chunk in range(owner.max() + 1):
+        mine = owner == chunk
+        chunk_vertices, chunk_faces_local = _submesh(vertices, faces[mine])
+        target = None
+        if ratio is not None:
+            strip_faces = int(np.count_nonzero(strip[mine]))
+            target = int(round((len(chunk_faces_local) - strip_faces) * ratio)) + strip_faces
+        tasks.append((chunk_vertices, chunk_faces_local, target, chunk_error, True))
+    stage("partition", start)
+
+    # 2. Chunks in parallel with their borders locked
+    start = time.perf_counter()
+    results = _run(tasks, workers, progress)
+    stage("chunks", start)
+
+    start = time.perf_counter()
+    vertices, faces = _weld([r[:2] for r in results])
+    stage("stitch", start)
+    info["chunks"] = len(results)
+    info["chunk_records"] = [r[2] for r in results]
+
+    # 3. Seam pass: faces within SEAM_RINGS of a vertex shared by chunks
+    start = time.perf_counter()
+    chunk_of_face = np.repeat(np.arange(len(results)), [len(r[1]) for r in results])
+    vertex_chunk = np.full(len(vertices), -1, dtype=np.int64)
+    vertex_chunk[faces.ravel()] = np.repeat(chunk_of_face, 3)
+    seam = np.zeros(len(vertices), dtype=bool)
+    seam[faces.ravel()[vertex_chunk[faces.ravel()] != np.repeat(chunk_of_face, 3)]] = True
+    band = seam[faces].any(axis=1)
+    for _ in range(SEAM_RINGS - 1):
+        touched = np.zeros(len(vertices), dtype=bool)
+        touched[faces[band].ravel()] = True
+        band = touched[faces].any(axis=1)
+
+    record = None
+    if band.any():
+        band_vertices, band_faces = _submesh(vertices, faces[band])
+        target = None
+        if target_faces is not None:
+            target = len(band_faces) - (len(faces) - target_faces)
+        if target is None or target < len(band_faces):
+            band_vertices, band_faces, record = _simplify_chunk(
+                (band_vertices, band_faces, max(target or 0, 0), chunk_error, True))
+            vertices, faces = _weld([_submesh(vertices, faces[~band]), (band_vertices, band_faces)])
+    stage("seams", start)
+
+    # Welding can collapse faces and orphan vertices
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2])
+                  & (faces[:, 2] != faces[:, 0])]
+    vertices, faces = _submesh(vertices, faces)
+    info["seam_record"] = record
+    info["faces_out"] = int(len(faces))
+    if max_error is not None:
+        info["error"] = max([r.get("error", 0.0) for r in info["chunk_records"]]) + (
+            record.get("error", 0.0) if record else 0.0)
+    return vertices, faces, info
+
+
+def simplify_mesh(mesh, target_faces: int = None, max_error: float = None,
+                  workers: int = None, progress=None):
+    """
+    simplify_arrays for a Trimesh (or Scene).
+
+    Returns:
+        (simplified Trimesh, info)
+    """
+    import trimesh
+
+    if hasattr(mesh, "geometry"):
+        mesh = mesh.dump(concatenate=True)
+    vertices, faces, info = simplify_arrays(mesh.vertices, mesh.faces, target_faces, max_error,
+                                            workers, progress=progress)
+    return trimesh.Trimesh(vertices, faces, process=False), info
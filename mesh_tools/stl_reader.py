@@ -0,0 +1,228 @@
+"""
+Memory-mapped binary STL reader
+
+A binary STL is an 80-byte header, a uint32 triangle count and then one
+50-byte record per triangle (normal, three vertices, attribute word).
+The records are mapped with np.memmap and a structured dtype, so the
+triangle count comes from the header and bounds are reduced chunk by
+chunk without copying the file into memory.
+
+Welding turns the triangle soup into an indexed mesh. Each corner's
+coordinates are quantized and hashed to one uint64 per corner, chunk by
+chunk, and a single np.unique over the hashes assigns vertex ids. Every
+merge is then confirmed against the quantized coordinates, so a hash
+collision can't fuse distinct corners (if one ever shows up, the weld is
+redone exactly on the quantized rows). Peak memory is about 8 bytes per
+corner plus the output arrays, instead of the float64 corner copy (and
+Python-side parsing) trimesh.load needs.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+HEADER_SIZE = 80
+COUNT_SIZE = 4
+DATA_OFFSET = HEADER_SIZE + COUNT_SIZE
+
+STL_RECORD = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attributes", "<u2"),
+])
+
+# Triangles per chunk when scanning or welding (50 MB of records)
+CHUNK_TRIANGLES = 1 << 20
+
+# Decimal digits kept when quantizing coordinates for welding
+WELD_DIGITS = 6
+
+# Files whose stl_stats are remembered
+STATS_MEMO_SIZE = 256
+
+
+def binary_triangle_count(path: str):
+    """
+    Return the triangle count of a binary STL, or None if it isn't one.
+
+    The file size must match the header count exactly; ASCII files
+    (which may also start with "solid") never do.
+    """
+    size = os.path.getsize(path)
+    if size < DATA_OFFSET:
+        return None
+    with open(path, "rb") as f:
+        f.seek(HEADER_SIZE)
+        count = int.from_bytes(f.read(COUNT_SIZE), "little")
+    if size != DATA_OFFSET + count * STL_RECORD.itemsize:
+        return None
+    return count
+
+
+def open_binary_stl(path: str) -> np.memmap:
+    """Map a binary STL's triangle records read-only"""
+    count = binary_triangle_count(path)
+    if count is None:
+        raise ValueError(f"Not a binary STL: {path}")
+    if count == 0:
+        return np.zeros(0, dtype=STL_RECORD)
+    return np.memmap(path, dtype=STL_RECORD, mode="r", offset=DATA_OFFSET, shape=(count,))
+
+
+def _chunk_bounds(raw: np.ndarray) -> np.ndarray:
+    """(2, 9) min/max of the vertex floats in a (k, 50) byte view of records"""
+    # Copy the 36 vertex bytes of each record out of the 50-byte stride,
+    # then reduce along contiguous rows (much faster than axis=0 on (k, 9))
+    floats = np.ascontiguousarray(raw[:, 12:48]).view("<f4")
+    columns = np.asfortranarray(floats).T
+    return np.array([columns.min(axis=1), columns.max(axis=1)])
+
+
+def stl_bounds(records: np.ndarray, chunk: int = CHUNK_TRIANGLES, workers: int = None) -> np.ndarray:
+    """
+    (2, 3) min/max corner of all vertices.
+
+    The records are reduced chunk by chunk on a thread pool; NumPy drops
+    the GIL inside the copies and reductions, so chunks run in parallel.
+    """
+    if len(records) == 0:
+        return np.zeros((2, 3))
+    from concurrent.futures import ThreadPoolExecutor
+
+    raw = records.view(np.uint8).reshape(len(records), STL_RECORD.itemsize)
+    starts = range(0, len(records), chunk)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = list(pool.map(lambda s: _chunk_bounds(raw[s:s + chunk]), starts))
+
+    parts = np.array(parts).reshape(-1, 2, 3, 3)
+    return np.array([
+        parts[:, 0].min(axis=(0, 1)),
+        parts[:, 1].max(axis=(0, 1)),
+    ], dtype=np.float64)
+
+
+_stats_memo = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+def stl_stats(path: str) -> dict:
+    """
+    Triangle count, bounds and extents of a binary STL without loading it.
+
+    Results are memoized on path + mtime + size, for the
+    STATS_MEMO_SIZE most recently used files.
+
+    Returns:
+        Dict with faces, bounds, extents and file_size
+    """
+    st = os.stat(path)
+    memo_key = (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+    with _stats_lock:
+        if memo_key in _stats_memo:
+            _stats_memo.move_to_end(memo_key)
+            return dict(_stats_memo[memo_key])
+
+    records = open_binary_stl(path)
+    bounds = stl_bounds(records)
+    stats = {
+        "faces": int(len(records)),
+        "bounds": bounds.tolist(),
+        "extents": (bounds[1] - bounds[0]).tolist(),
+        "file_size": st.st_size,
+    }
+    with _stats_lock:
+        _stats_memo[memo_key] = stats
+        while len(_stats_memo) > STATS_MEMO_SIZE:
+            _stats_memo.popitem(last=False)
+    return dict(stats)
+
+
+def _fmix64(h: np.ndarray) -> np.ndarray:
+    """MurmurHash3 64-bit finalizer, in place on a uint64 array"""
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xC4CEB9FE1A85EC53)
+    h ^= h >> np.uint64(33)
+    return h
+
+
+def quantize(corners: np.ndarray, digits: int = WELD_DIGITS) -> np.ndarray:
+    """(N, 3) coordinates rounded to `digits` decimals, as int64 grid points"""
+    return np.rint(corners.astype(np.float64) * 10.0 ** digits).astype(np.int64)
+
+
+def corner_hashes(corners: np.ndarray, digits: int = WELD_DIGITS) -> np.ndarray:
+    """Hash (N, 3) coordinates quantized to `digits` decimals into uint64 keys"""
+    q = quantize(corners, digits).view(np.uint64)
+    h = _fmix64(q[:, 0].copy())
+    h ^= q[:, 1]
+    h = _fmix64(h)
+    h ^= q[:, 2]
+    return _fmix64(h)
+
+
+def _unique_rows(records: np.ndarray, digits: int):
+    """np.unique over the quantized corner rows: exact, but slower than hashing"""
+    rows = quantize(np.asarray(records["vertices"]).reshape(-1, 3), digits)
+    _, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def weld(records: np.ndarray, digits: int = WELD_DIGITS, chunk: int = CHUNK_TRIANGLES):
+    """
+    Convert STL records into an indexed mesh.
+
+    Corners that quantize to the same `digits`-decimal grid point share a
+    vertex. Vertex ids follow first appearance in the file.
+
+    Returns:
+        (vertices float64 (V, 3), faces int64 (F, 3))
+    """
+    count = len(records)
+    hashes = np.empty(count * 3, dtype=np.uint64)
+    for start in range(0, count, chunk):
+        corners = records["vertices"][start:start + chunk].reshape(-1, 3)
+        hashes[start * 3:start * 3 + len(corners)] = corner_hashes(corners, digits)
+
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    del hashes
+    inverse = inverse.ravel()
+
+    # Each corner must quantize exactly like the corner whose vertex it
+    # was given; otherwise two grid points collided in the hash
+    kept = quantize(records["vertices"][first // 3, first % 3], digits)
+    for start in range(0, count, chunk):
+        corners = records["vertices"][start:start + chunk].reshape(-1, 3)
+        if not np.array_equal(quantize(corners, digits),
+                              kept[inverse[start * 3:start * 3 + len(corners)]]):
+            first, inverse = _unique_rows(records, digits)
+            break
+    del kept
+
+    # Renumber vertices by first appearance for better locality
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    faces = rank[inverse].reshape(-1, 3)
+
+    first = first[order]
+    vertices = np.asarray(
+        records["vertices"][first // 3, first % 3], dtype=np.float64
+    )
+    return vertices, faces
+
+
+def load_stl(path: str, digits: int = WELD_DIGITS, process: bool = False, **kwargs):
+    """
+    Load a binary STL through the memory map and return a welded Trimesh.
+
+    The mesh is already welded, so trimesh's processing is off unless
+    process=True; other kwargs go to the Trimesh constructor.
+    """
+    import trimesh
+
+    vertices, faces = weld(open_binary_stl(path), digits)
+    return trimesh.Trimesh(vertices=vertices, faces=faces, process=process, **kwargs)
@@ -0,0 +1,223 @@
+"""
+Composed mesh transforms
+
+Scale, rotation and translation are folded into one 4x4 matrix so a mesh
+is transformed with a single pass over its vertices, and previews can be
+drawn from a decimated proxy with the same matrix.
+"""
+
+import numpy as np
+
+# Faces kept in the interactive preview proxy
+PROXY_FACES = 50_000
+
+
+def compose_matrix(scale=1.0, rotate=(0.0, 0.0, 0.0), translate=(0.0, 0.0, 0.0)) -> np.ndarray:
+    """
+    Build one homogeneous transform.
+
+    Applied in the order: scale, rotate about X, then Y, then Z (degrees,
+    about the origin), then translate.
+
+    Args:
+        scale: Uniform factor or per-axis (sx, sy, sz)
+        rotate: (x, y, z) rotation angles in degrees
+        translate: (tx, ty, tz) offset
+
+    Returns:
+        (4, 4) float64 matrix
+    """
+    matrix = np.diag(np.r_[np.broadcast_to(np.asarray(scale, dtype=np.float64), 3), 1.0])
+
+    for axis, degrees in enumerate(rotate):
+        if not degrees:
+            continue
+        c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+        i, j = [k for k in range(3) if k != axis]
+        rotation = np.eye(4)
+        rotation[i, i] = rotation[j, j] = c
+        # Right-handed: Y rotation has the sine signs swapped relative to X/Z
+        sign = -1.0 if axis == 1 else 1.0
+        rotation[i, j] = -s * sign
+        rotation[j, i] = s * sign
+        matrix = rotation @ matrix
+
+    matrix[:3, 3] += np.asarray(translate, dtype=np.float64)
+    return matrix
+
+
+def apply_matrix(vertices: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Transform (N, 3) vertices by a 4x4 matrix in one matrix multiply"""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    return vertices @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def proxy_mesh(mesh, max_faces: int = PROXY_FACES):
+    """
+    Decimated stand-in for interactive previews.
+
+    Uses quadric decimation when fast_simplification is available and
+    falls back to keeping every n-th face.
+    """
+    if len(mesh.faces) <= max_faces:
+        return mesh
+    try:
+        return mesh.simplify_quadric_decimation(face_count=max_faces)
+    except Exception:
+        import trimesh
+        step = int(np.ceil(len(mesh.faces) / max_faces))
+        return trimesh.Trimesh(mesh.vertices, mesh.faces[::step], process=False)
+
+
+def item_matrix(item: dict) -> np.ndarray:
+    """4x4 matrix of a batch item: "matrix", or scale/rotate/translate"""
+    if item.get("matrix") is not None:
+        matrix = np.asarray(item["matrix"], dtype=np.float64)
+        if matrix.shape != (4, 4):
+            raise ValueError(f"Matrix must be 4x4, got {matrix.shape}")
+        return matrix
+    return compose_matrix(
+        item.get("scale", 1.0),
+        item.get("rotate", (0.0, 0.0, 0.0)),
+        item.get("translate", (0.0, 0.0, 0.0)),
+    )
+
+
+def normalize_items(items: list) -> list:
+    """Accept [path, matrix] pairs or dicts; return dicts with path and matrix"""
+    normalized = []
+    for item in items:
+        if isinstance(item, (list, tuple)):
+            item = {"path": item[0], "matrix": item[1]}
+        item = dict(item)
+        item["matrix"] = item_matrix(item)
+        normalized.append(item)
+    return normalized
+
+
+def transformed(mesh, matrix: np.ndarray):
+    """New Trimesh with the matrix applied to a copy of the vertices"""
+    import trimesh
+
+    if hasattr(mesh, "geometry"):
+        mesh = mesh.dump(concatenate=True)
+    result = trimesh.Trimesh(apply_matrix(mesh.vertices, matrix), mesh.faces, process=False)
+    if np.linalg.det(matrix[:3, :3]) < 0:
+        # Mirroring flips winding; restore outward normals
+        result.invert()
+    return result
+
+
+def _ordered_map(pool, fn, iterable, window: int):
+    """pool.map that keeps at most `window` results in flight, in order"""
+    from collections import deque
+
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def transform_many(items: list, output_dir: str = None, load=None, workers: int = None) -> list:
+    """
+    Transform many meshes, each into its own output file.
+
+    Runs on a thread pool: loading binary STL, the matmul and STL export
+    are NumPy work that releases the GIL.
+
+    Args:
+        items: Dicts with path, matrix (or scale/rotate/translate) and
+            optional output_path; or [path, matrix] pairs
+        output_dir: Where outputs without output_path go
+            (<stem>_transformed<ext>, next to the input by default)
+        load: fn(path) -> mesh (default: mesh_tools.loader.load_mesh)
+        workers: Thread count (default: CPU count)
+
+    Returns:
+        List of {path, output_path} or {path, error}, in input order
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+
+    if load is None:
+        from mesh_tools.loader import load_mesh as load
+
+    def run(item):
+        try:
+            source = Path(item["path"])
+            output_path = item.get("output_path")
+            if not output_path:
+                folder = Path(output_dir) if output_dir else source.parent
+                output_path = str(folder / f"{source.stem}_transformed{source.suffix}")
+            transformed(load(item["path"]), item["matrix"]).export(output_path)
+            return {"path": item["path"], "output_path": output_path}
+        except Exception as e:
+            return {"path": item["path"], "error": str(e)}
+
+    items = normalize_items(items)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(_ordered_map(pool, run, items, workers * 2))
+
+
+def transform_to_3mf(items: list, output_path: str, load=None, workers: int = None,
+                     instances: bool = True, **write_kwargs) -> dict:
+    """
+    Place many meshes into one multi-object 3MF.
+
+    With instances=True each distinct source is written once and every
+    placement becomes a build item carrying its matrix, so a plate of
+    repeated parts costs one copy of the geometry. With instances=False
+    each placement is baked into its own object with one matmul.
+
+    Args:
+        items: As for transform_many (output_path is ignored)
+        output_path: .3mf file to write
+        load: fn(path) -> mesh (default: mesh_tools.loader.load_mesh)
+        workers: Loader threads (default: CPU count)
+        instances: Share geometry between placements of the same source
+        **write_kwargs: Passed to write_3mf (compresslevel, metadata, ...)
+
+    Returns:
+        Dict with path, objects and items counts
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    from pathlib import Path
+    from threeMF_tools.writer import write_3mf
+
+    if load is None:
+        from mesh_tools.loader import load_mesh as load
+
+    items = normalize_items(items)
+    if instances:
+        groups = {}
+        for item in items:
+            groups.setdefault(item["path"], []).append(item)
+        jobs = list(groups.values())
+    else:
+        jobs = [[item] for item in items]
+
+    def build(group):
+        first = group[0]
+        mesh = load(first["path"])
+        if hasattr(mesh, "geometry"):
+            mesh = mesh.dump(concatenate=True)
+        name = first.get("name") or Path(first["path"]).stem
+        if instances:
+            return {"vertices": mesh.vertices, "faces": mesh.faces, "name": name,
+                    "transforms": [item["matrix"] for item in group]}
+        placed = transformed(mesh, first["matrix"])
+        return {"vertices": placed.vertices, "faces": placed.faces, "name": name}
+
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        write_3mf(output_path, _ordered_map(pool, build, jobs, workers * 2), **write_kwargs)
+
+    return {"path": output_path, "objects": len(jobs), "items": len(items)}
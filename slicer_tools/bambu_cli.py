@@ -1,28 +1,294 @@
 #!/usr/bin/env python3
 """
-Bambu Lab / Orca Slicer CLI wrapper placeholder
-Configure Bambu Cloud API or local slicing integration here
+Bambu Lab / Orca Slicer CLI wrapper
+
+Slices with a local OrcaSlicer or BambuStudio install (both share the
+same command line) and uploads the result to a printer in LAN mode over
+implicit FTPS (port 990, user "bblp", the printer's access code as the
+password).
+
+The slicer CLI has no server mode, so every slice is a fresh process;
+batches get their throughput from running several at once on the slice
+farm and from the slice cache instead. Uploads go in chunks and, after
+a dropped connection, resume from the size already on the printer.
 """
 
-def slice_with_bambu(model_path: str, profile: str, output_path: str) -> dict:
+import ftplib
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+# Slicer binaries tried in order when ORCASLICER is not set
+SLICER_NAMES = ("orca-slicer", "OrcaSlicer", "bambu-studio", "BambuStudio")
+SLICER_APPS = (
+    "/Applications/OrcaSlicer.app/Contents/MacOS/OrcaSlicer",
+    "/Applications/BambuStudio.app/Contents/MacOS/BambuStudio",
+)
+
+SLICE_TIMEOUT = 600
+
+# Printer FTPS defaults (LAN mode)
+FTPS_PORT = 990
+FTPS_USER = "bblp"
+UPLOAD_CHUNK = 1 << 20
+UPLOAD_RETRIES = 3
+UPLOAD_TIMEOUT = 30
+
+
+def find_slicer(binary: str = None) -> str:
     """
-    Slice model using Bambu Lab slicer
-    TODO: Implement Bambu Cloud API integration or local CLI wrapper
+    Locate the OrcaSlicer/BambuStudio binary.
+
+    Checks the explicit argument, then $ORCASLICER, bin/ in the tools
+    directory, PATH and the standard macOS application bundles.
     """
-    return {
-        "status": "not_implemented",
-        "message": "Bambu Lab slicer integration requires manual configuration"
-    }
+    candidates = [binary, os.environ.get("ORCASLICER")]
+    tools_bin = Path(__file__).resolve().parent.parent / "bin"
+    candidates += [str(tools_bin / name) for name in SLICER_NAMES]
+    candidates += [shutil.which(name) for name in SLICER_NAMES]
+    candidates += list(SLICER_APPS)
+    for candidate in candidates:
+        if candidate and os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return candidate
+    raise FileNotFoundError("OrcaSlicer/BambuStudio binary not found (set ORCASLICER)")
+
+
+def preset_list(value) -> list:
+    """Accept a path, a ';'-separated string or a list of paths"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [p for p in value.split(";") if p]
+    return list(value)
 
-def upload_to_printer(gcode_path: str, printer_ip: str) -> dict:
+
+def slice_command(model_path: str, output_3mf: str, settings=None, filaments=None,
+                  plate: int = 0, binary: str = None) -> list:
     """
-    Upload GCode to Bambu Lab printer
-    TODO: Implement Bambu Cloud API or local network upload
+    Build the slicer command line.
+
+    Args:
+        model_path: STL/3MF/OBJ to slice
+        output_3mf: Sliced project to write (.gcode.3mf; G-code per plate inside)
+        settings: Machine and process JSON presets (list or "a.json;b.json")
+        filaments: Filament JSON presets, one per extruder
+        plate: Plate to slice (0 = all)
+        binary: Slicer binary (default: find_slicer())
     """
-    return {
-        "status": "not_implemented",
-        "message": "Printer upload requires Bambu Cloud API credentials"
-    }
+    cmd = [find_slicer(binary), "--slice", str(plate)]
+    settings = preset_list(settings)
+    filaments = preset_list(filaments)
+    if settings:
+        cmd += ["--load-settings", ";".join(settings)]
+    if filaments:
+        cmd += ["--load-filaments", ";".join(filaments)]
+    cmd += ["--outputdir", str(Path(output_3mf).parent), "--export-3mf", str(output_3mf),
+            str(model_path)]
+    return cmd
+
+
+def extract_gcode(sliced_3mf: str, output_gcode: str, plate: int = 1) -> str:
+    """Copy Metadata/plate_<n>.gcode out of a sliced project"""
+    member = f"Metadata/plate_{plate}.gcode"
+    with zipfile.ZipFile(sliced_3mf) as zf:
+        if member not in zf.namelist():
+            raise ValueError(f"{sliced_3mf} has no {member}")
+        with zf.open(member) as src, open(output_gcode, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+    return output_gcode
+
+
+def project_path(output_path: str) -> str:
+    """Sliced project the CLI writes for an output path (.gcode outputs get a sibling .gcode.3mf)"""
+    if str(output_path).endswith(".3mf"):
+        return str(output_path)
+    return str(Path(output_path).with_suffix("")) + ".gcode.3mf"
+
+
+def slice_with_bambu(model_path: str, profile, output_path: str, filaments=None,
+                     plate: int = 0, binary: str = None, timeout: float = SLICE_TIMEOUT) -> dict:
+    """
+    Slice a model with a local OrcaSlicer/BambuStudio.
+
+    Args:
+        model_path: Model to slice
+        profile: Machine and process presets (list or "machine.json;process.json")
+        output_path: .gcode.3mf project (sendable to Bambu printers) or
+            .gcode (plate 1 extracted from the project)
+        filaments: Filament presets
+        plate: Plate to slice (0 = all)
+        binary: Slicer binary (default: find_slicer())
+        timeout: Seconds before the slicer is killed
+
+    Returns:
+        Dict with status and path (and project for .gcode outputs)
+    """
+    try:
+        project = project_path(output_path)
+        cmd = slice_command(model_path, project, profile, filaments, plate, binary)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            return {"status": "error", "message": result.stderr or result.stdout}
+        return finish_slice(project, output_path)
+    except subprocess.TimeoutExpired:
+        return {"status": "error", "message": f"Slicer timed out after {timeout} seconds"}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+def finish_slice(project: str, output_path: str) -> dict:
+    """Result for a finished slice, extracting plate 1 G-code when a .gcode was asked for"""
+    if not os.path.exists(project):
+        return {"status": "error", "message": f"Slicer did not write {project}"}
+    if str(output_path).endswith(".3mf"):
+        return {"status": "success", "path": project}
+    extract_gcode(project, output_path)
+    return {"status": "success", "path": str(output_path), "project": project}
+
+
+class ImplicitFTP_TLS(ftplib.FTP_TLS):
+    """
+    FTP_TLS for implicit TLS servers (Bambu printers listen on 990).
+
+    The control socket is wrapped as soon as it connects, and data
+    connections reuse the control session, which the printer's server
+    requires.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sock = None
+
+    @property
+    def sock(self):
+        return self._sock
+
+    @sock.setter
+    def sock(self, value):
+        if value is not None and not isinstance(value, ssl.SSLSocket):
+            value = self.context.wrap_socket(value, server_hostname=self.host)
+        self._sock = value
+
+    def ntransfercmd(self, cmd, rest=None):
+        conn, size = ftplib.FTP.ntransfercmd(self, cmd, rest)
+        if self._prot_p:
+            conn = self.context.wrap_socket(conn, server_hostname=self.host,
+                                            session=self.sock.session)
+        return conn, size
+
+
+def _connect(host: str, port: int, user: str, password: str, secure: bool, timeout: float):
+    if secure:
+        # Printers use self-signed certificates
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        ftp = ImplicitFTP_TLS(context=context, timeout=timeout)
+    else:
+        ftp = ftplib.FTP(timeout=timeout)
+    ftp.connect(host, port)
+    ftp.login(user, password)
+    if secure:
+        ftp.prot_p()
+    return ftp
+
+
+def _remote_size(ftp, name: str) -> int:
+    """Size of a remote file, 0 when it does not exist"""
+    try:
+        ftp.voidcmd("TYPE I")
+        return ftp.size(name) or 0
+    except ftplib.error_perm:
+        return 0
+
+
+def upload_to_printer(gcode_path: str, printer_ip: str, access_code: str = None,
+                      remote_name: str = None, remote_dir: str = "/", port: int = FTPS_PORT,
+                      user: str = FTPS_USER, secure: bool = True, chunk_size: int = UPLOAD_CHUNK,
+                      retries: int = UPLOAD_RETRIES, timeout: float = UPLOAD_TIMEOUT) -> dict:
+    """
+    Upload a file to a printer over FTPS, resuming interrupted transfers.
+
+    The first attempt always sends the whole file, replacing any file of
+    the same name. A retry asks the server how much it has and sends only
+    the rest (REST + STOR), as long as that is no more than this call has
+    already sent; otherwise the remote file is from elsewhere and the
+    upload starts over.
+
+    Args:
+        gcode_path: Local .gcode or .gcode.3mf
+        printer_ip: Printer address
+        access_code: LAN access code (default: $BAMBU_ACCESS_CODE)
+        remote_name: Name on the printer (default: local file name)
+        remote_dir: Folder on the printer
+        port: 990 for implicit FTPS; use plain FTP servers with secure=False
+        user: FTP user ("bblp" on Bambu printers)
+        secure: Implicit TLS; False for plain FTP (local test servers)
+        chunk_size: Bytes per write
+        retries: Reconnect attempts after a failure
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Dict with status, remote_path, bytes, attempts and resumed_from
+        (bytes already on the printer when the successful attempt began)
+    """
+    access_code = access_code or os.environ.get("BAMBU_ACCESS_CODE", "")
+    remote_name = remote_name or os.path.basename(gcode_path)
+    total = os.path.getsize(gcode_path)
+    remote_path = remote_dir.rstrip("/") + "/" + remote_name
+    # Highest offset this call has handed to the server
+    sent = 0
+    error = None
+
+    for attempt in range(1, retries + 2):
+        ftp = None
+        try:
+            ftp = _connect(printer_ip, port, user, access_code, secure, timeout)
+            ftp.cwd(remote_dir)
+            offset = 0
+            if sent:
+                offset = _remote_size(ftp, remote_name)
+                if offset > sent:
+                    offset = 0
+            resumed_from = offset
+            if offset < total or attempt == 1:
+                position = offset
+
+                def count(block):
+                    nonlocal position, sent
+                    position += len(block)
+                    sent = max(sent, position)
+
+                with open(gcode_path, "rb") as f:
+                    f.seek(offset)
+                    ftp.storbinary(f"STOR {remote_name}", f, blocksize=chunk_size,
+                                   callback=count, rest=offset or None)
+            ftp.quit()
+            return {"status": "success", "remote_path": remote_path, "bytes": total,
+                    "resumed_from": resumed_from, "attempts": attempt}
+        except (OSError, EOFError, ftplib.Error) as e:
+            error = e
+            if ftp is not None:
+                ftp.close()
+            if attempt <= retries:
+                time.sleep(min(2 ** (attempt - 1), 10))
+
+    return {"status": "error", "message": f"Upload failed after {retries + 1} attempts: {error}",
+            "remote_path": remote_path}
+
 
 if __name__ == "__main__":
-    print("Bambu CLI wrapper placeholder - configure manually")
+    if len(sys.argv) >= 4 and sys.argv[1] == "slice":
+        print(slice_with_bambu(sys.argv[2], sys.argv[4:] or None, sys.argv[3]))
+    elif len(sys.argv) == 4 and sys.argv[1] == "upload":
+        print(upload_to_printer(sys.argv[2], sys.argv[3]))
+    else:
+        print("Usage:")
+        print("  bambu_cli.py slice <model> <output.gcode.3mf|.gcode> [preset.json ...]")
+        print("  bambu_cli.py upload <file> <printer_ip>   (access code from $BAMBU_ACCESS_CODE)")
+        sys.exit(1)
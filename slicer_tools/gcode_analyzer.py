@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Streaming G-code analyzer
+
+One pass over a memory-mapped G-code file gives the layer count, the
+filament length and mass, a motion-planned print time and the bounding
+box of the extruded material. Lines are read straight out of the mapping
+one at a time, so memory use does not grow with file size.
+
+The time estimate plans each move as a trapezoid (accelerate, cruise,
+decelerate) with Marlin-style junction deviation deciding how fast
+consecutive moves may be joined. Acceleration follows M204, and G4
+dwells are included. G2/G3 arcs (I/J centre or R radius, XY plane) are
+planned as the short chords the firmware moves along. Planning looks one
+move ahead, so very short segments (dense curves) come out slightly
+optimistic.
+"""
+
+import math
+import mmap
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# Planner defaults (overridden by M204 in the file)
+DEFAULT_ACCEL = 1000.0          # mm/s²
+DEFAULT_FEEDRATE = 1500.0       # mm/min until the first F word
+JUNCTION_DEVIATION = 0.05       # mm
+ARC_SEGMENT_MM = 1.0            # longest chord of an arc (Marlin MM_PER_ARC_SEGMENT)
+
+# Filament defaults (PLA)
+FILAMENT_DIAMETER = 1.75        # mm
+FILAMENT_DENSITY = 1.24         # g/cm³
+
+# Files whose analysis is remembered
+MEMO_SIZE = 256
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def iter_lines(path: str):
+    """Yield the lines of a file from a read-only memory mapping"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter(mm.readline, b"")
+
+
+def _words(parts: list) -> dict:
+    """{letter: float} for the parameter words of a split command line"""
+    words = {}
+    for word in parts[1:]:
+        try:
+            words[chr(word[0]).upper()] = float(word[1:])
+        except ValueError:
+            pass
+    return words
+
+
+def _comment_value(comment: bytes, prefix: bytes):
+    """Text after prefix in a comment such as ;TIME:1234, or None"""
+    if comment.startswith(prefix):
+        return comment[len(prefix):].strip().decode(errors="replace")
+    return None
+
+
+def _arc_points(x: float, y: float, z: float, nx: float, ny: float, nz: float,
+                words: dict, clockwise: bool):
+    """
+    Points along a G2/G3 arc from (x, y, z) to (nx, ny, nz), excluding the start.
+
+    The arc is split wherever it crosses a quadrant, so the points include
+    its exact X/Y extremes, then into chords of at most ARC_SEGMENT_MM.
+    Z moves linearly with the angle (helix). Returns None when the words
+    don't describe an arc, which the caller treats as a straight move.
+    """
+    if "I" in words or "J" in words:
+        cx, cy = x + words.get("I", 0.0), y + words.get("J", 0.0)
+    elif words.get("R"):
+        # Centre on the chord's perpendicular bisector; R < 0 takes the long way round
+        r = words["R"]
+        hx, hy = (nx - x) / 2, (ny - y) / 2
+        half = math.hypot(hx, hy)
+        if half == 0:
+            return None
+        side = -1.0 if clockwise != (r < 0) else 1.0
+        h = side * math.sqrt(max(r * r - half * half, 0.0)) / half
+        cx, cy = x + hx - hy * h, y + hy + hx * h
+    else:
+        return None
+    radius = math.hypot(x - cx, y - cy)
+    if radius == 0:
+        return None
+
+    direction = -1.0 if clockwise else 1.0
+    start = math.atan2(y - cy, x - cx)
+    if math.isclose(nx, x, abs_tol=1e-6) and math.isclose(ny, y, abs_tol=1e-6):
+        sweep = 2 * math.pi
+    else:
+        sweep = direction * (math.atan2(ny - cy, nx - cx) - start) % (2 * math.pi)
+
+    quarter = math.pi / 2
+    stops = []
+    t = (-direction * start) % quarter or quarter
+    while t < sweep:
+        stops.append(t)
+        t += quarter
+    stops.append(sweep)
+
+    points = []
+    previous = 0.0
+    for stop in stops:
+        steps = max(1, math.ceil(radius * (stop - previous) / ARC_SEGMENT_MM))
+        for step in range(1, steps + 1):
+            t = previous + (stop - previous) * step / steps
+            angle = start + direction * t
+            points.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle),
+                           z + (nz - z) * t / sweep))
+        previous = stop
+    points[-1] = (nx, ny, nz)
+    return points
+
+
+def _move_time(length: float, v_entry: float, v_cruise: float, v_exit: float, accel: float) -> float:
+    """Time for one trapezoidal (or triangular) velocity profile"""
+    if length <= 0:
+        return 0.0
+    d_accel = max(0.0, (v_cruise ** 2 - v_entry ** 2) / (2 * accel))
+    d_decel = max(0.0, (v_cruise ** 2 - v_exit ** 2) / (2 * accel))
+    if d_accel + d_decel > length:
+        # Never reaches cruise speed: peak where the two ramps meet
+        v_peak = math.sqrt(max(0.0, (2 * accel * length + v_entry ** 2 + v_exit ** 2) / 2))
+        v_peak = max(v_peak, v_entry, v_exit)
+        return (v_peak - v_entry) / accel + (v_peak - v_exit) / accel
+    cruise = length - d_accel - d_decel
+    return (v_cruise - v_entry) / accel + cruise / v_cruise + (v_cruise - v_exit) / accel
+
+
+def _junction_speed(prev_unit, unit, v_limit: float, accel: float) -> float:
+    """Highest speed at the corner between two moves (junction deviation)"""
+    if prev_unit is None:
+        return 0.0
+    cos_theta = -(prev_unit[0] * unit[0] + prev_unit[1] * unit[1] + prev_unit[2] * unit[2])
+    if cos_theta > 0.999999:
+        # Full reversal
+        return 0.0
+    if cos_theta < -0.999999:
+        # Straight through
+        return v_limit
+    sin_half = math.sqrt(0.5 * (1.0 - cos_theta))
+    return min(v_limit, math.sqrt(accel * JUNCTION_DEVIATION * sin_half / (1.0 - sin_half)))
+
+
+class _Planner:
+    """One-move lookahead trapezoid planner that accumulates time"""
+
+    def __init__(self):
+        self.time = 0.0
+        self.pending = None   # (length, v_cruise, accel, unit) of the move awaiting its exit speed
+        self.v_entry = 0.0
+
+    def add(self, length: float, v_cruise: float, accel: float, unit):
+        if self.pending is not None:
+            p_length, p_cruise, p_accel, p_unit = self.pending
+            v_junction = _junction_speed(p_unit, unit, min(p_cruise, v_cruise), min(p_accel, accel))
+            # The previous move must be able to slow from its entry speed to the junction
+            v_junction = min(v_junction, math.sqrt(self.v_entry ** 2 + 2 * p_accel * p_length))
+            self.time += _move_time(p_length, self.v_entry, p_cruise, v_junction, p_accel)
+            self.v_entry = v_junction
+        self.pending = (length, v_cruise, accel, unit)
+
+    def flush(self):
+        """Finish the pending move with a stop (before dwells and at the end)"""
+        if self.pending is not None:
+            length, v_cruise, accel, _ = self.pending
+            self.time += _move_time(length, self.v_entry, v_cruise, 0.0, accel)
+        self.pending = None
+        self.v_entry = 0.0
+
+
+def analyze_gcode(path: str, filament_diameter: float = FILAMENT_DIAMETER,
+                  filament_density: float = FILAMENT_DENSITY) -> dict:
+    """
+    Analyze a G-code file in one streaming pass.
+
+    Args:
+        path: G-code file
+        filament_diameter: mm, for the mass estimate
+        filament_density: g/cm³, for the mass estimate
+
+    Returns:
+        Dict with layers, filament_mm, filament_g, time_s, bounds
+        ([[min], [max]] of extruding moves, or None), moves, lines and
+        slicer_reported (the slicer's own ;TIME / filament comments, when present)
+    """
+    x = y = z = e = 0.0
+    absolute = True
+    absolute_e = True
+    feedrate = DEFAULT_FEEDRATE
+    accel = DEFAULT_ACCEL
+    planner = _Planner()
+
+    filament = 0.0
+    moves = 0
+    lines = 0
+    layer_comments = 0
+    layer_heights = set()
+    lo = [math.inf] * 3
+    hi = [-math.inf] * 3
+    reported = {}
+
+    for raw in iter_lines(path):
+        lines += 1
+        code, _, comment = raw.partition(b";")
+        if comment:
+            if comment.startswith(b"LAYER:"):
+                layer_comments += 1
+            elif comment[:1] in (b"T", b"F", b"L"):
+                for key, prefix in (("time_s", b"TIME:"), ("filament", b"Filament used:"),
+                                    ("layers", b"LAYER_COUNT:")):
+                    value = _comment_value(comment, prefix)
+                    if value is not None:
+                        reported[key] = value
+        parts = code.split()
+        if not parts:
+            continue
+
+        command = parts[0].upper()
+        if command in (b"G0", b"G1", b"G00", b"G01", b"G2", b"G3", b"G02", b"G03"):
+            words = _words(parts)
+            if "F" in words:
+                feedrate = words["F"]
+            if absolute:
+                nx, ny, nz = words.get("X", x), words.get("Y", y), words.get("Z", z)
+            else:
+                nx, ny, nz = x + words.get("X", 0.0), y + words.get("Y", 0.0), z + words.get("Z", 0.0)
+            if "E" in words:
+                de = words["E"] - e if absolute_e else words["E"]
+                e = words["E"] if absolute_e else e + words["E"]
+            else:
+                de = 0.0
+
+            points = None
+            if command[-1:] in (b"2", b"3"):
+                points = _arc_points(x, y, z, nx, ny, nz, words, clockwise=command[-1:] == b"2")
+            if points is None:
+                points = [(nx, ny, nz)]
+
+            speed = feedrate / 60.0
+            travelled = False
+            px, py, pz = x, y, z
+            for qx, qy, qz in points:
+                dx, dy, dz = qx - px, qy - py, qz - pz
+                length = math.sqrt(dx * dx + dy * dy + dz * dz)
+                if length > 0:
+                    planner.add(length, speed, accel, (dx / length, dy / length, dz / length))
+                    travelled = True
+                px, py, pz = qx, qy, qz
+            if travelled:
+                moves += 1
+                if de > 0:
+                    # Extruding move: part of the printed volume
+                    for px, py, pz in [(x, y, z)] + points:
+                        lo = [min(lo[0], px), min(lo[1], py), min(lo[2], pz)]
+                        hi = [max(hi[0], px), max(hi[1], py), max(hi[2], pz)]
+                    layer_heights.add(round(nz, 4))
+            elif de:
+                # Retract / unretract: extruder-only move, planned on its own
+                planner.flush()
+                planner.time += abs(de) / speed
+            filament += de
+            x, y, z = nx, ny, nz
+        elif command == b"G92":
+            words = _words(parts)
+            x, y, z = words.get("X", x), words.get("Y", y), words.get("Z", z)
+            e = words.get("E", e)
+        elif command in (b"G90", b"G91"):
+            absolute = command == b"G90"
+            absolute_e = absolute
+        elif command in (b"M82", b"M83"):
+            absolute_e = command == b"M82"
+        elif command == b"G28":
+            planner.flush()
+            words = _words(parts)
+            if not words:
+                x = y = z = 0.0
+            else:
+                x = 0.0 if "X" in words else x
+                y = 0.0 if "Y" in words else y
+                z = 0.0 if "Z" in words else z
+        elif command == b"G4":
+            planner.flush()
+            words = _words(parts)
+            planner.time += words.get("S", 0.0) + words.get("P", 0.0) / 1000.0
+        elif command == b"M204":
+            words = _words(parts)
+            # Marlin: P = printing, S = legacy for both
+            value = words.get("P", words.get("S"))
+            if value:
+                accel = value
+    planner.flush()
+
+    area = math.pi * (filament_diameter / 2) ** 2
+    return {
+        "layers": layer_comments or len(layer_heights),
+        "filament_mm": round(filament, 2),
+        "filament_g": round(filament * area * filament_density / 1000.0, 2),
+        "time_s": round(planner.time, 1),
+        "bounds": [lo, hi] if lo[0] != math.inf else None,
+        "moves": moves,
+        "lines": lines,
+        "slicer_reported": reported,
+    }
+
+
+def analysis_for(path: str, **kwargs) -> dict:
+    """
+    analyze_gcode memoized on path + mtime + size (+ filament settings)
+    for the MEMO_SIZE most recently used files.
+    """
+    st = os.stat(path)
+    memo_key = (os.path.realpath(path), st.st_mtime_ns, st.st_size, tuple(sorted(kwargs.items())))
+    with _memo_lock:
+        if memo_key in _memo:
+            _memo.move_to_end(memo_key)
+            return dict(_memo[memo_key])
+    result = analyze_gcode(path, **kwargs)
+    with _memo_lock:
+        _memo[memo_key] = result
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return dict(result)
+
+
+def format_duration(seconds: float) -> str:
+    """1h 02m 03s style duration"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}h {minutes:02d}m {seconds:02d}s" if hours else f"{minutes}m {seconds:02d}s"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: gcode_analyzer.py <file.gcode> [...]")
+        sys.exit(1)
+    for gcode in sys.argv[1:]:
+        info = analyze_gcode(gcode)
+        print(f"{gcode}:")
+        print(f"  Layers:   {info['layers']}")
+        print(f"  Time:     {format_duration(info['time_s'])}")
+        print(f"  Filament: {info['filament_mm'] / 1000:.2f} m ({info['filament_g']:.1f} g)")
+        if info["bounds"]:
+            lo, hi = info["bounds"]
+            print("  Size:     " + " × ".join(f"{b - a:.1f}" for a, b in zip(lo, hi)) + " mm")
+        if info["slicer_reported"]:
+            print(f"  Slicer:   {info['slicer_reported']}")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+G-code cache keyed on geometry, profile and slicer
+
+The result cache keys on input file bytes, so re-exporting a model
+(STL → OBJ, a different exporter, reordered faces) misses even when the
+geometry is identical. Slices are instead keyed on:
+
+- a canonical geometry hash: every triangle's corners are rounded to
+  float32, quantized and hashed, each triangle is rotated to start at
+  its smallest corner (winding is kept), and the triangles are sorted,
+  so vertex order, face order, indexing and file format drop out
+- the profile JSON re-serialized with sorted keys, so formatting and key
+  order drop out
+- the digest of the slicer binary
+
+G-code compresses roughly 4-6x, so entries are stored gzipped and
+decompressed on a hit.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from mesh_tools.result_cache import CACHE_DIR, DiskCache, tool_version
+
+SLICE_CACHE_MB = float(os.environ.get("TOOLS_SLICE_CACHE_MB", "4096"))
+
+# Decimals kept when hashing coordinates (after rounding to float32):
+# 0.1 µm in mm units, far below slicer resolution
+GEOMETRY_DIGITS = 4
+
+# Triangles hashed per batch
+HASH_BATCH = 1 << 20
+
+# Project members ignored by project_hash (plate previews)
+THUMBNAIL_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+# Models whose geometry_hash is remembered
+GEOMETRY_MEMO_SIZE = 256
+
+# Bump when the key material changes so old entries are not reused
+SLICE_CACHE_VERSION = 1
+
+_geometry_memo = OrderedDict()
+_geometry_lock = threading.Lock()
+
+
+def geometry_hash(path, digits: int = GEOMETRY_DIGITS) -> str:
+    """
+    Canonical hash of a model's triangles, memoized on path + mtime + size
+    for the GEOMETRY_MEMO_SIZE most recently used files.
+
+    Identical geometry hashes the same whatever the file format, vertex
+    indexing, vertex order or face order.
+    """
+    st = os.stat(path)
+    memo_key = (os.path.realpath(path), st.st_mtime_ns, st.st_size, digits)
+    with _geometry_lock:
+        if memo_key in _geometry_memo:
+            _geometry_memo.move_to_end(memo_key)
+            return _geometry_memo[memo_key]
+
+    from mesh_tools.loader import is_binary_stl, load_mesh
+    from mesh_tools.stl_reader import corner_hashes, open_binary_stl
+
+    if is_binary_stl(path):
+        # Corners straight from the memmap, no welding needed
+        corners = open_binary_stl(str(path))["vertices"]
+    else:
+        mesh = load_mesh(path, force="mesh", process=False)
+        corners = mesh.vertices[mesh.faces]
+
+    count = len(corners)
+    hashes = np.empty((count, 3), dtype=np.uint64)
+    for start in range(0, count, HASH_BATCH):
+        # Snap to float32 first: binary STL stores float32, text formats
+        # print more digits of the same values
+        batch = np.asarray(corners[start:start + HASH_BATCH], dtype=np.float32).reshape(-1, 3)
+        hashes[start:start + HASH_BATCH] = corner_hashes(batch, digits).reshape(-1, 3)
+
+    # Rotate each triangle to start at its smallest corner (keeps winding)
+    first = np.argmin(hashes, axis=1)
+    rolled = hashes[np.arange(count)[:, None], (first[:, None] + np.arange(3)) % 3]
+    del hashes
+    order = np.lexsort((rolled[:, 2], rolled[:, 1], rolled[:, 0]))
+
+    h = hashlib.blake2b(digest_size=32)
+    h.update(f"{count}:{digits}".encode())
+    h.update(np.ascontiguousarray(rolled[order]).tobytes())
+    digest = h.hexdigest()
+
+    with _geometry_lock:
+        _geometry_memo[memo_key] = digest
+        while len(_geometry_memo) > GEOMETRY_MEMO_SIZE:
+            _geometry_memo.popitem(last=False)
+    return digest
+
+
+def profile_hash(path) -> str:
+    """Hash of a profile JSON independent of formatting and key order"""
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        data = json.dumps(json.loads(data), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        # Not JSON: hash the raw bytes
+        pass
+    return hashlib.sha256(data).hexdigest()
+
+
+def project_hash(path) -> str:
+    """
+    Hash of a 3MF project's members other than thumbnails.
+
+    Orca/Bambu projects carry per-object settings, modifiers, paint data
+    and filament assignments (Metadata/*.config, attributes in the
+    model XML) that change the G-code without changing the geometry.
+    Members are compared by name, CRC-32 and size from the zip
+    directory, so nothing is decompressed. Returns "" for other files.
+    """
+    import zipfile
+
+    if not zipfile.is_zipfile(path):
+        return ""
+    with zipfile.ZipFile(path) as zf:
+        members = sorted(
+            (info.filename, info.CRC, info.file_size) for info in zf.infolist()
+            if not info.filename.lower().endswith(THUMBNAIL_SUFFIXES)
+        )
+    return hashlib.sha256(json.dumps(members).encode()).hexdigest()
+
+
+class SliceCache(DiskCache):
+    """DiskCache of gzipped G-code keyed on geometry + profile + slicer"""
+
+    def __init__(self, root=None, budget_bytes: int = None):
+        if root is None:
+            root = CACHE_DIR / "slices"
+        if budget_bytes is None:
+            budget_bytes = int(SLICE_CACHE_MB * 1024 * 1024)
+        super().__init__(root, budget_bytes)
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    @staticmethod
+    def key(model_path, profile_path, slicer, args: dict = None) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            model_path: Model file (geometry is hashed, not bytes)
+            profile_path: Profile JSON (or None)
+            slicer: Slicer binary path (hashed) or version string
+            args: JSON-serializable extra settings that affect the G-code
+        """
+        material = {
+            "version": SLICE_CACHE_VERSION,
+            "geometry": geometry_hash(model_path),
+            "profile": profile_hash(profile_path) if profile_path else "",
+            "slicer": tool_version(slicer),
+            "args": args or {},
+        }
+        blob = json.dumps(material, sort_keys=True, default=str).encode()
+        return hashlib.sha256(blob).hexdigest()
+
+    def fetch(self, key: str, output_path) -> bool:
+        """On hit, decompress the cached G-code to output_path"""
+        cached = self.get(key, ".gcode.gz")
+        if cached is None:
+            return False
+        # Unique name next to the output, so concurrent hits for the same
+        # path don't write into each other's temp file
+        output_path = Path(output_path)
+        tmp = output_path.with_name(f".{output_path.name}.{os.urandom(4).hex()}.tmp")
+        try:
+            with gzip.open(cached, "rb") as src, open(tmp, "xb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(tmp, output_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return True
+
+    def store(self, key: str, output_path) -> Path:
+        """Compress a freshly sliced G-code file into the cache"""
+        def fill(tmp):
+            with open(output_path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+
+        path = self._write(key, ".gcode.gz", fill)
+        with self._lock:
+            self.raw_bytes += os.path.getsize(output_path)
+            self.stored_bytes += path.stat().st_size if path.exists() else 0
+        return path
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        # Ratio over entries stored by this process
+        stats["compression_ratio"] = (
+            round(self.raw_bytes / self.stored_bytes, 2) if self.stored_bytes else None
+        )
+        return stats
+
+
+_slice_cache = None
+
+
+def slice_cache() -> SliceCache:
+    """Process-wide SliceCache using CACHE_DIR and SLICE_CACHE_MB"""
+    global _slice_cache
+    if _slice_cache is None:
+        _slice_cache = SliceCache()
+    return _slice_cache
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Local slicing farm
+
+Runs several slicer processes at once from a priority queue. The number
+of slots is bounded by both CPU count and available memory (a slicer
+instance on a large model easily takes a few GB). Queued jobs can be
+cancelled; running jobs are killed. Each finished job records its wall
+time and the CPU time and peak RSS of its own process, taken from
+os.wait4 (resource.getrusage(RUSAGE_CHILDREN) only reports the sum over
+all children, which is useless with several jobs in flight).
+
+The farm only runs command lines, so it works for any slicer CLI; the
+MCP server builds CuraEngine commands and submits them here.
+"""
+
+import heapq
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Memory reserved per slicer process when sizing the farm (MB)
+SLICE_JOB_MEM_MB = float(os.environ.get("TOOLS_SLICE_JOB_MEM_MB", "2048"))
+
+# Default per-job timeout (seconds)
+SLICE_TIMEOUT = 300
+
+# How often a running job checks for cancellation and timeout (seconds)
+POLL_INTERVAL = 0.05
+
+# Bytes of stderr kept in a failed job's message
+STDERR_TAIL = 4096
+
+FINISHED = ("success", "error", "timeout", "cancelled")
+
+
+def available_memory() -> int:
+    """Available physical memory in bytes (None when unknown)"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_slots(job_mem_mb: float = SLICE_JOB_MEM_MB) -> int:
+    """Concurrent slicer processes: min(CPU count, available memory / per-job budget)"""
+    slots = os.cpu_count() or 1
+    memory = available_memory()
+    if memory is not None and job_mem_mb > 0:
+        slots = min(slots, int(memory // (job_mem_mb * 1024 * 1024)))
+    return max(1, slots)
+
+
+def _max_rss_bytes(ru_maxrss: int) -> int:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return ru_maxrss if sys.platform == "darwin" else ru_maxrss * 1024
+
+
+class SliceFarm:
+    """Priority queue of slicer command lines run on a bounded set of slots"""
+
+    def __init__(self, slots: int = None, cache=None):
+        """
+        Args:
+            slots: Concurrent processes (default: default_slots())
+            cache: ResultCache used for jobs submitted with a cache key
+        """
+        self.slots = slots or default_slots()
+        self.cache = cache
+        self._queue = []   # (priority, seq, job id)
+        self._jobs = {}    # job id -> record
+        self._procs = {}   # job id -> Popen of running jobs
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f"slice-farm-{i}", daemon=True)
+            for i in range(self.slots)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, cmd: list, output_path: str, priority: int = 0,
+               timeout: float = SLICE_TIMEOUT, cache_key: str = None, name: str = None) -> str:
+        """
+        Queue a command line.
+
+        Args:
+            cmd: argv of the slicer process
+            output_path: File the command writes (stored in the cache on success)
+            priority: Lower runs first; equal priorities run in submission order
+            timeout: Seconds before the process is killed
+            cache_key: Result cache key; a hit completes the job without running it
+            name: Label for reports (default: output file name)
+
+        Returns:
+            Job id
+        """
+        seq = next(self._seq)
+        job_id = f"slice-{seq}"
+        record = {
+            "id": job_id,
+            "name": name or os.path.basename(output_path),
+            "path": output_path,
+            "priority": priority,
+            "status": "queued",
+            "submitted": time.time(),
+        }
+        with self._cond:
+            self._jobs[job_id] = record
+            record["_job"] = (cmd, timeout, cache_key)
+            heapq.heappush(self._queue, (priority, seq, job_id))
+            self._cond.notify()
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job or kill a running one; False if already finished"""
+        with self._cond:
+            record = self._jobs.get(job_id)
+            if record is None or record["status"] in FINISHED:
+                return False
+            record["cancel"] = True
+            if record["status"] == "queued":
+                # Left in the heap; the worker that pops it skips it
+                self._finish(record, "cancelled")
+            else:
+                proc = self._procs.get(job_id)
+                if proc is not None:
+                    _kill(proc)
+            return True
+
+    def status(self, job_id: str) -> dict:
+        """Public copy of a job's record"""
+        with self._cond:
+            record = self._jobs.get(job_id)
+            if record is None:
+                raise KeyError(f"Unknown slice job: {job_id}")
+            return {k: v for k, v in record.items() if not k.startswith("_") and k != "cancel"}
+
+    def job_ids(self) -> list:
+        """Ids of every job submitted so far"""
+        with self._cond:
+            return list(self._jobs)
+
+    def wait(self, job_ids: list, timeout: float = None) -> list:
+        """Block until every job has finished (or timeout); return their records"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            for job_id in job_ids:
+                if job_id not in self._jobs:
+                    raise KeyError(f"Unknown slice job: {job_id}")
+                while self._jobs[job_id]["status"] not in FINISHED:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+        return [self.status(job_id) for job_id in job_ids]
+
+    def stats(self) -> dict:
+        """Slot count and jobs per status"""
+        with self._cond:
+            counts = {}
+            for record in self._jobs.values():
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+        return {"slots": self.slots, "jobs": counts}
+
+    def _finish(self, record: dict, status: str, **fields):
+        """Mark a job finished (caller holds the lock)"""
+        record.update(fields)
+        record["status"] = status
+        record.pop("_job", None)
+        self._cond.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                _, _, job_id = heapq.heappop(self._queue)
+                record = self._jobs[job_id]
+                if record["status"] != "queued":
+                    continue
+                cmd, timeout, cache_key = record["_job"]
+                record["status"] = "running"
+                record["started"] = time.time()
+            fields = self._run(job_id, record, cmd, timeout, cache_key)
+            with self._cond:
+                self._finish(record, fields.pop("status"), **fields)
+
+    def _run(self, job_id: str, record: dict, cmd: list, timeout: float, cache_key: str) -> dict:
+        """Run one job to completion; returns its final status and measurements"""
+        output_path = record["path"]
+        if cache_key and self.cache is not None and self.cache.fetch(cache_key, output_path):
+            return {"status": "success", "cached": True, "wall": 0.0}
+
+        start = time.perf_counter()
+        with tempfile.TemporaryFile() as stderr:
+            try:
+                proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=stderr)
+            except OSError as e:
+                return {"status": "error", "message": str(e)}
+            with self._cond:
+                self._procs[job_id] = proc
+                if record.get("cancel"):
+                    _kill(proc)
+
+            # Poll wait4 so the rusage is this child's alone
+            deadline = time.monotonic() + timeout
+            timed_out = False
+            while True:
+                with self._cond:
+                    pid, wait_status, usage = os.wait4(proc.pid, os.WNOHANG)
+                    if pid:
+                        # Reaped: from here on the pid may be reused, so
+                        # cancel() must no longer signal it
+                        proc.returncode = os.waitstatus_to_exitcode(wait_status)
+                        self._procs.pop(job_id, None)
+                        break
+                if not timed_out and time.monotonic() > deadline:
+                    timed_out = True
+                    _kill(proc)
+                time.sleep(POLL_INTERVAL)
+
+            stderr.seek(0)
+            stderr.seek(max(0, os.fstat(stderr.fileno()).st_size - STDERR_TAIL))
+            message = stderr.read().decode(errors="replace")
+
+        fields = {
+            "returncode": proc.returncode,
+            "wall": round(time.perf_counter() - start, 3),
+            "cpu_user": round(usage.ru_utime, 3),
+            "cpu_system": round(usage.ru_stime, 3),
+            "max_rss_mb": round(_max_rss_bytes(usage.ru_maxrss) / (1024 * 1024), 1),
+        }
+        if record.get("cancel"):
+            return {"status": "cancelled", **fields}
+        if timed_out:
+            return {"status": "timeout", "message": f"Killed after {timeout} seconds", **fields}
+        if proc.returncode != 0:
+            return {"status": "error", "message": message, **fields}
+        if cache_key and self.cache is not None and os.path.exists(output_path):
+            self.cache.store(cache_key, output_path)
+        return {"status": "success", **fields}
+
+
+def _kill(proc):
+    """SIGKILL an unreaped process (Popen.send_signal would reap it and lose its rusage)"""
+    try:
+        os.kill(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
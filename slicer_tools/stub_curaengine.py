@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the CuraEngine binary
+
+Accepts the command line the MCP server builds
+(slice -j profile -o output -l model), optionally burns CPU and memory,
+and writes a small G-code file. Point the server at it to exercise
+slicing without CuraEngine installed:
+
+    CURAENGINE=slicer_tools/stub_curaengine.py python mcp_server/server.py
+
+Environment:
+    STUB_CURA_SECONDS: CPU time to burn (default 0.5)
+    STUB_CURA_MB: Memory to allocate and touch (default 0)
+    STUB_CURA_FAIL: Exit with this status instead of slicing
+"""
+
+import argparse
+import os
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="curaengine")
+    parser.add_argument("command", choices=["slice"])
+    parser.add_argument("-j", dest="profile", required=True)
+    parser.add_argument("-o", dest="output", required=True)
+    parser.add_argument("-l", dest="model", required=True)
+    args, _ = parser.parse_known_args()
+
+    for path in (args.profile, args.model):
+        if not os.path.exists(path):
+            print(f"Failed to load {path}", file=sys.stderr)
+            return 1
+
+    fail = int(os.environ.get("STUB_CURA_FAIL", "0"))
+    if fail:
+        print("Stub slicer failure requested", file=sys.stderr)
+        return fail
+
+    ballast = bytearray(int(float(os.environ.get("STUB_CURA_MB", "0")) * 1024 * 1024))
+    for i in range(0, len(ballast), 4096):
+        ballast[i] = 1
+
+    deadline = time.process_time() + float(os.environ.get("STUB_CURA_SECONDS", "0.5"))
+    while time.process_time() < deadline:
+        pass
+
+    with open(args.output, "w") as f:
+        f.write(";FLAVOR:Marlin\n")
+        f.write(f";Generated by stub curaengine from {os.path.basename(args.model)}\n")
+        f.write(";LAYER_COUNT:1\n;LAYER:0\nG28\nG1 X10 Y10 Z0.2 E1 F1200\nM84\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
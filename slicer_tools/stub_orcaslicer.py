@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the OrcaSlicer/BambuStudio CLI
+
+Accepts the command line bambu_cli builds
+(--slice N --load-settings ... --outputdir DIR --export-3mf OUT model)
+and writes a sliced project with Metadata/plate_1.gcode. Point the tools
+at it to exercise Bambu slicing without a slicer installed:
+
+    ORCASLICER=slicer_tools/stub_orcaslicer.py python mcp_server/server.py
+
+Environment:
+    STUB_ORCA_SECONDS: Wall time to take (default 0.2)
+    STUB_ORCA_FAIL: Exit with this status instead of slicing
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="orca-slicer")
+    parser.add_argument("--slice", type=int, default=0)
+    parser.add_argument("--load-settings", default="")
+    parser.add_argument("--load-filaments", default="")
+    parser.add_argument("--outputdir", default=".")
+    parser.add_argument("--export-3mf", required=True)
+    parser.add_argument("models", nargs="+")
+    args = parser.parse_args()
+
+    for path in args.models + [p for p in args.load_settings.split(";") if p]:
+        if not os.path.exists(path):
+            print(f"File not found: {path}", file=sys.stderr)
+            return 1
+
+    fail = int(os.environ.get("STUB_ORCA_FAIL", "0"))
+    if fail:
+        print("Stub slicer failure requested", file=sys.stderr)
+        return fail
+
+    time.sleep(float(os.environ.get("STUB_ORCA_SECONDS", "0.2")))
+
+    gcode = (
+        "; HEADER_BLOCK_START\n"
+        f"; generated by stub orca-slicer from {os.path.basename(args.models[0])}\n"
+        "; total layer number: 2\n; HEADER_BLOCK_END\n"
+        "M83\nG28\n;LAYER:0\nG1 Z0.2 F600\nG1 X20 Y20 E1.5 F1800\n"
+        ";LAYER:1\nG1 Z0.4\nG1 X0 Y0 E1.5\nM400\n"
+    )
+    output = os.path.join(args.outputdir, os.path.basename(args.export_3mf)) \
+        if not os.path.dirname(args.export_3mf) else args.export_3mf
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", '<?xml version="1.0" encoding="UTF-8"?>\n<Types/>\n')
+        zf.writestr("Metadata/plate_1.gcode", gcode)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""rewrite_archive with raw member copies and with the public-API fallback"""
+
+import os
+import zipfile
+
+import pytest
+
+from threeMF_tools import archive
+from threeMF_tools.archive import copy_stream, rewrite_archive
+
+MEMBERS = {
+    "[Content_Types].xml": (b"<Types/>" * 100, zipfile.ZIP_DEFLATED),
+    "3D/3dmodel.model": (b"<model/>" * 10000, zipfile.ZIP_DEFLATED),
+    "Metadata/thumbnail.png": (os.urandom(5000), zipfile.ZIP_STORED),
+}
+
+
+@pytest.fixture
+def package(tmp_path):
+    path = tmp_path / "model.3mf"
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, (data, compression) in MEMBERS.items():
+            zf.writestr(name, data, compress_type=compression)
+    return path
+
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_rewrite_archive(package, tmp_path, monkeypatch, raw):
+    if not raw:
+        monkeypatch.setattr(archive, "RAW_COPY_VERSIONS", ((2, 0), (2, 0)))
+    assert archive.raw_copy_supported() is raw
+
+    def upper(src, dst):
+        dst.write(src.read().upper())
+
+    output = tmp_path / "out.3mf"
+    rewrite_archive(str(package), {"3D/3dmodel.model": upper}, str(output))
+
+    with zipfile.ZipFile(output) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == list(MEMBERS)
+        assert zf.read("3D/3dmodel.model") == MEMBERS["3D/3dmodel.model"][0].upper()
+        for name in ("[Content_Types].xml", "Metadata/thumbnail.png"):
+            data, compression = MEMBERS[name]
+            assert zf.read(name) == data
+            assert zf.getinfo(name).compress_type == compression
+
+
+def test_rewrite_in_place(package):
+    rewrite_archive(str(package), {"[Content_Types].xml": copy_stream})
+    with zipfile.ZipFile(package) as zf:
+        assert {name: zf.read(name) for name in zf.namelist()} == \
+            {name: data for name, (data, _) in MEMBERS.items()}
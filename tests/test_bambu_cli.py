@@ -0,0 +1,215 @@
+"""bambu_cli against the stub OrcaSlicer and a local FTP server"""
+
+import os
+import socket
+import socketserver
+import sys
+import threading
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from slicer_tools import bambu_cli
+from slicer_tools.bambu_cli import slice_with_bambu, upload_to_printer
+
+STUB = Path(__file__).parent.parent / "slicer_tools" / "stub_orcaslicer.py"
+
+
+@pytest.fixture
+def model(tmp_path):
+    path = tmp_path / "cube.stl"
+    path.write_text("solid stub\nendsolid stub\n")
+    return path
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stub runs through its shebang")
+def test_slice_to_project(model, tmp_path):
+    output = tmp_path / "cube.gcode.3mf"
+    result = slice_with_bambu(str(model), None, str(output), binary=str(STUB))
+
+    assert result == {"status": "success", "path": str(output)}
+    with zipfile.ZipFile(output) as zf:
+        assert "G28" in zf.read("Metadata/plate_1.gcode").decode()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stub runs through its shebang")
+def test_slice_to_gcode_extracts_plate(model, tmp_path):
+    output = tmp_path / "cube.gcode"
+    result = slice_with_bambu(str(model), None, str(output), binary=str(STUB))
+
+    assert result["status"] == "success"
+    assert result["project"] == str(tmp_path / "cube.gcode.3mf")
+    assert "stub orca-slicer from cube.stl" in output.read_text()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stub runs through its shebang")
+def test_slice_failure_and_timeout(model, tmp_path, monkeypatch):
+    monkeypatch.setenv("STUB_ORCA_FAIL", "2")
+    result = slice_with_bambu(str(model), None, str(tmp_path / "a.gcode.3mf"), binary=str(STUB))
+    assert result["status"] == "error"
+    assert "failure requested" in result["message"]
+
+    monkeypatch.delenv("STUB_ORCA_FAIL")
+    monkeypatch.setenv("STUB_ORCA_SECONDS", "10")
+    result = slice_with_bambu(str(model), None, str(tmp_path / "b.gcode.3mf"),
+                              binary=str(STUB), timeout=0.5)
+    assert result["status"] == "error"
+    assert "timed out" in result["message"]
+
+
+class FTPServer(socketserver.ThreadingTCPServer):
+    """
+    Just enough of an FTP server for ftplib's login, CWD, SIZE and
+    (REST +) STOR over passive mode. Files live in `root`.
+
+    drop_after: the next STOR keeps this many bytes, then the server
+    closes the data and control connections without replying.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, root: Path):
+        super().__init__(("127.0.0.1", 0), FTPHandler)
+        self.root = root
+        self.drop_after = None
+        self.stores = []   # (name, rest offset) per STOR
+
+
+class FTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        rest = 0
+        passive = None
+        self.reply("220 test server")
+        for raw in self.rfile:
+            command, _, argument = raw.decode().strip().partition(" ")
+            command = command.upper()
+            if command == "USER":
+                self.reply("331 password please")
+            elif command == "PASS":
+                self.reply("230 logged in")
+            elif command in ("CWD", "TYPE"):
+                self.reply("250 ok" if command == "CWD" else "200 ok")
+            elif command == "SIZE":
+                path = server.root / argument
+                if path.exists():
+                    self.reply(f"213 {path.stat().st_size}")
+                else:
+                    self.reply("550 no such file")
+            elif command == "DELE":
+                (server.root / argument).unlink(missing_ok=True)
+                self.reply("250 deleted")
+            elif command == "PASV":
+                passive = socket.create_server(("127.0.0.1", 0))
+                port = passive.getsockname()[1]
+                self.reply(f"227 Entering Passive Mode (127,0,0,1,{port >> 8},{port & 255})")
+            elif command == "REST":
+                rest = int(argument)
+                self.reply(f"350 restarting at {rest}")
+            elif command == "STOR":
+                server.stores.append((argument, rest))
+                self.reply("150 send it")
+                conn, _ = passive.accept()
+                path = server.root / argument
+                # STOR without REST replaces the file; REST keeps its head
+                with open(path, "r+b" if rest and path.exists() else "wb") as f:
+                    f.seek(rest)
+                    f.truncate()
+                    limit, server.drop_after = server.drop_after, None
+                    received = 0
+                    while True:
+                        data = conn.recv(65536)
+                        if not data:
+                            break
+                        if limit is not None and received + len(data) >= limit:
+                            f.write(data[:limit - received])
+                            break
+                        f.write(data)
+                        received += len(data)
+                conn.close()
+                passive.close()
+                rest = 0
+                if limit is not None:
+                    # Drop the control connection too, without a reply
+                    return
+                self.reply("226 transfer complete")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+@pytest.fixture
+def ftp_server(tmp_path, monkeypatch):
+    root = tmp_path / "printer"
+    root.mkdir()
+    server = FTPServer(root)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # No backoff between retries in tests
+    monkeypatch.setattr(bambu_cli.time, "sleep", lambda seconds: None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def upload(path, server, **kwargs):
+    return upload_to_printer(str(path), "127.0.0.1", access_code="code",
+                             port=server.server_address[1], secure=False, timeout=5,
+                             chunk_size=4096, **kwargs)
+
+
+@pytest.fixture
+def plate(tmp_path):
+    path = tmp_path / "plate.gcode.3mf"
+    path.write_bytes(os.urandom(300_000))
+    return path
+
+
+def test_upload(plate, ftp_server):
+    result = upload(plate, ftp_server)
+
+    assert result["status"] == "success"
+    assert result["attempts"] == 1
+    assert result["remote_path"] == "/plate.gcode.3mf"
+    assert (ftp_server.root / plate.name).read_bytes() == plate.read_bytes()
+
+
+def test_upload_resumes_after_dropped_connection(plate, ftp_server):
+    ftp_server.drop_after = 100_000
+    result = upload(plate, ftp_server)
+
+    assert result["status"] == "success"
+    assert result["attempts"] == 2
+    assert result["resumed_from"] == 100_000
+    assert ftp_server.stores == [(plate.name, 0), (plate.name, 100_000)]
+    assert (ftp_server.root / plate.name).read_bytes() == plate.read_bytes()
+
+
+@pytest.mark.parametrize("old_size", [100_000, 300_000, 500_000])
+def test_upload_replaces_file_from_earlier_upload(plate, ftp_server, old_size):
+    # A stale file of the same name (shorter, same size or longer) is
+    # never resumed onto
+    (ftp_server.root / plate.name).write_bytes(os.urandom(old_size))
+    result = upload(plate, ftp_server)
+
+    assert result["status"] == "success"
+    assert result["resumed_from"] == 0
+    assert (ftp_server.root / plate.name).read_bytes() == plate.read_bytes()
+
+
+def test_upload_gives_up_after_retries(plate, tmp_path):
+    # Nothing listens on this port
+    with socket.create_server(("127.0.0.1", 0)) as probe:
+        port = probe.getsockname()[1]
+    result = upload_to_printer(str(plate), "127.0.0.1", access_code="code", port=port,
+                               secure=False, timeout=1, retries=0)
+
+    assert result["status"] == "error"
+    assert "after 1 attempts" in result["message"]
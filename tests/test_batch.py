@@ -0,0 +1,49 @@
+"""run_batch time limits and worker failures"""
+
+import ctypes
+import io
+import os
+import sys
+
+import pytest
+
+from mesh_tools.batch import run_batch
+
+
+def job(input_path):
+    name = os.path.basename(input_path)
+    if name.startswith("block"):
+        # One long C call: no bytecode boundary for a signal handler to run at
+        ctypes.CDLL(None).sleep(30)
+    if name.startswith("crash"):
+        os._exit(3)
+    if name.startswith("fail"):
+        raise ValueError("bad input")
+    return {"name": name}
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for name, size in [("block", 50), ("ok1", 40), ("crash", 30), ("fail", 20), ("ok2", 10)]:
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses libc sleep")
+@pytest.mark.parametrize("parallel", [True, False])
+def test_timeout_kills_blocked_worker(files, parallel, tmp_path):
+    results = run_batch(job, files, parallel=parallel, workers=2, timeout=1,
+                        log_path=tmp_path / "log.jsonl", stream=io.StringIO())
+    by_name = {os.path.basename(record["file"]): record for record in results}
+
+    assert by_name["block"]["message"] == "timed out after 1s"
+    assert by_name["block"]["seconds"] < 10
+    assert by_name["crash"]["message"] == "worker exited with code 3"
+    assert by_name["fail"]["message"] == "bad input"
+    # The killed and crashed workers were replaced
+    assert by_name["ok1"]["result"] == {"name": "ok1"}
+    assert by_name["ok2"]["result"] == {"name": "ok2"}
+    assert [record["ok"] for record in results].count(True) == 2
@@ -0,0 +1,74 @@
+"""boolean / boolean_many early-outs against a plain trimesh boolean"""
+
+import numpy as np
+import pytest
+import trimesh
+
+from mesh_tools.boolean import boolean, boolean_many, overlap_groups
+
+pytest.importorskip("manifold3d")
+
+OPERATIONS = ("union", "difference", "intersection")
+
+
+def box(extents=(1, 1, 1), at=(0, 0, 0), rotate=None):
+    mesh = trimesh.creation.box(extents=extents)
+    if rotate is not None:
+        mesh.apply_transform(trimesh.transformations.rotation_matrix(np.radians(rotate), (0, 0, 1)))
+    mesh.apply_translation(at)
+    return mesh
+
+
+def plain(operation, a, b):
+    result = getattr(trimesh.boolean, operation)([a, b])
+    return result.volume if len(result.faces) else 0.0
+
+
+def volume(mesh):
+    return mesh.volume if len(mesh.faces) else 0.0
+
+
+CASES = {
+    "disjoint": (box(), box(at=(5, 0, 0)), "aabb-disjoint"),
+    # Long diagonal bars: the axis-aligned boxes overlap, the oriented ones don't
+    "diagonal": (box((10, 0.5, 0.5), rotate=45), box((10, 0.5, 0.5), at=(3, -3, 0), rotate=45),
+                 "obb-disjoint"),
+    "touching": (box(), box(at=(1, 0, 0)), "full"),
+    "nested": (box((4, 4, 4)), box(), "full"),
+    "overlapping": (box(), box(at=(0.5, 0.5, 0.5)), "full"),
+    # A has a far shell that the backend never sees
+    "shells": (trimesh.util.concatenate([box(), box(at=(20, 0, 0))]), box(at=(0.5, 0, 0)),
+               "shells"),
+}
+
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+@pytest.mark.parametrize("case", CASES)
+def test_boolean_matches_plain_boolean(case, operation):
+    a, b, strategy = CASES[case]
+    result, info = boolean(a, b, operation)
+
+    assert info["strategy"] == strategy
+    assert volume(result) == pytest.approx(plain(operation, a, b), abs=1e-6)
+
+
+def test_overlap_groups():
+    bounds = np.array([box(at=at).bounds for at in [(0, 0, 0), (0.5, 0, 0), (5, 0, 0), (1.2, 0, 0)]])
+    groups = sorted(sorted(group.tolist()) for group in overlap_groups(bounds))
+    assert groups == [[0, 1, 3], [2]]
+
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+def test_boolean_many_matches_sequential_booleans(operation):
+    base = box((10, 2, 2))
+    operands = [
+        box(at=(-4, 0, 1)), box(at=(-3.5, 0.5, 1)), box(at=(-3, 0, 1)),   # one overlapping cluster
+        box(at=(2, 0, 1)),                                                  # overlaps no other operand
+        box(at=(30, 0, 0)),                                                 # misses the base
+    ]
+    result, info = boolean_many(base, operands, operation, workers=1)
+
+    tool = trimesh.boolean.union(operands)
+    assert volume(result) == pytest.approx(plain(operation, base, tool), abs=1e-6)
+    assert info["skipped"] == (0 if operation == "union" else 1)
+    assert info["groups"] == (3 if operation == "union" else 2)
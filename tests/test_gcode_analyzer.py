@@ -0,0 +1,67 @@
+"""analyze_gcode on small hand-written files"""
+
+import math
+from collections import OrderedDict
+
+import pytest
+
+from slicer_tools import gcode_analyzer
+from slicer_tools.gcode_analyzer import analysis_for, analyze_gcode
+
+HEADER = "G90\nG1 X20 Y10 Z0.2 F3000\n"
+
+
+def analyze(tmp_path, body):
+    path = tmp_path / "test.gcode"
+    path.write_text(HEADER + body)
+    return analyze_gcode(str(path))
+
+
+def line_time(tmp_path, length):
+    return analyze(tmp_path, f"G91\nG1 X{length} E1\n")["time_s"] - analyze(tmp_path, "")["time_s"]
+
+
+@pytest.mark.parametrize("arc", ["G3 X20 Y30 I0 J10", "G3 X20 Y30 R10"])
+def test_arc_bounds_follow_the_bulge(tmp_path, arc):
+    # Half circle through x=30, not the chord from (20, 10) to (20, 30)
+    info = analyze(tmp_path, f"M83\n{arc} E5\n")
+    lo, hi = info["bounds"]
+    assert hi[0] == pytest.approx(30.0)
+    assert lo[0] == pytest.approx(20.0)
+    assert (lo[1], hi[1]) == (10.0, 30.0)
+    assert info["filament_mm"] == 5.0
+
+
+def test_negative_radius_takes_the_long_way(tmp_path):
+    # Three quarters of a circle around (30, 10) instead of a quarter around (20, 20)
+    lo, hi = analyze(tmp_path, "M83\nG3 X30 Y20 R-10 E5\n")["bounds"]
+    assert lo[:2] == pytest.approx([20.0, 0.0])
+    assert hi[:2] == pytest.approx([40.0, 20.0])
+
+
+def test_clockwise_full_circle(tmp_path):
+    info = analyze(tmp_path, "G2 X20 Y10 I0 J10 E3\n")
+    lo, hi = info["bounds"]
+    assert lo[:2] == pytest.approx([10.0, 10.0])
+    assert hi[:2] == pytest.approx([30.0, 30.0])
+    # Absolute E is booked once for the whole arc
+    assert info["filament_mm"] == 3.0
+
+
+def test_arc_time_follows_arc_length(tmp_path):
+    arc = analyze(tmp_path, "M83\nG3 X20 Y30 I0 J10 E5\n")["time_s"] - analyze(tmp_path, "")["time_s"]
+    # The arc is 10π mm long; its 20 mm chord would take far less
+    assert arc == pytest.approx(line_time(tmp_path, 10 * math.pi), abs=0.3)
+    assert arc > line_time(tmp_path, 20) + 0.1
+
+
+def test_analysis_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(gcode_analyzer, "MEMO_SIZE", 2)
+    monkeypatch.setattr(gcode_analyzer, "_memo", OrderedDict())
+    paths = []
+    for i in range(4):
+        paths.append(tmp_path / f"plate{i}.gcode")
+        paths[-1].write_text(HEADER + f"G1 X{30 + i} E1\n")
+        analysis_for(str(paths[-1]))
+
+    assert [key[0] for key in gcode_analyzer._memo] == [str(p.resolve()) for p in paths[2:]]
@@ -0,0 +1,25 @@
+"""build_lods: one build per digest, locks dropped afterwards"""
+
+import threading
+
+import trimesh
+
+from mesh_tools import lod
+
+SPHERE = trimesh.creation.icosphere(5)
+
+
+def test_concurrent_builds_share_one_lock_and_release_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(lod, "_lod_cache", lod.LodCache(tmp_path / "lod", 1 << 30))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lod.build_lods(SPHERE, workers=1)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 3
+    assert all(result == results[0] for result in results)
+    assert all(path.exists() for path in results[0].values())
+    assert lod._build_locks == {}
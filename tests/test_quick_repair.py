@@ -0,0 +1,81 @@
+"""quick_repair: orientation, hole filling and inside-out components"""
+
+import numpy as np
+import pytest
+import trimesh
+
+from mesh_tools.quick_repair import quick_repair_mesh
+
+
+def sphere(at=(0, 0, 0)):
+    mesh = trimesh.creation.icosphere(3)
+    mesh.apply_translation(at)
+    return mesh
+
+
+def damaged(mesh, remove=(), flip=()):
+    """Copy of mesh with faces removed and others reversed, as a triangle soup"""
+    faces = mesh.faces.copy()
+    faces[list(flip)] = faces[list(flip)][:, ::-1]
+    faces = np.delete(faces, list(remove), axis=0)
+    # Unwelded corners, so the weld step has work to do too
+    return trimesh.Trimesh(mesh.vertices[faces].reshape(-1, 3),
+                           np.arange(len(faces) * 3).reshape(-1, 3), process=False)
+
+
+def assert_closed_and_outward(mesh, volume):
+    assert mesh.is_watertight
+    assert mesh.is_winding_consistent
+    assert mesh.volume == pytest.approx(volume, rel=0.02)
+
+
+def test_holes_and_flipped_faces():
+    original = sphere()
+    # Non-adjacent faces to remove; flip a spread of others
+    remove = [0, 200, 600]
+    flip = range(100, 1200, 55)
+    repaired, info = quick_repair_mesh(damaged(original, remove, flip))
+
+    assert info["holes_filled"] == 3
+    assert info["flipped_faces"] > 0
+    assert_closed_and_outward(repaired, original.volume)
+
+
+def test_pinched_hole_becomes_two_loops():
+    original = sphere()
+    # Two faces that share exactly one vertex: their boundary is one
+    # component that passes through that vertex twice
+    shared = original.faces[0][0]
+    touching = [f for f in np.flatnonzero((original.faces == shared).any(axis=1))
+                if len(set(original.faces[f]) & set(original.faces[0])) == 1]
+    repaired, info = quick_repair_mesh(damaged(original, [0, touching[0]]))
+
+    assert info["holes_filled"] == 2
+    assert info["boundary_edges_left"] == 0
+    assert_closed_and_outward(repaired, original.volume)
+
+
+def test_inverted_closed_shell():
+    original = sphere()
+    repaired, info = quick_repair_mesh(damaged(original, flip=range(len(original.faces))))
+
+    assert info["inverted_components"] == 1
+    assert_closed_and_outward(repaired, original.volume)
+
+
+def test_multiple_components():
+    a, b, c = sphere(), sphere((5, 0, 0)), sphere((10, 0, 0))
+    parts = [
+        damaged(a, remove=[0, 300]),                  # holes
+        damaged(b, flip=range(len(b.faces))),         # inside out
+        damaged(c, flip=range(0, len(c.faces), 7)),   # mixed winding
+    ]
+    repaired, info = quick_repair_mesh(trimesh.util.concatenate(parts))
+
+    assert info["holes_filled"] == 2
+    # b, and c too if orientation started from one of its flipped faces
+    assert info["inverted_components"] >= 1
+    components = repaired.split(only_watertight=False)
+    assert len(components) == 3
+    for component in components:
+        assert_closed_and_outward(component, a.volume)
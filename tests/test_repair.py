@@ -0,0 +1,30 @@
+"""repair_tiled: holes on tile seams are filled exactly once"""
+
+import numpy as np
+import pytest
+import trimesh
+
+from mesh_tools.repair import repair_arrays, repair_tiled
+
+pytest.importorskip("pymeshfix")
+
+SPHERE = trimesh.creation.icosphere(4)
+
+
+def boundary_edges(faces) -> int:
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    return int((counts == 1).sum())
+
+
+@pytest.mark.parametrize("removed", [0, 100, 2000, 5000])
+def test_small_tiles_close_holes_like_whole_repair(removed):
+    faces = np.delete(SPHERE.faces, removed, axis=0)
+    _, whole, _ = repair_arrays(SPHERE.vertices, faces, backend="pymeshfix")
+    vertices, tiled, info = repair_tiled(SPHERE.vertices, faces, backend="pymeshfix",
+                                         tile_faces=1000, workers=1)
+    assert info["tiles"] > 1
+    assert boundary_edges(whole) == 0
+    assert boundary_edges(tiled) == 0
+    assert len(tiled) == len(SPHERE.faces)
+    assert trimesh.Trimesh(vertices, tiled, process=False).is_watertight
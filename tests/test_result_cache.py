@@ -0,0 +1,41 @@
+"""ResultCache: file digests and the byte budget"""
+
+from collections import OrderedDict
+
+from mesh_tools import result_cache
+from mesh_tools.result_cache import DiskCache, file_digest
+
+
+def test_digest_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "DIGEST_MEMO_SIZE", 2)
+    monkeypatch.setattr(result_cache, "_digest_memo", OrderedDict())
+    paths = []
+    for i in range(4):
+        paths.append(tmp_path / f"input{i}.bin")
+        paths[-1].write_bytes(bytes([i]) * 10)
+        file_digest(paths[-1])
+    # A hit moves the entry to the recent end
+    file_digest(paths[2])
+
+    assert [key[0] for key in result_cache._digest_memo] == [str(paths[3].resolve()), str(paths[2].resolve())]
+
+
+def test_eviction_scans_only_when_over_budget(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path / "cache", budget_bytes=1000)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    for i in range(9):
+        cache.put_bytes(f"{i:02x}" * 32, b"x" * 100)
+    assert len(scans) == 1
+    # Overwriting an entry doesn't count it twice
+    cache.put_bytes("00" * 32, b"x" * 100)
+    assert len(scans) == 1
+
+    for i in range(9, 12):
+        cache.put_bytes(f"{i:02x}" * 32, b"x" * 100)
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["evictions"] == 2
+    assert len(scans) == 4  # two over-budget writes, then stats()
@@ -0,0 +1,38 @@
+"""MCP server tool responses"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import trimesh
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "mcp_server"))
+
+import server  # noqa: E402
+
+
+@pytest.mark.parametrize("name", ["box.stl", "box_ascii.stl", "box.obj", "box.ply"])
+def test_load_response_is_the_same_for_every_format(tmp_path, name):
+    path = tmp_path / name
+    box = trimesh.creation.box(extents=(1, 2, 3))
+    if name == "box_ascii.stl":
+        path.write_bytes(trimesh.exchange.stl.export_stl_ascii(box).encode())
+    else:
+        box.export(str(path))
+
+    result = server.MeshTools.load(str(path))
+
+    assert set(result) == {"status", "handle", "vertices", "faces", "bounds", "extents"}
+    assert (result["vertices"], result["faces"]) == (8, 12)
+    assert result["extents"] == pytest.approx([1, 2, 3])
+
+
+def test_simplify_reports_missing_backend(tmp_path, monkeypatch):
+    path = tmp_path / "box.stl"
+    trimesh.creation.box().export(str(path))
+    monkeypatch.setitem(sys.modules, "fast_simplification", None)
+
+    result = server.MeshTools.simplify(str(path), target_faces=6)
+
+    assert result["status"] == "error"
+    assert "pip install fast-simplification" in result["message"]
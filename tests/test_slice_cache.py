@@ -0,0 +1,78 @@
+"""SliceCache: canonical geometry hash and G-code round-trip"""
+
+import numpy as np
+import trimesh
+
+from slicer_tools import slice_cache
+from slicer_tools.slice_cache import SliceCache, geometry_hash
+
+SPHERE = trimesh.creation.icosphere(2)
+
+
+def permuted(mesh: trimesh.Trimesh, seed: int = 0) -> trimesh.Trimesh:
+    """Same triangles with shuffled vertex ids, face order and starting corners"""
+    rng = np.random.default_rng(seed)
+    vertex_order = rng.permutation(len(mesh.vertices))
+    new_id = np.argsort(vertex_order)
+    faces = new_id[mesh.faces][rng.permutation(len(mesh.faces))]
+    # Rotate each triangle's corners (keeps winding)
+    shift = rng.integers(0, 3, len(faces))
+    faces = faces[np.arange(len(faces))[:, None], (shift[:, None] + np.arange(3)) % 3]
+    return trimesh.Trimesh(mesh.vertices[vertex_order], faces, process=False)
+
+
+def test_hash_ignores_format_and_ordering(tmp_path):
+    paths = {
+        "binary.stl": SPHERE,
+        "ascii.stl": SPHERE,
+        "model.obj": SPHERE,
+        "shuffled.obj": permuted(SPHERE, 1),
+        "shuffled.ply": permuted(SPHERE, 2),
+    }
+    for name, mesh in paths.items():
+        if name == "ascii.stl":
+            (tmp_path / name).write_bytes(trimesh.exchange.stl.export_stl_ascii(mesh).encode())
+        else:
+            mesh.export(str(tmp_path / name))
+
+    digests = {name: geometry_hash(tmp_path / name) for name in paths}
+    assert len(set(digests.values())) == 1, digests
+
+
+def test_hash_sees_geometry_and_winding(tmp_path):
+    moved = SPHERE.copy()
+    moved.vertices[0] += 0.01
+    flipped = trimesh.Trimesh(SPHERE.vertices, SPHERE.faces[:, ::-1], process=False)
+    for name, mesh in [("sphere.stl", SPHERE), ("moved.stl", moved), ("flipped.stl", flipped)]:
+        mesh.export(str(tmp_path / name))
+
+    digests = [geometry_hash(tmp_path / name) for name in ("sphere.stl", "moved.stl", "flipped.stl")]
+    assert len(set(digests)) == 3
+
+
+def test_geometry_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(slice_cache, "GEOMETRY_MEMO_SIZE", 2)
+    monkeypatch.setattr(slice_cache, "_geometry_memo", slice_cache.OrderedDict())
+    paths = []
+    for i in range(4):
+        paths.append(tmp_path / f"box{i}.stl")
+        trimesh.creation.box(extents=(1, 1, i + 1)).export(str(paths[-1]))
+        geometry_hash(paths[-1])
+
+    assert [key[0] for key in slice_cache._geometry_memo] == [str(p.resolve()) for p in paths[2:]]
+
+
+def test_fetch_round_trip_leaves_no_temp_files(tmp_path):
+    cache = SliceCache(tmp_path / "cache", budget_bytes=1 << 20)
+    sliced = tmp_path / "job" / "plate.gcode"
+    sliced.parent.mkdir()
+    sliced.write_text(";FLAVOR:Marlin\nG1 X1 Y1\n" * 100)
+    cache.store("k", sliced)
+
+    output = tmp_path / "out" / "plate.gcode"
+    output.parent.mkdir()
+    assert cache.fetch("k", output)
+    assert cache.fetch("k", output)
+    assert output.read_bytes() == sliced.read_bytes()
+    assert [p.name for p in output.parent.iterdir()] == ["plate.gcode"]
+    assert not cache.fetch("missing", tmp_path / "out" / "other.gcode")
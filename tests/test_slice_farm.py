@@ -0,0 +1,107 @@
+"""SliceFarm driven through the stub CuraEngine"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from slicer_tools.slice_farm import SliceFarm
+
+STUB = Path(__file__).parent.parent / "slicer_tools" / "stub_curaengine.py"
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "wait4"), reason="SliceFarm needs os.wait4")
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    model = tmp_path / "model.stl"
+    profile = tmp_path / "profile.json"
+    model.write_text("solid stub\nendsolid stub\n")
+    profile.write_text("{}")
+    return tmp_path, model, profile
+
+
+def stub_cmd(inputs, output, seconds=0.0, mb=0, fail=0):
+    """argv running the stub with per-job settings (env execs, keeping the pid)"""
+    _, model, profile = inputs
+    return ["env", f"STUB_CURA_SECONDS={seconds}", f"STUB_CURA_MB={mb}", f"STUB_CURA_FAIL={fail}",
+            sys.executable, str(STUB), "slice", "-j", str(profile), "-o", str(output),
+            "-l", str(model)]
+
+
+def test_success_records_rusage(inputs):
+    tmp_path = inputs[0]
+    farm = SliceFarm(slots=1)
+    output = tmp_path / "out.gcode"
+    job = farm.submit(stub_cmd(inputs, output, seconds=0.5, mb=64), str(output))
+    record, = farm.wait([job], timeout=60)
+
+    assert record["status"] == "success"
+    assert record["returncode"] == 0
+    assert output.read_text().startswith(";FLAVOR:Marlin")
+    # The stub burns 0.5 s of CPU and touches 64 MB
+    assert record["cpu_user"] + record["cpu_system"] >= 0.4
+    assert record["max_rss_mb"] >= 64
+    assert record["wall"] >= record["cpu_user"] * 0.5
+
+
+def test_priority_order(inputs):
+    tmp_path = inputs[0]
+    farm = SliceFarm(slots=1)
+    # Occupy the only slot so the rest queue up
+    blocker = farm.submit(stub_cmd(inputs, tmp_path / "blocker.gcode", seconds=0.5),
+                          str(tmp_path / "blocker.gcode"))
+    time.sleep(0.2)
+    jobs = {priority: farm.submit(stub_cmd(inputs, tmp_path / f"p{priority}.gcode"),
+                                  str(tmp_path / f"p{priority}.gcode"), priority=priority)
+            for priority in (5, 1, 3)}
+    records = farm.wait([blocker, *jobs.values()], timeout=60)
+
+    assert all(r["status"] == "success" for r in records)
+    started = sorted(records[1:], key=lambda r: r["started"])
+    assert [r["priority"] for r in started] == [1, 3, 5]
+
+
+def test_cancel_queued_and_running(inputs):
+    tmp_path = inputs[0]
+    farm = SliceFarm(slots=1)
+    running = farm.submit(stub_cmd(inputs, tmp_path / "a.gcode", seconds=30),
+                          str(tmp_path / "a.gcode"))
+    queued = farm.submit(stub_cmd(inputs, tmp_path / "b.gcode"), str(tmp_path / "b.gcode"))
+    deadline = time.monotonic() + 10
+    while farm.status(running)["status"] != "running" and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert farm.cancel(queued)
+    assert farm.cancel(running)
+    a, b = farm.wait([running, queued], timeout=10)
+
+    assert a["status"] == "cancelled" and a["wall"] < 10
+    assert b["status"] == "cancelled" and "started" not in b
+    assert not (tmp_path / "b.gcode").exists()
+    assert not farm.cancel(running)
+
+
+def test_timeout_kills_job(inputs):
+    tmp_path = inputs[0]
+    farm = SliceFarm(slots=1)
+    output = tmp_path / "slow.gcode"
+    job = farm.submit(stub_cmd(inputs, output, seconds=30), str(output), timeout=0.5)
+    record, = farm.wait([job], timeout=20)
+
+    assert record["status"] == "timeout"
+    assert record["wall"] < 10
+    assert record["returncode"] != 0
+
+
+def test_failure_keeps_stderr(inputs):
+    tmp_path = inputs[0]
+    farm = SliceFarm(slots=1)
+    output = tmp_path / "fail.gcode"
+    record, = farm.wait([farm.submit(stub_cmd(inputs, output, fail=3), str(output))], timeout=60)
+
+    assert record["status"] == "error"
+    assert record["returncode"] == 3
+    assert "failure requested" in record["message"]
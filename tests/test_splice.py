@@ -0,0 +1,102 @@
+"""replace_mesh: byte-range splicing of one mesh in a 3MF package"""
+
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+import trimesh
+
+from threeMF_tools.reader import read_meshes
+from threeMF_tools.splice import replace_mesh
+from threeMF_tools.writer import CORE_NS, write_3mf
+
+BOX = trimesh.creation.box()
+NEW = trimesh.creation.icosphere(1)
+
+PREFIXED = f"""<?xml version="1.0" encoding="UTF-8"?>
+<m:model unit="millimeter" xmlns:m="{CORE_NS}">
+<m:resources>
+<m:object id="1" type="model"><m:mesh><m:vertices>
+<m:vertex x="0" y="0" z="0"/><m:vertex x="1" y="0" z="0"/><m:vertex x="0" y="1" z="0"/>
+</m:vertices><m:triangles><m:triangle v1="0" v2="1" v3="2"/></m:triangles></m:mesh></m:object>
+<m:object id="2" type="model"><m:mesh><m:vertices>
+<m:vertex x="0" y="0" z="5"/><m:vertex x="1" y="0" z="5"/><m:vertex x="0" y="1" z="5"/>
+</m:vertices><m:triangles><m:triangle v1="0" v2="1" v3="2"/></m:triangles></m:mesh></m:object>
+</m:resources>
+<m:build><m:item objectid="1"/><m:item objectid="2"/></m:build>
+</m:model>"""
+
+
+def objects(model: bytes) -> dict:
+    """{object id: raw bytes of its <object> element}"""
+    found = re.findall(rb'(<(?:\w+:)?object id="(\d+)".*?</(?:\w+:)?object>)', model, re.S)
+    return {object_id: element for element, object_id in found}
+
+
+def package_with_model(path, model: str):
+    write_3mf(str(path), [BOX])
+    with zipfile.ZipFile(path) as zf:
+        members = {name: zf.read(name) for name in zf.namelist()}
+    members["3D/3dmodel.model"] = model.encode()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return path
+
+
+def test_splice_into_multi_object_package(tmp_path):
+    source = tmp_path / "parts.3mf"
+    write_3mf(str(source), [BOX, BOX.copy().apply_scale(2), BOX.copy().apply_scale(3)])
+    with zipfile.ZipFile(source, "a") as zf:
+        zf.writestr("Metadata/project.config", b"<config/>")
+
+    output = tmp_path / "spliced.3mf"
+    result = replace_mesh(str(source), 1, NEW.vertices, NEW.faces, str(output))
+    assert result["object_id"] == "2"
+
+    meshes = read_meshes(str(output))
+    assert [len(mesh["faces"]) for mesh in meshes] == [12, len(NEW.faces), 12]
+    assert np.allclose(meshes[1]["vertices"], NEW.vertices, atol=1e-6)
+    assert np.array_equal(meshes[1]["faces"], NEW.faces)
+
+    with zipfile.ZipFile(source) as before, zipfile.ZipFile(output) as after:
+        assert before.namelist() == after.namelist()
+        for name in before.namelist():
+            if name != "3D/3dmodel.model":
+                assert before.read(name) == after.read(name)
+        old, new = objects(before.read("3D/3dmodel.model")), objects(after.read("3D/3dmodel.model"))
+        assert old[b"1"] == new[b"1"] and old[b"3"] == new[b"3"]
+        assert old[b"2"] != new[b"2"]
+
+
+def test_splice_keeps_namespace_prefix(tmp_path):
+    path = package_with_model(tmp_path / "prefixed.3mf", PREFIXED)
+    replace_mesh(str(path), 0, NEW.vertices, NEW.faces)
+
+    with zipfile.ZipFile(path) as zf:
+        model = zf.read("3D/3dmodel.model")
+    root = ET.fromstring(model)
+    meshes = root.findall(f".//{{{CORE_NS}}}mesh")
+    assert len(meshes) == 2
+    assert len(meshes[0].findall(f".//{{{CORE_NS}}}triangle")) == len(NEW.faces)
+    assert objects(model)[b"2"] == objects(PREFIXED.encode())[b"2"]
+
+
+@pytest.mark.parametrize("extra, message", [
+    ('<m:triangle v1="0" v2="1" v3="2" pid="5" p1="0"/>', "pid/p1/p2/p3"),
+    ('<b:beamlattice xmlns:b="http://schemas.microsoft.com/3dmanufacturing/beamlattice/2017/02"/>',
+     "extension elements"),
+])
+def test_splice_refuses_to_drop_materials_and_extensions(tmp_path, extra, message):
+    model = PREFIXED.replace("</m:triangles></m:mesh></m:object>\n<m:object id=\"2\"",
+                             f"{extra}</m:triangles></m:mesh></m:object>\n<m:object id=\"2\"", 1)
+    if "beamlattice" in extra:
+        model = model.replace(f"{extra}</m:triangles></m:mesh>", f"</m:triangles>{extra}</m:mesh>", 1)
+    path = package_with_model(tmp_path / "painted.3mf", model)
+    before = path.read_bytes()
+
+    with pytest.raises(ValueError, match=message):
+        replace_mesh(str(path), 0, NEW.vertices, NEW.faces)
+    assert path.read_bytes() == before
@@ -0,0 +1,57 @@
+"""Memory-mapped binary STL reader: welding, load kwargs and the stats memo"""
+
+import numpy as np
+import pytest
+import trimesh
+
+from mesh_tools import stl_reader
+from mesh_tools.loader import load_mesh
+
+
+@pytest.fixture
+def stl(tmp_path):
+    path = tmp_path / "sphere.stl"
+    trimesh.creation.icosphere(2).export(str(path))
+    return path
+
+
+def test_weld_matches_trimesh(stl):
+    vertices, faces = stl_reader.weld(stl_reader.open_binary_stl(str(stl)))
+    reference = trimesh.load(str(stl))
+    assert len(vertices) == len(reference.vertices)
+    assert len(faces) == len(reference.faces)
+
+
+def test_hash_collisions_never_fuse_corners(stl, monkeypatch):
+    records = stl_reader.open_binary_stl(str(stl))
+    expected_vertices, expected_faces = stl_reader.weld(records)
+
+    # Every corner hashes to one of four values
+    hashes = stl_reader.corner_hashes
+    monkeypatch.setattr(stl_reader, "corner_hashes",
+                        lambda corners, digits: hashes(corners, digits) & np.uint64(3))
+    vertices, faces = stl_reader.weld(records)
+
+    assert len(vertices) == len(expected_vertices)
+    assert np.array_equal(vertices[faces], expected_vertices[expected_faces])
+
+
+def test_load_mesh_kwargs(stl):
+    assert isinstance(load_mesh(str(stl), force="scene"), trimesh.Scene)
+
+    # Duplicate a face: constructor kwargs reach the Trimesh (validate drops it)
+    mesh = load_mesh(str(stl))
+    mesh = trimesh.Trimesh(mesh.vertices, np.vstack([mesh.faces, mesh.faces[:1]]), process=False)
+    mesh.export(str(stl))
+    assert len(load_mesh(str(stl)).faces) == len(mesh.faces)
+    assert len(load_mesh(str(stl), process=True, validate=True).faces) == len(mesh.faces) - 1
+
+
+def test_stats_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(stl_reader, "STATS_MEMO_SIZE", 2)
+    monkeypatch.setattr(stl_reader, "_stats_memo", type(stl_reader._stats_memo)())
+    for index in range(4):
+        path = tmp_path / f"box{index}.stl"
+        trimesh.creation.box(extents=(index + 1, 1, 1)).export(str(path))
+        assert stl_reader.stl_stats(str(path))["extents"][0] == pytest.approx(index + 1)
+    assert len(stl_reader._stats_memo) == 2
@@ -0,0 +1,81 @@
+"""write_3mf → read_meshes round trip"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+import trimesh
+
+from threeMF_tools.reader import read_meshes
+from threeMF_tools.writer import CORE_NS, MODEL_PART, write_3mf
+
+BOX = trimesh.creation.box(extents=(1, 2, 3))
+SPHERE = trimesh.creation.icosphere(2)
+
+
+def build_items(path) -> list:
+    with zipfile.ZipFile(path) as zf:
+        root = ET.fromstring(zf.read(MODEL_PART))
+    return [(item.get("objectid"), item.get("transform"))
+            for item in root.iter(f"{{{CORE_NS}}}item")]
+
+
+def test_objects_and_transforms_round_trip(tmp_path):
+    path = tmp_path / "plate.3mf"
+    shift = trimesh.transformations.translation_matrix([10, 20, 30])
+    turn = trimesh.transformations.rotation_matrix(np.pi / 2, [0, 0, 1])
+    write_3mf(str(path), [
+        BOX,
+        {"vertices": SPHERE.vertices, "faces": SPHERE.faces, "name": "ball", "transform": shift},
+        {"vertices": BOX.vertices, "faces": BOX.faces, "transforms": [shift, turn]},
+    ], unit="inch")
+
+    meshes = read_meshes(str(path))
+    assert [mesh["object_id"] for mesh in meshes] == ["1", "2", "3"]
+    for mesh, source in zip(meshes, [BOX, SPHERE, BOX]):
+        assert np.allclose(mesh["vertices"], source.vertices, atol=1e-6)
+        assert np.array_equal(mesh["faces"], source.faces)
+
+    items = build_items(path)
+    assert [object_id for object_id, _ in items] == ["1", "2", "3", "3"]
+    assert items[0][1] is None
+    for (_, attr), matrix in zip(items[1:], [shift, shift, turn]):
+        values = np.array(attr.split(), dtype=float).reshape(4, 3).T
+        assert np.allclose(values, matrix[:3], atol=1e-9)
+
+    with zipfile.ZipFile(path) as zf:
+        assert ET.fromstring(zf.read(MODEL_PART)).get("unit") == "inch"
+    # trimesh places the build items with the written transforms
+    scene = trimesh.load(str(path))
+    assert len(scene.graph.nodes_geometry) == 4
+
+
+def test_unknown_unit_is_rejected(tmp_path):
+    path = tmp_path / "bad.3mf"
+    with pytest.raises(ValueError, match="millimeter"):
+        write_3mf(str(path), [BOX], unit="mm")
+    assert not path.exists()
+
+
+def test_namespace_prefixed_model_reads_like_default_namespace(tmp_path):
+    path = tmp_path / "prefixed.3mf"
+    write_3mf(str(path), [BOX, SPHERE])
+    with zipfile.ZipFile(path) as zf:
+        members = {name: zf.read(name) for name in zf.namelist()}
+    model = members[MODEL_PART].decode()
+    # Rebind the core namespace to m: and prefix every element with it
+    model = model.replace(f'xmlns="{CORE_NS}"', f'xmlns:m="{CORE_NS}"')
+    model = model.replace("</", "</m:").replace("<", "<m:").replace("<m:/m:", "</m:")
+    model = model.replace("<m:?xml", "<?xml")
+    assert "<m:vertex " in model and "</m:model>" in model and "<vertex" not in model
+    members[MODEL_PART] = model.encode()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+
+    meshes = read_meshes(str(path))
+    assert [mesh["object_id"] for mesh in meshes] == ["1", "2"]
+    for mesh, source in zip(meshes, [BOX, SPHERE]):
+        assert np.allclose(mesh["vertices"], source.vertices, atol=1e-6)
+        assert np.array_equal(mesh["faces"], source.faces)
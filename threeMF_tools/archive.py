@@ -0,0 +1,165 @@
+"""
+Zip-level helpers for editing 3MF packages in place
+
+Rewriting a 3MF usually means unpacking and recompressing every member.
+These helpers copy untouched members as raw compressed bytes (no
+decompress/recompress) and stream only the parts that actually change.
+
+The zipfile module has no public API for raw copies, so copy_member_raw
+writes through ZipFile internals. It is only used on the Python versions
+in RAW_COPY_VERSIONS that still have those internals; elsewhere members
+are copied through the public API, which decompresses and recompresses
+every member.
+"""
+
+import copy
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import zipfile
+
+# Bytes per read when streaming member data
+COPY_CHUNK = 1 << 20
+
+_LOCAL_HEADER_SIZE = 30
+_DATA_DESCRIPTOR_FLAG = 0x08
+_ZIP64_EXTRA_ID = 0x0001
+
+# Oldest and newest Python whose ZipFile internals copy_member_raw was checked against
+RAW_COPY_VERSIONS = ((3, 8), (3, 13))
+
+# ZipFile instance attributes that copy_member_raw reads or updates
+_RAW_COPY_ATTRS = ("fp", "filelist", "NameToInfo", "start_dir", "_didModify")
+
+
+def raw_copy_supported(zout: zipfile.ZipFile = None) -> bool:
+    """Whether copy_member_raw can be used on this Python (and on zout)"""
+    oldest, newest = RAW_COPY_VERSIONS
+    if not oldest <= sys.version_info[:2] <= newest:
+        return False
+    return zout is None or all(hasattr(zout, name) for name in _RAW_COPY_ATTRS)
+
+
+def _strip_zip64(extra: bytes) -> bytes:
+    """Drop the zip64 record from a member's extra field (a list of id, length, data)"""
+    kept = []
+    i = 0
+    while i + 4 <= len(extra):
+        xid, xlen = struct.unpack("<HH", extra[i:i + 4])
+        if xid != _ZIP64_EXTRA_ID:
+            kept.append(extra[i:i + 4 + xlen])
+        i += 4 + xlen
+    return b"".join(kept)
+
+
+def copy_member_raw(zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """
+    Copy one member's compressed bytes from zin to zout unchanged.
+
+    A fresh local header is written with the sizes filled in, so members
+    that used a trailing data descriptor are copied without it. Relies on
+    ZipFile internals; check raw_copy_supported first.
+    """
+    src = zin.fp
+    src.seek(info.header_offset)
+    header = src.read(_LOCAL_HEADER_SIZE)
+    if header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_len = int.from_bytes(header[26:28], "little")
+    extra_len = int.from_bytes(header[28:30], "little")
+    src.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len)
+
+    out = copy.copy(info)
+    out.flag_bits &= ~_DATA_DESCRIPTOR_FLAG
+    # Sizes are re-encoded by FileHeader()/close(), drop the old zip64 record
+    out.extra = _strip_zip64(info.extra)
+    out.header_offset = zout.fp.tell()
+    zout.fp.write(out.FileHeader())
+
+    remaining = info.compress_size
+    while remaining:
+        chunk = src.read(min(COPY_CHUNK, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+        zout.fp.write(chunk)
+        remaining -= len(chunk)
+
+    zout.filelist.append(out)
+    zout.NameToInfo[out.filename] = out
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+
+
+def copy_member(zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo):
+    """Copy one member through the public API (decompress and recompress)"""
+    out = zipfile.ZipInfo(info.filename, info.date_time)
+    out.compress_type = info.compress_type
+    out.comment = info.comment
+    out.extra = _strip_zip64(info.extra)
+    out.create_system = info.create_system
+    out.external_attr = info.external_attr
+    # Lets zout.open decide whether the member needs zip64 sizes
+    out.file_size = info.file_size
+    with zin.open(info) as src, zout.open(out, "w") as dst:
+        copy_stream(src, dst)
+
+
+def rewrite_archive(src_path: str, rewriters: dict, output_path: str = None,
+                    compresslevel: int = 6) -> str:
+    """
+    Rewrite selected members of a zip, raw-copying everything else
+    (or re-compressing it where raw_copy_supported is False).
+
+    Args:
+        src_path: Source .3mf/.zip file
+        rewriters: {member name: fn(src_stream, dst_stream)} for members
+            that change; each fn streams the new content
+        output_path: Destination (default: replace src_path atomically)
+        compresslevel: Deflate level for rewritten members
+
+    Returns:
+        Path of the written archive
+    """
+    target = output_path or src_path
+    fd, tmp_path = tempfile.mkstemp(
+        suffix=".3mf.tmp", dir=os.path.dirname(os.path.abspath(target))
+    )
+    os.close(fd)
+
+    try:
+        with zipfile.ZipFile(src_path, "r") as zin, \
+                zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED,
+                                compresslevel=compresslevel) as zout:
+            raw = raw_copy_supported(zout)
+            for info in zin.infolist():
+                rewrite = rewriters.get(info.filename)
+                if rewrite is None:
+                    if raw:
+                        copy_member_raw(zin, zout, info)
+                    else:
+                        copy_member(zin, zout, info)
+                    continue
+                with zin.open(info) as src, \
+                        zout.open(info.filename, "w", force_zip64=True) as dst:
+                    rewrite(src, dst)
+
+        if output_path is None:
+            shutil.copymode(src_path, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return target
+
+
+def copy_stream(src, dst):
+    """Copy the rest of src to dst in COPY_CHUNK blocks"""
+    while True:
+        chunk = src.read(COPY_CHUNK)
+        if not chunk:
+            break
+        dst.write(chunk)
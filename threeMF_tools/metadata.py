@@ -0,0 +1,113 @@
+"""
+In-place 3MF metadata editing
+
+Core-spec <metadata> elements sit between <model> and <resources>, so only
+the head of the model part has to be edited. The model part is streamed
+through (head rewritten, rest copied chunk by chunk) and every other
+member is raw-copied, so textures, thumbnails and external mesh parts are
+never recompressed.
+"""
+
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from threeMF_tools.archive import COPY_CHUNK, copy_stream, rewrite_archive
+from threeMF_tools.reader import find_model_part
+
+_RESOURCES_TAG = re.compile(rb"<(?:[\w.-]+:)?resources[\s>/]")
+
+
+def _metadata_pattern(name: str) -> re.Pattern:
+    """Match one <metadata name="..."> element (self-closing or not)"""
+    quoted = re.escape(escape(name, {'"': "&quot;"}).encode("utf-8"))
+    return re.compile(
+        rb"[ \t]*<(?P<tag>(?:[\w.-]+:)?metadata)\b[^>]*?\bname\s*=\s*[\"']" + quoted
+        + rb"[\"'][^>]*?(?:/>|>.*?</(?P=tag)\s*>)\r?\n?",
+        re.DOTALL,
+    )
+
+
+def _edit_head(head: bytes, metadata: dict) -> bytes:
+    """Apply metadata updates to the part of the model XML before <resources>"""
+    match = _RESOURCES_TAG.search(head)
+    if match is None:
+        raise ValueError("Model part has no <resources> element")
+    before, after = head[:match.start()], head[match.start():]
+
+    added = []
+    for name, value in metadata.items():
+        before = _metadata_pattern(name).sub(b"", before)
+        if value is not None:
+            added.append(
+                f" <metadata name={quoteattr(name)}>{escape(str(value))}</metadata>\n"
+            )
+    return before + "".join(added).encode("utf-8") + after
+
+
+def _model_rewriter(metadata: dict):
+    """Streaming rewriter: edit the head, pass the remainder through"""
+    def rewrite(src, dst):
+        head = b""
+        while True:
+            chunk = src.read(COPY_CHUNK)
+            head += chunk
+            if not chunk or _RESOURCES_TAG.search(head):
+                break
+        dst.write(_edit_head(head, metadata))
+        copy_stream(src, dst)
+    return rewrite
+
+
+def modify_metadata(three_mf_path: str, metadata: dict, output_path: str = None,
+                    compresslevel: int = 6) -> str:
+    """
+    Set or remove model metadata without unpacking the 3MF.
+
+    Args:
+        three_mf_path: Path to .3mf file
+        metadata: {name: value}; a value of None removes the entry
+        output_path: Write here instead of replacing the input file
+        compresslevel: Deflate level for the rewritten model part
+
+    Returns:
+        Path of the written file
+    """
+    with zipfile.ZipFile(three_mf_path, "r") as zf:
+        model_part = find_model_part(zf)
+        if model_part not in zf.NameToInfo:
+            raise ValueError(f"Model part not found: {model_part}")
+
+    return rewrite_archive(
+        three_mf_path,
+        {model_part: _model_rewriter(metadata)},
+        output_path=output_path,
+        compresslevel=compresslevel,
+    )
+
+
+def read_metadata(three_mf_path: str) -> dict:
+    """Return {name: value} for the model's top-level <metadata> elements"""
+    import xml.etree.ElementTree as ET
+
+    with zipfile.ZipFile(three_mf_path, "r") as zf:
+        model_part = find_model_part(zf)
+        head = b""
+        with zf.open(model_part) as src:
+            while True:
+                chunk = src.read(COPY_CHUNK)
+                head += chunk
+                match = _RESOURCES_TAG.search(head)
+                if match or not chunk:
+                    break
+
+    if match is None:
+        raise ValueError("Model part has no <resources> element")
+    # Close the truncated <model> so the head parses on its own
+    tag = re.search(rb"<((?:[\w.-]+:)?model)\b", head).group(1)
+    root = ET.fromstring(head[:match.start()] + b"</" + tag + b">")
+    return {
+        elem.get("name"): elem.text or ""
+        for elem in root
+        if elem.tag.rpartition("}")[2] == "metadata"
+    }
@@ -0,0 +1,172 @@
+"""
+Streaming 3MF mesh reader
+
+Reads mesh geometry straight out of the model part inside the 3MF zip with
+expat. Nothing is extracted to disk and no element tree is built: vertex and
+triangle attributes are staged in small batches and flushed into
+preallocated NumPy float32/uint32 arrays, so peak memory stays close to the
+size of the final arrays.
+"""
+
+import zipfile
+import xml.parsers.expat
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+DEFAULT_MODEL_PART = "3D/3dmodel.model"
+MODEL_REL_TYPE = "http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"
+
+# Bytes read from the zip member per expat feed
+READ_SIZE = 1 << 20
+# Rows staged in Python before each flush into the NumPy buffer
+FLUSH_ROWS = 8192
+# Initial row capacity of each mesh buffer
+INITIAL_ROWS = 1 << 16
+
+
+def find_model_part(zf: zipfile.ZipFile) -> str:
+    """Return the name of the root model part from _rels/.rels"""
+    try:
+        rels = ET.fromstring(zf.read("_rels/.rels"))
+    except KeyError:
+        return DEFAULT_MODEL_PART
+
+    for rel in rels:
+        if rel.get("Type") == MODEL_REL_TYPE and rel.get("Target"):
+            return rel.get("Target").lstrip("/")
+    return DEFAULT_MODEL_PART
+
+
+def model_parts(zf: zipfile.ZipFile) -> list:
+    """Return every model part, root model first, then the rest by name"""
+    root = find_model_part(zf)
+    others = sorted(
+        name for name in zf.namelist()
+        if name.endswith(".model") and name != root
+    )
+    return [root] + others if root in zf.NameToInfo else others
+
+
+class _RowBuffer:
+    """Growable (N, 3) NumPy array filled in batches
+
+    Attribute strings are staged in a flat Python list and parsed into the
+    array FLUSH_ROWS at a time. The array grows by in-place resize, so no
+    intermediate chunk list has to be concatenated at the end.
+    """
+
+    def __init__(self, dtype):
+        self.array = np.empty((INITIAL_ROWS, 3), dtype=dtype)
+        self.rows = 0
+        self.staged = []
+
+    def flush(self):
+        if not self.staged:
+            return
+        # One C-level parse per batch instead of float()/int() per attribute
+        values = np.fromstring(" ".join(self.staged), dtype=self.array.dtype, sep=" ")
+        if len(values) != len(self.staged):
+            raise ValueError("Malformed numeric attribute in mesh data")
+        count = len(values) // 3
+        needed = self.rows + count
+        if needed > len(self.array):
+            capacity = len(self.array)
+            while capacity < needed:
+                capacity *= 2
+            self.array.resize((capacity, 3), refcheck=False)
+        self.array[self.rows:needed] = values.reshape(-1, 3)
+        self.rows = needed
+        self.staged.clear()
+
+    def finish(self) -> np.ndarray:
+        self.flush()
+        self.array.resize((self.rows, 3), refcheck=False)
+        return self.array
+
+
+class _MeshCollector:
+    """expat handlers that collect <mesh> elements into row buffers"""
+
+    def __init__(self, part: str):
+        self.part = part
+        self.object_id = None
+        self.vertices = None
+        self.triangles = None
+        self.completed = []
+
+    def start(self, name, attrs):
+        # attrs is a flat [name, value, ...] list (ordered_attributes)
+        local = name.rpartition(" ")[2]
+        if local == "vertex":
+            self._stage(self.vertices, attrs, "x", "y", "z")
+        elif local == "triangle":
+            self._stage(self.triangles, attrs, "v1", "v2", "v3")
+        elif local == "object":
+            self.object_id = dict(zip(attrs[::2], attrs[1::2])).get("id")
+        elif local == "mesh":
+            self.vertices = _RowBuffer(np.float32)
+            self.triangles = _RowBuffer(np.uint32)
+
+    @staticmethod
+    def _stage(buffer, attrs, a, b, c):
+        if attrs[0] == a and attrs[2] == b and attrs[4] == c:
+            buffer.staged.extend((attrs[1], attrs[3], attrs[5]))
+        else:
+            values = dict(zip(attrs[::2], attrs[1::2]))
+            buffer.staged.extend((values[a], values[b], values[c]))
+        if len(buffer.staged) >= FLUSH_ROWS * 3:
+            buffer.flush()
+
+    def end(self, name):
+        if name.rpartition(" ")[2] == "mesh":
+            self.completed.append({
+                "part": self.part,
+                "object_id": self.object_id,
+                "vertices": self.vertices.finish(),
+                "faces": self.triangles.finish(),
+            })
+            self.vertices = self.triangles = None
+
+
+def iter_part_meshes(zf: zipfile.ZipFile, part: str):
+    """Yield every mesh of one model part as it finishes parsing"""
+    collector = _MeshCollector(part)
+    parser = xml.parsers.expat.ParserCreate(namespace_separator=" ")
+    parser.ordered_attributes = True
+    parser.StartElementHandler = collector.start
+    parser.EndElementHandler = collector.end
+
+    with zf.open(part) as stream:
+        while True:
+            data = stream.read(READ_SIZE)
+            parser.Parse(data, not data)
+            while collector.completed:
+                yield collector.completed.pop(0)
+            if not data:
+                break
+
+
+def iter_meshes(three_mf_path: str, all_parts: bool = False):
+    """
+    Stream meshes from a 3MF file without extracting it.
+
+    Args:
+        three_mf_path: Path to .3mf file
+        all_parts: Also read external model parts (e.g. Bambu
+            3D/Objects/*.model), not just the root model
+
+    Yields:
+        Dict with part, object_id, vertices (float32 Nx3) and
+        faces (uint32 Mx3)
+    """
+    with zipfile.ZipFile(three_mf_path, "r") as zf:
+        parts = model_parts(zf) if all_parts else [find_model_part(zf)]
+        for part in parts:
+            yield from iter_part_meshes(zf, part)
+
+
+def read_meshes(three_mf_path: str, all_parts: bool = False) -> list:
+    """Read all meshes from a 3MF file into a list (see iter_meshes)"""
+    return list(iter_meshes(three_mf_path, all_parts))
+
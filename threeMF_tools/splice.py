@@ -0,0 +1,169 @@
+"""
+Object-level mesh replacement for 3MF packages
+
+The model part that holds the target <mesh> is streamed twice: once
+through expat to find the byte range of that element, and once to copy
+everything outside the range unchanged while the new geometry is written
+in its place. All other zip members are raw-copied, so objects,
+components, build items and vendor parts (Metadata/*.config) pass through
+byte-for-byte and peak memory scales with the replacement mesh only.
+
+The new mesh is written with the same namespace prefix as the old one.
+Meshes whose triangles carry properties (pid/p1/p2/p3: colours,
+materials) or that hold extension elements (e.g. a beam lattice) are
+refused, since the new geometry could not keep them.
+"""
+
+import zipfile
+import xml.parsers.expat
+
+from threeMF_tools.archive import COPY_CHUNK, copy_stream, rewrite_archive
+from threeMF_tools.reader import READ_SIZE, model_parts
+from threeMF_tools.writer import CORE_NS, write_mesh_xml
+
+# Core elements a replaceable <mesh> may contain
+MESH_CHILDREN = {"vertices", "vertex", "triangles", "triangle"}
+
+# Triangle attributes that assign properties (colours, materials)
+PROPERTY_ATTRS = {"pid", "p1", "p2", "p3"}
+
+
+class _MeshFound(Exception):
+    """Raised from the expat handler to stop parsing once the target closes"""
+
+
+def locate_mesh(zf: zipfile.ZipFile, mesh_index: int) -> dict:
+    """
+    Find the byte range of the mesh_index-th <mesh> element.
+
+    Meshes are counted across model parts in the order of model_parts()
+    (root model first, then external parts such as 3D/Objects/*.model).
+
+    Returns:
+        Dict with part, object_id, start (offset of "<mesh"), end (offset
+        of the closing tag, or of "<mesh" if self-closing), prefix (the
+        element's namespace prefix), properties (True if any triangle has
+        pid/p1/p2/p3) and extensions (names of non-core child elements)
+    """
+    state = {"count": 0, "object_id": None, "target": None}
+
+    for part in model_parts(zf):
+        parser = xml.parsers.expat.ParserCreate(namespace_separator=" ")
+        parser.namespace_prefixes = True
+        parser.ordered_attributes = True
+
+        def start(name, attrs, parser=parser):
+            # "uri local prefix", "uri local" or "local"
+            parts = name.split(" ")
+            uri, local = (parts[0], parts[1]) if len(parts) > 1 else ("", parts[0])
+            target = state["target"]
+            if target is not None:
+                if uri != CORE_NS or local not in MESH_CHILDREN:
+                    target["extensions"].append(local if not uri else f"{{{uri}}}{local}")
+                elif local == "triangle" and PROPERTY_ATTRS.intersection(attrs[::2]):
+                    target["properties"] = True
+            elif local == "object":
+                state["object_id"] = dict(zip(attrs[::2], attrs[1::2])).get("id")
+            elif local == "mesh":
+                if state["count"] == mesh_index:
+                    state["target"] = {
+                        "part": part,
+                        "object_id": state["object_id"],
+                        "start": parser.CurrentByteIndex,
+                        "prefix": parts[2] if len(parts) == 3 else "",
+                        "properties": False,
+                        "extensions": [],
+                    }
+                state["count"] += 1
+
+        def end(name, parser=parser):
+            parts = name.split(" ")
+            if state["target"] is not None and parts[min(1, len(parts) - 1)] == "mesh":
+                state["target"]["end"] = parser.CurrentByteIndex
+                raise _MeshFound()
+
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+
+        try:
+            with zf.open(part) as stream:
+                while True:
+                    data = stream.read(READ_SIZE)
+                    parser.Parse(data, not data)
+                    if not data:
+                        break
+        except _MeshFound:
+            return state["target"]
+
+    raise IndexError(f"mesh_index {mesh_index} out of range ({state['count']} meshes)")
+
+
+def _splice_rewriter(start: int, end: int, vertices, faces, precision: int, prefix: str):
+    """Streaming rewriter that swaps bytes [start, end-tag] for a new mesh"""
+    def rewrite(src, dst):
+        remaining = start
+        while remaining:
+            chunk = src.read(min(COPY_CHUNK, remaining))
+            dst.write(chunk)
+            remaining -= len(chunk)
+
+        write_mesh_xml(dst, vertices, faces, precision, prefix)
+
+        # Skip the old element up to and including the '>' of its end tag
+        remaining = end - start
+        while remaining:
+            remaining -= len(src.read(min(COPY_CHUNK, remaining)))
+        while True:
+            chunk = src.read(COPY_CHUNK)
+            if not chunk:
+                raise ValueError("Unterminated <mesh> element")
+            close = chunk.find(b">")
+            if close >= 0:
+                dst.write(chunk[close + 1:])
+                break
+
+        copy_stream(src, dst)
+    return rewrite
+
+
+def replace_mesh(three_mf_path: str, mesh_index: int, vertices, faces,
+                 output_path: str = None, precision: int = 9,
+                 compresslevel: int = 6) -> dict:
+    """
+    Replace one mesh in a 3MF file with new geometry.
+
+    Args:
+        three_mf_path: Path to .3mf file
+        mesh_index: Index of the <mesh> to replace (see locate_mesh)
+        vertices: (N, 3) float array
+        faces: (M, 3) integer array
+        output_path: Write here instead of replacing the input file
+        precision: Significant digits for coordinates
+        compresslevel: Deflate level for the rewritten model part
+
+    Returns:
+        Dict with path, part and object_id of the replaced mesh
+
+    Raises:
+        ValueError: The old mesh has triangle properties or extension
+            elements that the new geometry would silently drop
+    """
+    with zipfile.ZipFile(three_mf_path, "r") as zf:
+        target = locate_mesh(zf, mesh_index)
+
+    where = f"mesh {mesh_index} (object {target['object_id']} in {target['part']})"
+    if target["properties"]:
+        raise ValueError(f"{where} assigns colours/materials per triangle (pid/p1/p2/p3); "
+                         "replacing its geometry would lose them")
+    if target["extensions"]:
+        raise ValueError(f"{where} contains extension elements "
+                         f"({', '.join(sorted(set(target['extensions'])))}) that can't be kept")
+
+    path = rewrite_archive(
+        three_mf_path,
+        {target["part"]: _splice_rewriter(
+            target["start"], target["end"], vertices, faces, precision, target["prefix"])},
+        output_path=output_path,
+        compresslevel=compresslevel,
+    )
+    return {"path": path, "part": target["part"], "object_id": target["object_id"]}
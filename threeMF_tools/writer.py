@@ -0,0 +1,178 @@
+"""
+Streaming 3MF writer
+
+Formats vertex and triangle blocks from NumPy arrays in batches and writes
+them straight into the model part of the zip, so the XML document never
+exists in memory as a whole. Multiple objects become one build item each.
+"""
+
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+CORE_NS = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+MODEL_PART = "3D/3dmodel.model"
+
+# Values the core spec allows for the model's unit attribute
+UNITS = ("micron", "millimeter", "centimeter", "inch", "foot", "meter")
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" '
+    'ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>'
+)
+
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/' + MODEL_PART + '" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>'
+)
+
+# Rows formatted per write into the zip stream
+BATCH_ROWS = 65536
+
+
+def _format_block(template: str, rows: np.ndarray) -> bytes:
+    """Format an (N, 3) block with one %-operation over the whole batch"""
+    return ((template * len(rows)) % tuple(rows.ravel().tolist())).encode("ascii")
+
+
+def write_mesh_xml(stream, vertices, faces, precision: int = 9, prefix: str = ""):
+    """
+    Write one <mesh> element for the given arrays to a binary stream.
+
+    Args:
+        stream: Writable binary file object (e.g. a zip entry)
+        vertices: (N, 3) float array
+        faces: (M, 3) integer array
+        precision: Significant digits for coordinates
+        prefix: Namespace prefix bound to the core namespace where the
+            element is written ("" when it is the default namespace)
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    p = f"{prefix}:" if prefix else ""
+
+    vertex_tpl = f'<{p}vertex x="%.{precision}g" y="%.{precision}g" z="%.{precision}g"/>'
+    triangle_tpl = f'<{p}triangle v1="%d" v2="%d" v3="%d"/>'
+
+    stream.write(f"<{p}mesh><{p}vertices>".encode("ascii"))
+    for start in range(0, len(vertices), BATCH_ROWS):
+        stream.write(_format_block(vertex_tpl, vertices[start:start + BATCH_ROWS]))
+    stream.write(f"</{p}vertices><{p}triangles>".encode("ascii"))
+    for start in range(0, len(faces), BATCH_ROWS):
+        stream.write(_format_block(triangle_tpl, faces[start:start + BATCH_ROWS]))
+    stream.write(f"</{p}triangles></{p}mesh>".encode("ascii"))
+
+
+def _transform_attr(matrix) -> str:
+    """3MF build transform attribute (3x4, column-major rows) for a 4x4 matrix"""
+    m = np.asarray(matrix, dtype=np.float64)
+    values = [m[r, c] for c in range(4) for r in range(3)]
+    return ' transform="' + " ".join(f"{v:.9g}" for v in values) + '"'
+
+
+def _as_object(item, index: int) -> dict:
+    """Normalize a Trimesh, (vertices, faces) tuple or dict to a dict"""
+    if isinstance(item, dict):
+        obj = dict(item)
+    elif isinstance(item, (tuple, list)):
+        obj = {"vertices": item[0], "faces": item[1]}
+    else:
+        obj = {
+            "vertices": item.vertices,
+            "faces": item.faces,
+            "name": item.metadata.get("name") if hasattr(item, "metadata") else None,
+        }
+    obj.setdefault("name", None)
+    obj.setdefault("transform", None)
+    obj.setdefault("transforms", None)
+    if not obj["name"]:
+        obj["name"] = f"Object {index}"
+    return obj
+
+
+def write_3mf(output_path: str, objects, compresslevel: int = 6,
+              unit: str = "millimeter", metadata: dict = None,
+              precision: int = 9) -> str:
+    """
+    Write meshes to a 3MF file, streaming geometry into the zip.
+
+    Args:
+        output_path: Path to output .3mf file
+        objects: Iterable of Trimesh objects, (vertices, faces) tuples or
+            dicts with vertices, faces and optional name/transform; a
+            "transforms" list instead places the object once per matrix
+            (one build item each, geometry written once)
+        compresslevel: Deflate level 0-9 (0 stores uncompressed)
+        unit: 3MF model unit (one of UNITS)
+        metadata: Optional {name: value} model metadata
+        precision: Significant digits for coordinates
+
+    Returns:
+        output_path
+    """
+    if unit not in UNITS:
+        raise ValueError(f"Unknown 3MF unit {unit!r}; expected one of {', '.join(UNITS)}")
+    compression = zipfile.ZIP_STORED if compresslevel == 0 else zipfile.ZIP_DEFLATED
+    build = []
+
+    with zipfile.ZipFile(output_path, "w", compression, compresslevel=compresslevel) as zf:
+        zf.writestr("[Content_Types].xml", CONTENT_TYPES)
+        zf.writestr("_rels/.rels", RELS)
+
+        with zf.open(MODEL_PART, "w", force_zip64=True) as stream:
+            stream.write(
+                f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<model unit="{unit}" xml:lang="en-US" xmlns="{CORE_NS}">'.encode("utf-8")
+            )
+            for name, value in (metadata or {}).items():
+                stream.write(
+                    f"<metadata name={quoteattr(name)}>{escape(str(value))}</metadata>".encode("utf-8")
+                )
+            stream.write(b"<resources>")
+
+            for index, item in enumerate(objects, start=1):
+                obj = _as_object(item, index)
+                stream.write(
+                    f'<object id="{index}" type="model" name={quoteattr(obj["name"])}>'.encode("utf-8")
+                )
+                write_mesh_xml(stream, obj["vertices"], obj["faces"], precision)
+                stream.write(b"</object>")
+                if obj["transforms"] is not None:
+                    build.extend((index, t) for t in obj["transforms"])
+                else:
+                    build.append((index, obj["transform"]))
+
+            stream.write(b"</resources><build>")
+            for index, transform in build:
+                attr = _transform_attr(transform) if transform is not None else ""
+                stream.write(f'<item objectid="{index}"{attr}/>'.encode("ascii"))
+            stream.write(b"</build></model>")
+
+    return output_path
+
+
+def export_mesh(mesh, output_path: str, **kwargs) -> str:
+    """
+    Export a Trimesh or Scene, using the streaming writer for .3mf.
+
+    Other formats fall through to trimesh's exporters.
+    """
+    if not str(output_path).lower().endswith(".3mf"):
+        mesh.export(str(output_path))
+        return output_path
+
+    if hasattr(mesh, "geometry"):
+        # Scene: one object per node, with the node transform baked in
+        objects = list(mesh.dump())
+    else:
+        objects = [mesh]
+    return write_3mf(str(output_path), objects, **kwargs)